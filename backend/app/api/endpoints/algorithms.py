@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db.database import get_db
+from app.db.database import AsyncDatabase, get_async_db, get_db
 from app.models import schemas
-from app.services.algorithm_service import AlgorithmService, ConflictError
+from app.services.algorithm_service import AlgorithmService, AsyncAlgorithmService, ConflictError
 
 router = APIRouter()
 
@@ -13,11 +13,11 @@ async def get_algorithms(
     limit: int = 100,
     category: Optional[str] = None,
     is_active: Optional[bool] = True,
-    db: Session = Depends(get_db)
+    db: AsyncDatabase = Depends(get_async_db)
 ):
     """获取算法列表"""
-    service = AlgorithmService(db)
-    algorithms = service.get_algorithms(
+    service = AsyncAlgorithmService(db)
+    algorithms = await service.get_algorithms(
         skip=skip, 
         limit=limit, 
         category=category, 
@@ -25,14 +25,29 @@ async def get_algorithms(
     )
     return algorithms
 
+@router.get("/capabilities", response_model=schemas.AlgorithmCapabilitiesResponse)
+async def get_algorithm_capabilities(
+    category: Optional[schemas.AlgorithmCategory] = None,
+    db: AsyncDatabase = Depends(get_async_db)
+):
+    """获取算法库中可用算法的能力索引（名称、长度、安全级别）"""
+    service = AsyncAlgorithmService(db)
+    try:
+        return await service.get_algorithm_capabilities(category.value if category else None)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取算法能力索引时发生错误: {str(e)}"
+        )
+
 @router.get("/{algorithm_id}", response_model=schemas.Algorithm)
 async def get_algorithm(
     algorithm_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncDatabase = Depends(get_async_db)
 ):
     """根据ID获取算法详情"""
-    service = AlgorithmService(db)
-    algorithm = service.get_algorithm(algorithm_id)
+    service = AsyncAlgorithmService(db)
+    algorithm = await service.get_algorithm(algorithm_id)
     if not algorithm:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -5,6 +5,7 @@ from typing import List
 from app.db.database import get_db
 from app.models import schemas
 from app.services.report_service import ReportService
+from app.services.report_jobs import report_job_queue
 import os
 
 router = APIRouter()
@@ -19,13 +20,13 @@ async def get_task_reports(
     reports = service.get_task_reports(task_id)
     return reports
 
-@router.post("/task/{task_id}/generate", response_model=schemas.Report)
+@router.post("/task/{task_id}/generate", response_model=schemas.ReportJob, status_code=status.HTTP_202_ACCEPTED)
 async def generate_report(
     task_id: int,
     report_type: str = "pdf",  # pdf 或 csv
     db: Session = Depends(get_db)
 ):
-    """生成任务报告"""
+    """提交任务报告生成，立即返回报告生成任务"""
     if report_type not in ["pdf", "csv"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -34,8 +35,8 @@ async def generate_report(
     
     service = ReportService(db)
     try:
-        report = service.generate_report(task_id, report_type)
-        return report
+        service.get_reportable_task(task_id)
+        return report_job_queue.submit(db, task_id, report_type)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,6 +48,58 @@ async def generate_report(
             detail=f"生成报告失败: {str(e)}"
         )
 
+@router.get("/jobs/{job_id}", response_model=schemas.ReportJob)
+async def get_report_job(
+    job_id: str,
+    db: Session = Depends(get_db)
+):
+    """获取报告生成任务的状态"""
+    job = report_job_queue.get_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="报告生成任务不存在"
+        )
+    return job
+
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: str,
+    db: Session = Depends(get_db)
+):
+    """下载报告生成任务生成的文件"""
+    job = report_job_queue.get_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="报告生成任务不存在"
+        )
+    
+    if job['status'] == 'FAILED':
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"生成报告失败: {job['error_message']}"
+        )
+    
+    if job['status'] != 'COMPLETED':
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="报告尚未生成完成"
+        )
+    
+    report = job['report']
+    if not os.path.exists(report['file_path']):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="报告文件不存在"
+        )
+    
+    return FileResponse(
+        path=report['file_path'],
+        filename=report['report_name'],
+        media_type='application/octet-stream'
+    )
+
 @router.get("/{report_id}/download")
 async def download_report(
     report_id: int,
@@ -133,13 +186,13 @@ async def delete_report(
         )
     return schemas.MessageResponse(message="报告删除成功")
 
-@router.post("/batch-generate", response_model=List[schemas.Report])
+@router.post("/batch-generate", response_model=List[schemas.ReportJob], status_code=status.HTTP_202_ACCEPTED)
 async def batch_generate_reports(
     task_ids: List[int],
     report_type: str = "pdf",
     db: Session = Depends(get_db)
 ):
-    """批量生成报告"""
+    """批量提交报告生成，各报告在进程池中并行生成"""
     if report_type not in ["pdf", "csv"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -147,23 +200,23 @@ async def batch_generate_reports(
         )
     
     service = ReportService(db)
-    reports = []
+    valid_task_ids = []
     errors = []
     
     for task_id in task_ids:
         try:
-            report = service.generate_report(task_id, report_type)
-            reports.append(report)
+            service.get_reportable_task(task_id)
+            valid_task_ids.append(task_id)
         except Exception as e:
             errors.append(f"任务 {task_id}: {str(e)}")
     
-    if errors and not reports:
+    if errors and not valid_task_ids:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"所有报告生成失败: {'; '.join(errors)}"
         )
     
-    return reports
+    return report_job_queue.submit_many(db, valid_task_ids, report_type)
 
 @router.get("/", response_model=List[schemas.Report])
 async def get_all_reports(
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db.database import get_db
+from app.db.database import AsyncDatabase, get_async_db, get_db
 from app.models import schemas
-from app.services.result_service import ResultService
+from app.models.models import TestTask
+from app.services.result_service import AsyncResultService, ResultService
+from app.services.analytics_cache import analytics_cache
 import logging
+import json
+import csv
+import io
 from app.core.config import settings
 
 # 配置日志记录器
@@ -13,16 +20,45 @@ logger.setLevel(settings.LOG_LEVEL)
 
 router = APIRouter()
 
+# 已完成任务的结果仍可能被删除，客户端每次使用缓存前都需要用ETag重新验证
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+def _not_modified(request: Request, task_id: int, version: Optional[str], kind: str, **params) -> Optional[Response]:
+    """客户端持有的ETag与缓存一致时返回304响应"""
+    entry = analytics_cache.get(task_id, version, kind, **params)
+    if entry is None:
+        return None
+    etags = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+    if entry.etag in etags or "*" in etags:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": entry.etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+        )
+    return None
+
+def _set_cache_headers(response: Response, task_id: int, version: Optional[str], kind: str, **params):
+    """已缓存的结果带ETag供客户端重新验证，其余结果要求客户端每次重新获取"""
+    entry = analytics_cache.get(task_id, version, kind, **params)
+    if entry is not None:
+        response.headers["ETag"] = entry.etag
+        response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+
 @router.get("/task/{task_id}", response_model=List[schemas.TestResult])
 async def get_task_results(
     task_id: int,
-    db: Session = Depends(get_db)
+    metric_name: Optional[str] = Query(None, description="指标名称"),
+    limit: Optional[int] = Query(None, ge=1, description="返回结果的最大数量，默认返回全部结果"),
+    db: AsyncDatabase = Depends(get_async_db)
 ):
     """获取指定任务的测试结果
     
     Args:
         task_id: 任务ID
-        db: 数据库会话对象
+        metric_name: 指标名称（可选）
+        limit: 返回结果的最大数量（可选）
+        db: 异步数据库访问入口
     
     Returns:
         List[schemas.TestResult]: 测试结果列表
@@ -39,8 +75,8 @@ async def get_task_results(
             )
             
         logger.debug(f"Request to get results for task_id: {task_id}")
-        service = ResultService(db)
-        results = service.get_task_results(task_id)
+        service = AsyncResultService(db)
+        results = await service.get_task_results(task_id, metric_name, limit)
         logger.info(f"Successfully retrieved {len(results)} results for task_id: {task_id}")
         return results
     except ValueError as e:
@@ -56,16 +92,197 @@ async def get_task_results(
             detail="获取任务结果失败"
         )
 
+@router.get("/task/{task_id}/page", response_model=schemas.TestResultPage)
+async def get_task_results_page(
+    task_id: int,
+    limit: int = Query(1000, ge=1, description="每页最大数量"),
+    cursor: Optional[str] = Query(None, description="上一页返回的游标"),
+    metric_name: Optional[str] = Query(None, description="指标名称"),
+    db: AsyncDatabase = Depends(get_async_db)
+):
+    """按游标分页获取任务的测试结果
+    
+    Args:
+        task_id: 任务ID
+        limit: 每页最大数量，不超过MAX_QUERY_LIMIT
+        cursor: 上一页返回的游标，为空时从第一页开始
+        metric_name: 指标名称（可选）
+        db: 异步数据库访问入口
+    
+    Returns:
+        schemas.TestResultPage: 本页结果和下一页游标
+    
+    Raises:
+        HTTPException: 当参数无效或查询失败时
+    """
+    try:
+        if task_id <= 0:
+            logger.error(f"Invalid task_id: {task_id}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="任务ID必须为正整数"
+            )
+        
+        service = AsyncResultService(db)
+        items, next_cursor = await service.get_task_results_page(
+            task_id, min(limit, settings.MAX_QUERY_LIMIT), cursor, metric_name
+        )
+        return {'items': items, 'next_cursor': next_cursor}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Value error in get_task_results_page: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Failed to get task results page: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="获取任务结果失败"
+        )
+
+# 流式导出的列顺序
+EXPORT_COLUMNS = ['id', 'task_id', 'metric_name', 'value', 'unit', 'test_round', 'created_at']
+
+def _export_task_results(db: Session, task_id: int, metric_name: Optional[str], export_format: str):
+    """逐批读取并编码任务结果（在线程池中迭代，会话在响应发送完成后关闭）"""
+    results = ResultService(db).iter_task_results(task_id, metric_name)
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        for count, result in enumerate(results, 1):
+            writer.writerow(result)
+            if count % settings.RESULT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for result in results:
+            yield json.dumps(jsonable_encoder(result), ensure_ascii=False) + "\n"
+
+@router.get("/task/{task_id}/export")
+async def export_task_results(
+    task_id: int,
+    format: str = Query("ndjson", regex="^(ndjson|csv)$", description="导出格式：ndjson或csv"),
+    metric_name: Optional[str] = Query(None, description="指标名称"),
+    db: Session = Depends(get_db)
+):
+    """以NDJSON或CSV流式导出任务的全部测试结果
+    
+    结果边读取边发送，服务端内存占用与任务的结果数量无关。
+    
+    Args:
+        task_id: 任务ID
+        format: 导出格式
+        metric_name: 指标名称（可选）
+        db: 数据库会话
+    
+    Returns:
+        StreamingResponse: 流式响应
+    
+    Raises:
+        HTTPException: 当任务ID无效或任务不存在时
+    """
+    if task_id <= 0:
+        logger.error(f"Invalid task_id: {task_id}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="任务ID必须为正整数"
+        )
+    
+    # 开始发送响应前检查任务是否存在，响应头发出后无法再返回404
+    if not db.query(TestTask.id).filter(TestTask.id == task_id).first():
+        logger.warning(f"Task with id {task_id} does not exist")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"任务ID {task_id} 不存在"
+        )
+    
+    logger.info(f"Streaming {format} export of results for task_id: {task_id}")
+    if format == "csv":
+        return StreamingResponse(
+            _export_task_results(db, task_id, metric_name, format),
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename=task_{task_id}_results.csv"}
+        )
+    return StreamingResponse(
+        _export_task_results(db, task_id, metric_name, format),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/task/{task_id}/series", response_model=dict)
+async def get_task_metric_series(
+    task_id: int,
+    request: Request,
+    response: Response,
+    metric_name: str = Query(..., description="指标名称"),
+    width: int = Query(800, ge=10, le=10000, description="图表宽度（像素）"),
+    method: str = Query("lttb", regex="^(lttb|minmax)$", description="降采样方法：lttb或minmax"),
+    db: AsyncDatabase = Depends(get_async_db)
+):
+    """获取用于绘制图表的降采样指标序列
+    
+    Args:
+        task_id: 任务ID
+        metric_name: 指标名称
+        width: 图表宽度，返回的点数不超过该值
+        method: 降采样方法
+        db: 异步数据库访问入口
+    
+    Returns:
+        dict: 降采样后的[测试轮次, 数值]点列表
+    
+    Raises:
+        HTTPException: 当参数无效或查询失败时
+    """
+    try:
+        if task_id <= 0:
+            logger.error(f"Invalid task_id: {task_id}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="任务ID必须为正整数"
+            )
+        
+        params = {'metric_name': metric_name, 'width': width, 'method': method}
+        service = AsyncResultService(db)
+        version = await service.get_cache_version(task_id)
+        not_modified = _not_modified(request, task_id, version, 'series', **params)
+        if not_modified:
+            return not_modified
+        series = await service.get_metric_series(task_id, metric_name, width, method)
+        _set_cache_headers(response, task_id, version, 'series', **params)
+        return series
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Value error in get_task_metric_series: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Failed to get task metric series: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="获取指标序列失败"
+        )
+
 @router.get("/task/{task_id}/summary", response_model=dict)
 async def get_task_results_summary(
     task_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncDatabase = Depends(get_async_db)
 ):
     """获取任务结果摘要统计
     
     Args:
         task_id: 任务ID
-        db: 数据库会话对象
+        db: 异步数据库访问入口
     
     Returns:
         dict: 结果摘要统计
@@ -82,14 +299,19 @@ async def get_task_results_summary(
             )
             
         logger.debug(f"Request to get results summary for task_id: {task_id}")
-        service = ResultService(db)
-        summary = service.get_task_results_summary(task_id)
+        service = AsyncResultService(db)
+        version = await service.get_cache_version(task_id)
+        not_modified = _not_modified(request, task_id, version, 'summary')
+        if not_modified:
+            return not_modified
+        summary = await service.get_task_results_summary(task_id)
         if not summary:
             logger.warning(f"No results summary found for task_id: {task_id}")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="未找到任务结果"
             )
+        _set_cache_headers(response, task_id, version, 'summary')
         logger.info(f"Successfully retrieved results summary for task_id: {task_id}")
         return summary
     except ValueError as e:
@@ -111,13 +333,15 @@ async def get_task_results_summary(
 @router.get("/task/{task_id}/metrics", response_model=schemas.PerformanceMetrics)
 async def get_task_performance_metrics(
     task_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncDatabase = Depends(get_async_db)
 ):
     """获取任务性能指标
     
     Args:
         task_id: 任务ID
-        db: 数据库会话对象
+        db: 异步数据库访问入口
     
     Returns:
         schemas.PerformanceMetrics: 性能指标对象
@@ -134,14 +358,19 @@ async def get_task_performance_metrics(
             )
             
         logger.debug(f"Request to get performance metrics for task_id: {task_id}")
-        service = ResultService(db)
-        metrics = service.get_performance_metrics(task_id)
+        service = AsyncResultService(db)
+        version = await service.get_cache_version(task_id)
+        not_modified = _not_modified(request, task_id, version, 'metrics')
+        if not_modified:
+            return not_modified
+        metrics = await service.get_performance_metrics(task_id)
         if not metrics:
             logger.warning(f"No performance metrics found for task_id: {task_id}")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="未找到性能指标"
             )
+        _set_cache_headers(response, task_id, version, 'metrics')
         logger.info(f"Successfully retrieved performance metrics for task_id: {task_id}")
         return metrics
     except ValueError as e:
@@ -164,14 +393,14 @@ async def get_task_performance_metrics(
 async def compare_algorithms(
     algorithm_ids: str = Query(..., description="逗号分隔的算法ID列表"),
     metric_name: Optional[str] = Query(None, description="可选的比较指标名称"),
-    db: Session = Depends(get_db)
+    db: AsyncDatabase = Depends(get_async_db)
 ):
     """比较多个算法的性能
     
     Args:
         algorithm_ids: 逗号分隔的算法ID列表
         metric_name: 可选的比较指标名称
-        db: 数据库会话对象
+        db: 异步数据库访问入口
     
     Returns:
         dict: 包含算法比较结果的数据
@@ -209,8 +438,8 @@ async def compare_algorithms(
                 detail="一次最多可比较10个算法"
             )
             
-        service = ResultService(db)
-        comparison = service.compare_algorithms(algorithm_id_list, metric_name)
+        service = AsyncResultService(db)
+        comparison = await service.compare_algorithms(algorithm_id_list, metric_name)
         logger.info(f"Successfully compared {len(comparison.get('algorithms', {}))} algorithms")
         return comparison
     except ValueError as e:
@@ -233,14 +462,14 @@ async def compare_algorithms(
 async def get_algorithm_latest_results(
     algorithm_id: int,
     limit: int = Query(10, ge=1, le=100, description="返回结果的最大数量，范围1-100"),
-    db: Session = Depends(get_db)
+    db: AsyncDatabase = Depends(get_async_db)
 ):
     """获取算法的最新测试结果
     
     Args:
         algorithm_id: 算法ID
         limit: 返回结果的最大数量
-        db: 数据库会话对象
+        db: 异步数据库访问入口
     
     Returns:
         List[schemas.TestResult]: 最新的测试结果列表
@@ -257,8 +486,8 @@ async def get_algorithm_latest_results(
             )
             
         logger.debug(f"Request to get latest results for algorithm_id: {algorithm_id}, limit: {limit}")
-        service = ResultService(db)
-        results = service.get_algorithm_latest_results(algorithm_id, limit)
+        service = AsyncResultService(db)
+        results = await service.get_algorithm_latest_results(algorithm_id, limit)
         logger.info(f"Successfully retrieved {len(results)} latest results for algorithm_id: {algorithm_id}")
         return results
     except ValueError as e:
@@ -279,7 +508,7 @@ async def get_algorithm_performance_history(
     algorithm_id: int,
     metric_name: str,
     days: int = Query(30, ge=1, le=365, description="查询的天数范围，1-365天"),
-    db: Session = Depends(get_db)
+    db: AsyncDatabase = Depends(get_async_db)
 ):
     """获取算法性能历史趋势
     
@@ -287,7 +516,7 @@ async def get_algorithm_performance_history(
         algorithm_id: 算法ID
         metric_name: 指标名称
         days: 查询的天数范围
-        db: 数据库会话对象
+        db: 异步数据库访问入口
     
     Returns:
         dict: 包含历史性能数据的字典
@@ -311,8 +540,8 @@ async def get_algorithm_performance_history(
             )
             
         logger.debug(f"Request to get performance history for algorithm_id: {algorithm_id}, metric: {metric_name}, days: {days}")
-        service = ResultService(db)
-        history = service.get_algorithm_performance_history(
+        service = AsyncResultService(db)
+        history = await service.get_algorithm_performance_history(
             algorithm_id, metric_name, days
         )
         logger.info(f"Successfully retrieved performance history with {len(history.get('data', []))} data points for algorithm_id: {algorithm_id}")
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import asyncio
+import json
 import logging
 import time
 
-from app.db.database import get_db
+from app.db.database import AsyncDatabase, get_async_db, get_db, SessionLocal
 from app.models import schemas
-from app.services.task_service import TaskService
+from app.services.task_service import AsyncTaskService, TaskService
+from app.services.progress_bus import progress_bus, TERMINAL_STATUSES
 from app.core.config import settings
 
+# 推送连接的心跳间隔（秒）
+EVENT_KEEPALIVE_INTERVAL = 15
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
@@ -21,7 +30,7 @@ async def get_tasks(
     limit: int = 100,
     algorithm_id: Optional[int] = None,
     status_filter: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncDatabase = Depends(get_async_db)
 ):
     """获取任务列表"""
     start_time = time.time()
@@ -33,8 +42,8 @@ async def get_tasks(
                 skip, limit, algorithm_id, status_filter)
     
     try:
-        service = TaskService(db)
-        tasks = service.get_tasks(
+        service = AsyncTaskService(db)
+        tasks = await service.get_tasks(
             skip=skip,
             limit=limit,
             algorithm_id=algorithm_id,
@@ -54,7 +63,7 @@ async def get_tasks(
 @router.get("/{task_id}", response_model=schemas.TestTask)
 async def get_task(
     task_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncDatabase = Depends(get_async_db)
 ):
     """根据ID获取任务详情"""
     logger.info("Received request for task details with ID: %d", task_id)
@@ -67,8 +76,8 @@ async def get_task(
                 detail="任务ID必须为正整数"
             )
             
-        service = TaskService(db)
-        task = service.get_task(task_id)
+        service = AsyncTaskService(db)
+        task = await service.get_task(task_id)
         if not task:
             logger.warning("Task with ID %d not found", task_id)
             raise HTTPException(
@@ -119,7 +128,6 @@ async def create_task(
 @router.post("/execute", response_model=schemas.MessageResponse)
 async def execute_test(
     request: schemas.TestExecutionRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """执行测试任务"""
@@ -146,18 +154,10 @@ async def execute_test(
         )
         task = service.create_task(task_data)
         
-        # 后台执行测试
-        async def run_task():
-            logger.info(f"Starting background execution for task ID: {task.id}")
-            try:
-                await service.execute_task_background(task.id)
-                logger.info(f"Background execution completed for task ID: {task.id}")
-            except Exception as e:
-                logger.error(f"Error in background execution for task ID {task.id}: %s", str(e))
+        # 交给任务执行引擎在工作进程中执行
+        service.enqueue_task(task.id)
         
-        background_tasks.add_task(run_task)
-        
-        logger.info(f"Task {task.id} created and scheduled for background execution")
+        logger.info(f"Task {task.id} created and queued for execution")
         return schemas.MessageResponse(
             message=f"测试任务已创建，任务ID: {task.id}，正在后台执行"
         )
@@ -302,7 +302,7 @@ async def stop_task(
 @router.get("/{task_id}/status", response_model=dict)
 async def get_task_status(
     task_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncDatabase = Depends(get_async_db)
 ):
     """获取任务执行状态"""
     logger.info("Received request to get status for task ID: %d", task_id)
@@ -315,8 +315,8 @@ async def get_task_status(
                 detail="任务ID必须为正整数"
             )
             
-        service = TaskService(db)
-        status_info = service.get_task_status(task_id)
+        service = AsyncTaskService(db)
+        status_info = await service.get_task_status(task_id)
         if not status_info:
             logger.warning("Task with ID %d not found", task_id)
             raise HTTPException(
@@ -336,10 +336,122 @@ async def get_task_status(
             detail="获取任务状态失败: " + str(e)
         )
 
+def _load_task_status(task_id: int) -> Optional[dict]:
+    """读取任务状态快照，推送连接不长期占用数据库会话"""
+    db = SessionLocal()
+    try:
+        return TaskService(db).get_task_status(task_id)
+    finally:
+        db.close()
+
+async def _task_status_updates(task_id: int, queue: asyncio.Queue, initial: dict):
+    """依次产出任务状态快照，任务结束后停止；超过心跳间隔无更新时产出None
+    
+    任务可能由其他API进程执行，本进程的总线收不到进度，
+    因此心跳时重新读取一次状态，任务已结束时产出最终状态后停止。
+    """
+    yield initial
+    if initial.get('status') in TERMINAL_STATUSES:
+        return
+    while True:
+        try:
+            snapshot = await asyncio.wait_for(queue.get(), timeout=EVENT_KEEPALIVE_INTERVAL)
+        except asyncio.TimeoutError:
+            snapshot = await run_in_threadpool(_load_task_status, task_id)
+            if snapshot and snapshot.get('status') in TERMINAL_STATUSES:
+                yield snapshot
+                return
+            yield None
+            continue
+        yield snapshot
+        if snapshot.get('status') in TERMINAL_STATUSES:
+            return
+
+@router.get("/{task_id}/events")
+async def stream_task_events(task_id: int, request: Request):
+    """通过SSE推送任务执行进度"""
+    logger.info("Received request to stream events for task ID: %d", task_id)
+    queue = progress_bus.subscribe(task_id)
+    try:
+        initial = await run_in_threadpool(_load_task_status, task_id)
+    except Exception as e:
+        progress_bus.unsubscribe(task_id, queue)
+        logger.error("Error getting status for task ID %d: %s", task_id, str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="获取任务状态失败: " + str(e)
+        )
+    if not initial:
+        progress_bus.unsubscribe(task_id, queue)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"任务ID {task_id} 不存在"
+        )
+
+    async def event_stream():
+        try:
+            async for snapshot in _task_status_updates(task_id, queue, initial):
+                if await request.is_disconnected():
+                    break
+                if snapshot is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"event: status\ndata: {json.dumps(jsonable_encoder(snapshot), ensure_ascii=False)}\n\n"
+        finally:
+            progress_bus.unsubscribe(task_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _wait_websocket_disconnect(websocket: WebSocket):
+    """读取并丢弃客户端消息，连接断开时返回"""
+    while True:
+        message = await websocket.receive()
+        if message['type'] == 'websocket.disconnect':
+            return
+
+@router.websocket("/{task_id}/ws")
+async def task_events_websocket(websocket: WebSocket, task_id: int):
+    """通过WebSocket推送任务执行进度
+    
+    同时读取客户端消息以便及时发现断开的连接，长时间没有进度时发送心跳消息。
+    """
+    await websocket.accept()
+    queue = progress_bus.subscribe(task_id)
+
+    async def send_updates():
+        initial = await run_in_threadpool(_load_task_status, task_id)
+        if not initial:
+            await websocket.close(code=4404)
+            return
+        async for snapshot in _task_status_updates(task_id, queue, initial):
+            if snapshot is None:
+                await websocket.send_json({'event': 'ping'})
+            else:
+                await websocket.send_json(jsonable_encoder(snapshot))
+        await websocket.close()
+
+    sender = asyncio.ensure_future(send_updates())
+    receiver = asyncio.ensure_future(_wait_websocket_disconnect(websocket))
+    try:
+        await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        if sender.done():
+            sender.result()
+        else:
+            logger.debug("WebSocket for task ID %d disconnected", task_id)
+    except WebSocketDisconnect:
+        logger.debug("WebSocket for task ID %d disconnected", task_id)
+    finally:
+        for pending in (sender, receiver):
+            pending.cancel()
+        progress_bus.unsubscribe(task_id, queue)
+
 @router.post("/{task_id}/run", response_model=schemas.MessageResponse)
 async def run_task_manually(
     task_id: int,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """手动运行任务（用于测试和调试）"""
@@ -370,18 +482,10 @@ async def run_task_manually(
                 detail=f"任务状态不是待运行，当前状态: {task.status}"
             )
         
-        # 后台执行任务
-        async def run_task():
-            logger.info(f"Starting manual background execution for task ID: {task_id}")
-            try:
-                await service.execute_task_background(task_id)
-                logger.info(f"Manual background execution completed for task ID: {task_id}")
-            except Exception as e:
-                logger.error(f"Error in manual background execution for task ID {task_id}: %s", str(e))
-        
-        background_tasks.add_task(run_task)
+        # 交给任务执行引擎在工作进程中执行
+        service.enqueue_task(task_id)
         
-        logger.info(f"Task {task_id} scheduled for manual execution")
+        logger.info(f"Task {task_id} queued for manual execution")
         return schemas.MessageResponse(
             message=f"任务 {task_id} 已开始执行"
         )
@@ -1,5 +1,6 @@
 from pydantic import BaseSettings, Field
 from typing import Optional
+import importlib.util
 import os
 import platform
 
@@ -18,6 +19,25 @@ class Settings(BaseSettings):
     # 数据库类型配置
     USE_MYSQL: bool = Field(default=True, env="USE_MYSQL")  # 默认为使用 MySQL
     
+    # 启动阶段配置（应用启动时探测数据库、检查表结构并预热连接池）
+    SKIP_DATABASE_PROBE: bool = Field(default=False, env="SKIP_DATABASE_PROBE")  # 已通过DATABASE_URL明确指定数据库时跳过MySQL探测
+    SKIP_SCHEMA_CHECK: bool = Field(default=False, env="SKIP_SCHEMA_CHECK")  # 表结构已就绪时跳过建表和补列检查
+    DATABASE_PROBE_TIMEOUT: int = Field(default=3, env="DATABASE_PROBE_TIMEOUT")  # MySQL探测连接超时（秒）
+    STARTUP_STEP_TIMEOUT: float = Field(default=10.0, env="STARTUP_STEP_TIMEOUT")  # 单个启动步骤的超时（秒）
+    
+    # 异步数据库配置（读接口通过AsyncSession访问数据库，驱动为aiosqlite/asyncmy）
+    ASYNC_DATABASE: Optional[bool] = Field(default=None, env="ASYNC_DATABASE")  # 是否启用异步引擎，未设置时仅MySQL启用
+    ASYNC_DATABASE_URL: Optional[str] = Field(default=None, env="ASYNC_DATABASE_URL")  # 异步连接URL，默认由同步URL推导
+    
+    # SQLite部署配置（通过连接事件设置PRAGMA）
+    SQLITE_JOURNAL_MODE: str = Field(default="WAL", env="SQLITE_JOURNAL_MODE")  # WAL模式下读操作不会被写入阻塞
+    SQLITE_SYNCHRONOUS: str = Field(default="NORMAL", env="SQLITE_SYNCHRONOUS")  # WAL模式下NORMAL即可保证一致性
+    SQLITE_MMAP_SIZE: int = Field(default=268435456, env="SQLITE_MMAP_SIZE")  # 内存映射读取的大小(字节)
+    SQLITE_CACHE_SIZE: int = Field(default=-65536, env="SQLITE_CACHE_SIZE")  # 页缓存大小，负数表示KiB
+    SQLITE_BUSY_TIMEOUT: float = Field(default=30.0, env="SQLITE_BUSY_TIMEOUT")  # 等待写锁的超时时间(秒)
+    SQLITE_POOL_SIZE: int = Field(default=10, env="SQLITE_POOL_SIZE")  # 连接池常驻连接数
+    SQLITE_MAX_OVERFLOW: int = Field(default=20, env="SQLITE_MAX_OVERFLOW")  # 连接池允许的额外连接数
+    
     # JWT配置
     SECRET_KEY: str = Field(default="", env="SECRET_KEY")  # 生产环境必须通过环境变量设置
     ALGORITHM: str = "HS256"
@@ -54,7 +74,36 @@ class Settings(BaseSettings):
     # 查询和测试限制配置
     MAX_QUERY_LIMIT: int = Field(default=1000, env="MAX_QUERY_LIMIT")  # 最大查询返回数量
     MAX_TEST_COUNT: int = Field(default=10000, env="MAX_TEST_COUNT")  # 最大测试次数
-    
+
+    # 测试结果批量写入配置
+    RESULT_BATCH_SIZE: int = Field(default=1000, env="RESULT_BATCH_SIZE")  # 每批写入的结果行数
+    RESULT_FLUSH_INTERVAL: float = Field(default=2.0, env="RESULT_FLUSH_INTERVAL")  # 最长刷新间隔(秒)
+    RESULT_STORAGE_BACKEND: str = Field(default="rows", env="RESULT_STORAGE_BACKEND")  # 逐轮样本存储方式：rows(test_results行)或series(压缩序列)
+    RESULT_SERIES_DTYPE: str = Field(default="float64", env="RESULT_SERIES_DTYPE")  # 序列样本存储类型：float64或float32
+
+    # 任务执行引擎配置
+    TASK_EXECUTOR_WORKERS: Optional[int] = Field(default=None, env="TASK_EXECUTOR_WORKERS")  # 工作进程数，默认每个CPU核心一个
+    BENCHMARK_CHUNK_SIZE: int = Field(default=1000, env="BENCHMARK_CHUNK_SIZE")  # 每次批量调用C库执行的轮数
+    BENCHMARK_WARMUP_ROUNDS: int = Field(default=10, env="BENCHMARK_WARMUP_ROUNDS")  # 正式计时前丢弃的预热轮数
+    BENCHMARK_CALIBRATE: bool = Field(default=True, env="BENCHMARK_CALIBRATE")  # 是否校准并扣除ctypes空调用开销
+    BENCHMARK_CALIBRATION_SAMPLES: int = Field(default=1000, env="BENCHMARK_CALIBRATION_SAMPLES")  # 空调用校准的采样次数
+    THROUGHPUT_DURATION: float = Field(default=2.0, env="THROUGHPUT_DURATION")  # 吞吐量测试每个并发度的默认持续时间(秒)
+    THROUGHPUT_MAX_DURATION: float = Field(default=60.0, env="THROUGHPUT_MAX_DURATION")  # 吞吐量测试每个并发度的最长持续时间(秒)
+    THROUGHPUT_MAX_CONCURRENCY: int = Field(default=64, env="THROUGHPUT_MAX_CONCURRENCY")  # 吞吐量测试的最大并发线程/进程数
+    THROUGHPUT_STARTUP_TIMEOUT: float = Field(default=60.0, env="THROUGHPUT_STARTUP_TIMEOUT")  # 多进程吞吐量测试等待工作进程就绪的最长时间(秒)
+    MAX_MESSAGE_SIZE: int = Field(default=16 * 1024 * 1024, env="MAX_MESSAGE_SIZE")  # 签名消息大小扫描允许的最大消息(字节)
+
+    # 报告生成队列配置
+    REPORT_WORKERS: Optional[int] = Field(default=None, env="REPORT_WORKERS")  # 报告生成进程数，默认每个CPU核心一个
+
+    # 分析结果缓存配置
+    ANALYTICS_CACHE_SIZE: int = Field(default=512, env="ANALYTICS_CACHE_SIZE")  # 进程内缓存的最大条目数
+    ANALYTICS_CACHE_DIR: Optional[str] = Field(default=None, env="ANALYTICS_CACHE_DIR")  # 磁盘缓存目录，为空时只使用内存缓存
+
+    # 主机负载采样配置
+    HOST_METRICS_INTERVAL: float = Field(default=1.0, env="HOST_METRICS_INTERVAL")  # 采样间隔(秒)
+    HOST_METRICS_CAPACITY: int = Field(default=3600, env="HOST_METRICS_CAPACITY")  # 环形缓冲区保留的采样数
+
     class Config:
         case_sensitive = True
         # 允许从.env文件加载配置
@@ -72,6 +121,28 @@ class Settings(BaseSettings):
             # SQLite配置
             return "sqlite:///./algorithm_testing.db"
 
+    def use_async_database(self) -> bool:
+        """是否为读接口创建异步引擎
+
+        MySQL使用asyncmy时等待查询不占用线程；aiosqlite本身在后台线程中执行查询，
+        相比线程池没有收益，因此未显式配置时只对MySQL启用。
+        """
+        if self.ASYNC_DATABASE is not None:
+            return self.ASYNC_DATABASE
+        return self.USE_MYSQL
+
+    def get_async_database_url(self) -> str:
+        """获取异步数据库连接 URL，未配置时将同步驱动替换为对应的异步驱动"""
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        url = self.get_database_url()
+        for sync_prefix, async_prefix in (("sqlite://", "sqlite+aiosqlite://"),
+                                          ("mysql+pymysql://", "mysql+asyncmy://"),
+                                          ("mysql://", "mysql+asyncmy://")):
+            if url.startswith(sync_prefix):
+                return async_prefix + url[len(sync_prefix):]
+        return url
+
 # 初始化设置
 settings = Settings()
 
@@ -82,33 +153,49 @@ if settings.ENVIRONMENT == "development" and not settings.SECRET_KEY:
     print("[INFO] 使用开发环境默认配置")
 
 # 尝试连接 MySQL，如果失败则使用 SQLite
-def initialize_database_connection():
-    """初始化数据库连接，MySQL连接失败则回退到SQLite"""
-    if settings.USE_MYSQL and not settings.DATABASE_URL:
-        try:
-            import pymysql
-            connection = pymysql.connect(
-                host=settings.DATABASE_HOST,
-                port=settings.DATABASE_PORT,
-                user=settings.DATABASE_USER,
-                password=settings.DATABASE_PASSWORD,
-                database=settings.DATABASE_NAME,
-                connect_timeout=5
-            )
-            connection.close()
-            print("[INFO] 成功连接到 MySQL 数据库")
-        except pymysql.MySQLError as e:
-            print(f"[WARNING] 无法连接到 MySQL: {e}")
-            print("[INFO] 切换到 SQLite 数据库")
-            settings.USE_MYSQL = False
-        except ImportError:
-            print("[WARNING] pymysql模块未安装")
-            print("[INFO] 切换到 SQLite 数据库")
-            settings.USE_MYSQL = False
-        except Exception as e:
-            print(f"[WARNING] 数据库连接异常: {e}")
-            print("[INFO] 切换到 SQLite 数据库")
-            settings.USE_MYSQL = False
-
-# 初始化数据库连接
-initialize_database_connection()
\ No newline at end of file
+def initialize_database_connection(timeout: Optional[int] = None) -> bool:
+    """探测MySQL是否可用，连接失败则回退到SQLite
+
+    在应用启动阶段调用，返回是否切换到了SQLite。切换后同步写入环境变量，
+    之后创建的工作进程重新加载配置时直接使用SQLite，不再重复探测。
+    """
+    if not settings.USE_MYSQL or settings.DATABASE_URL:
+        return False
+    try:
+        import pymysql
+        timeout = timeout or settings.DATABASE_PROBE_TIMEOUT
+        # 握手阶段的读写同样限时，避免连接建立后服务端无响应时一直等待
+        connection = pymysql.connect(
+            host=settings.DATABASE_HOST,
+            port=settings.DATABASE_PORT,
+            user=settings.DATABASE_USER,
+            password=settings.DATABASE_PASSWORD,
+            database=settings.DATABASE_NAME,
+            connect_timeout=timeout,
+            read_timeout=timeout,
+            write_timeout=timeout
+        )
+        connection.close()
+        print("[INFO] 成功连接到 MySQL 数据库")
+        return False
+    except ImportError:
+        print("[WARNING] pymysql模块未安装")
+    except pymysql.MySQLError as e:
+        print(f"[WARNING] 无法连接到 MySQL: {e}")
+    except Exception as e:
+        print(f"[WARNING] 数据库连接异常: {e}")
+    print("[INFO] 切换到 SQLite 数据库")
+    settings.USE_MYSQL = False
+    os.environ["USE_MYSQL"] = "false"
+    return True
+
+def check_database_driver():
+    """未安装pymysql时直接使用SQLite，导入时不建立任何连接"""
+    if settings.USE_MYSQL and not settings.DATABASE_URL and importlib.util.find_spec("pymysql") is None:
+        print("[WARNING] pymysql模块未安装")
+        print("[INFO] 切换到 SQLite 数据库")
+        settings.USE_MYSQL = False
+        os.environ["USE_MYSQL"] = "false"
+
+# 检查数据库驱动（MySQL连接探测在应用启动阶段进行）
+check_database_driver()
\ No newline at end of file
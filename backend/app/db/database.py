@@ -1,29 +1,80 @@
-from sqlalchemy import create_engine
+from typing import Any, Callable, Optional
+import logging
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 from app.core.config import settings
 
-# 创建数据库引擎
-if settings.USE_MYSQL:
-    engine = create_engine(
-        settings.get_database_url(),
-        pool_pre_ping=True,
-        pool_recycle=3600,
-        echo=settings.DEBUG,
-        future=True
-    )
-else:
-    # SQLite配置，解决线程安全问题
-    engine = create_engine(
+logger = logging.getLogger(__name__)
+
+# SQLite PRAGMA允许的取值
+SQLITE_JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"}
+SQLITE_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+def _is_memory_database(url: str) -> bool:
+    """内存数据库的每个连接都是独立的库，只能共享单个连接"""
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in url
+
+def _sqlite_pragma_value(name: str, value: str, allowed: set) -> str:
+    value = value.upper()
+    if value not in allowed:
+        raise ValueError(f"Unsupported SQLite {name}: {value}")
+    return value
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """每个新建的SQLite连接设置WAL、同步级别、内存映射和缓存等PRAGMA"""
+    journal_mode = _sqlite_pragma_value("journal_mode", settings.SQLITE_JOURNAL_MODE, SQLITE_JOURNAL_MODES)
+    synchronous = _sqlite_pragma_value("synchronous", settings.SQLITE_SYNCHRONOUS, SQLITE_SYNCHRONOUS_MODES)
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+def _create_engine():
+    """按当前配置创建同步数据库引擎"""
+    if settings.USE_MYSQL:
+        return create_engine(
+            settings.get_database_url(),
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            echo=settings.DEBUG,
+            future=True
+        )
+    if _is_memory_database(settings.get_database_url()):
+        # 内存数据库只能使用静态连接池
+        return create_engine(
+            settings.get_database_url(),
+            echo=settings.DEBUG,
+            future=True,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+    # SQLite文件数据库：每个会话使用连接池中独立的连接，
+    # 配合WAL模式，读请求不会排在正在写入结果的连接后面
+    sqlite_engine = create_engine(
         settings.get_database_url(),
         echo=settings.DEBUG,
         future=True,
-        # SQLite特定配置
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,  # 使用静态连接池
+        connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT},
+        poolclass=QueuePool,
+        pool_size=settings.SQLITE_POOL_SIZE,
+        max_overflow=settings.SQLITE_MAX_OVERFLOW,
         pool_pre_ping=True
     )
+    event.listen(sqlite_engine, "connect", _set_sqlite_pragmas)
+    return sqlite_engine
+
+# 创建数据库引擎（只创建连接池，不建立连接）
+engine = _create_engine()
 
 # 创建SessionLocal类
 SessionLocal = sessionmaker(
@@ -33,6 +84,50 @@ SessionLocal = sessionmaker(
     expire_on_commit=False  # 避免在commit后对象过期
 )
 
+def _create_async_engine():
+    """创建异步引擎，驱动未安装或为内存数据库时返回None，读接口改用线程池执行"""
+    if not settings.USE_MYSQL and _is_memory_database(settings.get_database_url()):
+        # 内存数据库无法在两个引擎之间共享
+        return None
+    try:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        if settings.USE_MYSQL:
+            return create_async_engine(
+                settings.get_async_database_url(),
+                pool_pre_ping=True,
+                pool_recycle=3600,
+                echo=settings.DEBUG
+            )
+        async_engine = create_async_engine(
+            settings.get_async_database_url(),
+            echo=settings.DEBUG,
+            connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT},
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.SQLITE_POOL_SIZE,
+            max_overflow=settings.SQLITE_MAX_OVERFLOW,
+            pool_pre_ping=True
+        )
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+        return async_engine
+    except ImportError as e:
+        logger.warning(f"异步数据库驱动不可用，读接口改用线程池执行: {e}")
+        return None
+
+def _create_async_sessionmaker(async_engine):
+    if async_engine is None:
+        return None
+    from sqlalchemy.ext.asyncio import AsyncSession
+    return sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+# 创建异步引擎（默认仅MySQL启用，可通过ASYNC_DATABASE配置）
+async_engine = _create_async_engine() if settings.use_async_database() else None
+AsyncSessionLocal = _create_async_sessionmaker(async_engine)
+
 # 创建Base类
 Base = declarative_base()
 
@@ -49,4 +144,105 @@ def get_db():
             db.close()
         except Exception:
             # 忽略关闭连接时的错误
-            pass
\ No newline at end of file
+            pass
+
+def _run_with_session(fn: Callable[..., Any], *args) -> Any:
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+class AsyncDatabase:
+    """读接口的异步数据库访问入口
+
+    启用异步引擎时通过AsyncSession.run_sync在异步连接上执行同步的查询代码，
+    使用asyncmy时等待数据库I/O会让出事件循环，但fn中的计算仍在事件循环线程上执行；
+    未启用时在线程池中使用独立的同步会话执行。
+    传入的函数应在会话内完成序列化，避免在事件循环中触发延迟加载。
+    """
+
+    def __init__(self, session: Optional[Any] = None):
+        self.session = session
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """以同步会话为第一个参数执行fn并返回其结果"""
+        if self.session is not None:
+            return await self.session.run_sync(fn, *args)
+        return await run_in_threadpool(_run_with_session, fn, *args)
+
+# 异步数据库依赖
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        yield AsyncDatabase()
+        return
+    async with AsyncSessionLocal() as session:
+        yield AsyncDatabase(session)
+
+async def dispose_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
+
+def configure_engine():
+    """按当前配置重建数据库引擎，启动阶段切换数据库类型后调用
+
+    SessionLocal保持同一个对象，只重新绑定引擎，已导入的引用仍然有效。
+    """
+    global engine, async_engine, AsyncSessionLocal
+    engine.dispose()
+    engine = _create_engine()
+    SessionLocal.configure(bind=engine)
+    async_engine = _create_async_engine() if settings.use_async_database() else None
+    AsyncSessionLocal = _create_async_sessionmaker(async_engine)
+
+def select_database_engine() -> bool:
+    """探测配置的MySQL是否可用，不可用时切换到SQLite并重建引擎"""
+    from app.core.config import initialize_database_connection
+
+    if initialize_database_connection():
+        configure_engine()
+        logger.info(f"数据库引擎已切换为: {engine.url.get_backend_name()}")
+        return True
+    return False
+
+def warm_up_pool():
+    """预先建立连接池中的常驻连接，首批请求不再承担建连和PRAGMA设置的开销"""
+    size = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+    connections = []
+    try:
+        for _ in range(size):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    logger.info(f"数据库连接池已预热 {size} 个连接")
+
+def prepare_schema():
+    """创建缺失的表并补齐新增的列"""
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+
+def upgrade_schema():
+    """为已存在的表补齐模型中新增的可空列
+
+    create_all只会创建缺失的表，不会修改已有表结构，
+    这里对新增的可空列执行ALTER TABLE ADD COLUMN。
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                logger.info(f"已为表 {table.name} 添加列 {column.name}")
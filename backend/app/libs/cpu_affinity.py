@@ -0,0 +1,170 @@
+import logging
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 任务参数cpu字段中可配置的选项
+CPU_OPTIONS = ('affinity', 'nice', 'policy', 'priority')
+POLICIES = ('other', 'fifo')
+
+def parse_cpu_list(spec: Union[str, int, List[int]]) -> List[int]:
+    """解析CPU列表，支持[0, 2]、2或"0-3,6"形式"""
+    if isinstance(spec, bool):
+        raise ValueError("CPU列表格式无效")
+    if isinstance(spec, int):
+        spec = [spec]
+    if isinstance(spec, str):
+        cpus = []
+        for part in filter(None, (part.strip() for part in spec.split(','))):
+            low, _, high = part.partition('-')
+            try:
+                low, high = int(low), int(high or low)
+            except ValueError:
+                raise ValueError(f"CPU列表格式无效: {part}")
+            if high < low:
+                raise ValueError(f"CPU范围无效: {part}")
+            cpus.extend(range(low, high + 1))
+    elif isinstance(spec, list) and all(isinstance(cpu, int) and not isinstance(cpu, bool) for cpu in spec):
+        cpus = spec
+    else:
+        raise ValueError("CPU列表格式无效")
+    if not cpus:
+        raise ValueError("CPU列表不能为空")
+    if min(cpus) < 0:
+        raise ValueError("CPU编号不能为负数")
+    return sorted(set(cpus))
+
+# Linux能力位：CAP_SYS_NICE
+CAP_SYS_NICE = 23
+
+def _has_cap_sys_nice() -> bool:
+    """当前进程的有效能力集中是否包含CAP_SYS_NICE（非Linux平台返回False）"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('CapEff:'):
+                    return bool(int(line.split()[1], 16) >> CAP_SYS_NICE & 1)
+    except (OSError, ValueError, IndexError):
+        pass
+    return False
+
+def can_lower_nice(nice: int) -> bool:
+    """当前线程能否把nice值设置为更低的nice（需要CAP_SYS_NICE或RLIMIT_NICE允许）"""
+    try:
+        import resource
+    except ImportError:
+        return False
+    if hasattr(resource, 'RLIMIT_NICE'):
+        soft, _ = resource.getrlimit(resource.RLIMIT_NICE)
+        # RLIMIT_NICE为n时允许的最低nice值为20 - n
+        if soft == resource.RLIM_INFINITY or nice >= 20 - soft:
+            return True
+    return _has_cap_sys_nice()
+
+class CpuPinning:
+    """测试线程的CPU绑定和调度优先级
+
+    在Linux上亲和性、nice值和调度策略都是线程属性，只作用于执行测试的线程，
+    测试结束后恢复，工作进程中的后续任务不受影响。
+    提高优先级（降低nice值、SCHED_FIFO）需要CAP_SYS_NICE权限，不允许时记录原因并继续执行。
+    调高nice值后恢复原值同样需要该权限，无法恢复时不调整nice值，
+    避免工作进程中的后续任务一直以较低优先级运行。
+    """
+
+    def __init__(
+        self,
+        affinity: Optional[Union[str, int, List[int]]] = None,
+        nice: Optional[int] = None,
+        policy: str = 'other',
+        priority: Optional[int] = None
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"不支持的调度策略: {policy}，可选: {', '.join(POLICIES)}")
+        if nice is not None and (isinstance(nice, bool) or not isinstance(nice, int) or not -20 <= nice <= 19):
+            raise ValueError("nice值必须是-20到19之间的整数")
+        if priority is not None:
+            if policy != 'fifo':
+                raise ValueError("只有fifo调度策略可以指定priority")
+            if isinstance(priority, bool) or not isinstance(priority, int) or not 1 <= priority <= 99:
+                raise ValueError("priority必须是1到99之间的整数")
+
+        self.affinity = parse_cpu_list(affinity) if affinity is not None else None
+        self.nice = nice
+        self.policy = policy
+        self.priority = priority or 1
+
+    @classmethod
+    def from_parameters(cls, parameters: Optional[Dict[str, Any]]) -> 'CpuPinning':
+        """根据任务参数中的cpu字段创建配置，已记录的applied数据被忽略"""
+        options = (parameters or {}).get('cpu') or {}
+        if not isinstance(options, dict):
+            raise ValueError("cpu参数必须是对象")
+        return cls(**{key: options[key] for key in CPU_OPTIONS if key in options})
+
+    @contextmanager
+    def applied(self) -> Iterator[Dict[str, Any]]:
+        """在当前线程上应用配置，产出实际生效的设置，退出时恢复"""
+        state: Dict[str, Any] = {'errors': []}
+        restore = []
+        try:
+            self._apply_affinity(state, restore)
+            self._apply_nice(state, restore)
+            self._apply_policy(state, restore)
+            if not state['errors']:
+                del state['errors']
+            yield state
+        finally:
+            for undo in reversed(restore):
+                try:
+                    undo()
+                except OSError as e:
+                    logger.warning("Failed to restore CPU scheduling settings: %s", str(e))
+
+    def _apply_affinity(self, state: Dict[str, Any], restore: list):
+        if not hasattr(os, 'sched_setaffinity'):
+            if self.affinity is not None:
+                state['errors'].append("当前平台不支持设置CPU亲和性")
+            return
+        previous = os.sched_getaffinity(0)
+        if self.affinity is not None:
+            unavailable = sorted(set(self.affinity) - previous)
+            if unavailable:
+                raise ValueError(f"CPU {unavailable} 不在工作进程允许的范围内: {sorted(previous)}")
+            os.sched_setaffinity(0, self.affinity)
+            restore.append(lambda: os.sched_setaffinity(0, previous))
+        state['affinity'] = sorted(os.sched_getaffinity(0))
+
+    def _apply_nice(self, state: Dict[str, Any], restore: list):
+        if not hasattr(os, 'setpriority'):
+            if self.nice is not None:
+                state['errors'].append("当前平台不支持设置nice值")
+            return
+        previous = os.getpriority(os.PRIO_PROCESS, 0)
+        if self.nice is not None and self.nice > previous and not can_lower_nice(previous):
+            state['errors'].append(f"没有权限在测试结束后恢复nice值{previous}，未将nice值设置为{self.nice}")
+        elif self.nice is not None and self.nice != previous:
+            try:
+                os.setpriority(os.PRIO_PROCESS, 0, self.nice)
+                restore.append(lambda: os.setpriority(os.PRIO_PROCESS, 0, previous))
+            except PermissionError:
+                state['errors'].append(f"没有权限将nice值设置为{self.nice}")
+        state['nice'] = os.getpriority(os.PRIO_PROCESS, 0)
+
+    def _apply_policy(self, state: Dict[str, Any], restore: list):
+        if not hasattr(os, 'sched_setscheduler'):
+            if self.policy == 'fifo':
+                state['errors'].append("当前平台不支持设置调度策略")
+            return
+        if self.policy == 'fifo':
+            previous_policy = os.sched_getscheduler(0)
+            previous_param = os.sched_getparam(0)
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.priority))
+                restore.append(lambda: os.sched_setscheduler(0, previous_policy, previous_param))
+            except PermissionError:
+                state['errors'].append("没有权限使用SCHED_FIFO调度策略")
+        state['policy'] = 'fifo' if os.sched_getscheduler(0) == os.SCHED_FIFO else 'other'
+        state['priority'] = os.sched_getparam(0).sched_priority
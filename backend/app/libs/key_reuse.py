@@ -0,0 +1,74 @@
+import ctypes
+from typing import Any, Dict, Optional
+
+# 任务参数key_reuse字段中可配置的选项
+KEY_REUSE_OPTIONS = ('interval',)
+
+class KeyReuse:
+    """密钥对复用状态（密钥生成摊销模式）
+
+    密钥对每interval轮重新生成一次，interval为0时整个任务只生成一次，
+    其余轮次只对同一密钥对执行封装/解封装或签名/验证，与长期持有密钥的服务端一致。
+    同一任务的各批次共用一个实例，密钥在批次之间保存，密钥生成只在实际执行时计时。
+    """
+
+    def __init__(self, interval: int = 0):
+        if isinstance(interval, bool) or not isinstance(interval, int) or interval < 0:
+            raise ValueError("密钥复用间隔必须是非负整数")
+        self.interval = interval
+        self.keygens = 0
+        self.rounds = 0
+        self.valid = False
+        self.public_key: Optional[bytes] = None
+        self.secret_key: Optional[bytes] = None
+
+    @classmethod
+    def from_parameters(cls, parameters: Optional[Dict[str, Any]]) -> Optional['KeyReuse']:
+        """任务参数包含key_reuse时创建复用状态，否则返回None（每轮生成新密钥对）"""
+        options = (parameters or {}).get('key_reuse')
+        if options is None:
+            return None
+        if not isinstance(options, dict):
+            raise ValueError("key_reuse参数必须是对象")
+        return cls(**{key: options[key] for key in KEY_REUSE_OPTIONS if key in options})
+
+    def due(self) -> bool:
+        """本轮是否需要生成新的密钥对"""
+        return not self.valid or (self.interval > 0 and self.rounds >= self.interval)
+
+    def renewed(self):
+        """记录一次成功的密钥生成"""
+        self.valid = True
+        self.rounds = 0
+        self.keygens += 1
+
+    def invalidate(self):
+        """密钥生成失败，下一轮重新生成"""
+        self.valid = False
+
+    def reset(self):
+        """丢弃当前密钥对，下一轮重新生成（如消息大小扫描开始新的消息大小时），累计生成次数保留"""
+        self.valid = False
+        self.rounds = 0
+        self.public_key = None
+        self.secret_key = None
+
+    def used(self):
+        """记录当前密钥对完成了一轮操作"""
+        self.rounds += 1
+
+    def load(self, public_key, secret_key):
+        """将上一批次保存的密钥对复制到本批次的缓冲区"""
+        if self.valid and self.public_key is not None:
+            ctypes.memmove(public_key, self.public_key, len(self.public_key))
+            ctypes.memmove(secret_key, self.secret_key, len(self.secret_key))
+
+    def store(self, public_key, secret_key):
+        """批次结束时保存当前密钥对，供下一批次继续使用"""
+        if self.valid:
+            self.public_key = bytes(public_key)
+            self.secret_key = bytes(secret_key)
+
+    def describe(self) -> Dict[str, Any]:
+        """复用间隔和实际生成次数，记录到任务参数中"""
+        return {'interval': self.interval, 'keygens': self.keygens}
@@ -0,0 +1,65 @@
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+# 消息大小单位，按1024进位
+SIZE_UNITS = {'': 1, 'B': 1, 'KIB': 1024, 'KB': 1024, 'MIB': 1024 ** 2, 'MB': 1024 ** 2}
+_SIZE_PATTERN = re.compile(r'^\s*(\d+)\s*([A-Za-z]*)\s*$')
+_SIZE_SUFFIX_PATTERN = re.compile(r'^\d+(B|KiB|MiB)$')
+
+# 签名测试中随消息大小变化、按大小分别记录的耗时指标及对应的吞吐量指标（MB/s）
+SWEEP_METRICS = {
+    'sign_time': 'sign_mbps',
+    'verify_time': 'verify_mbps'
+}
+
+def parse_size(value: Any) -> int:
+    """解析消息大小，支持整数字节数或"32B"、"4KiB"、"1MiB"形式"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        size = value
+    elif isinstance(value, str):
+        match = _SIZE_PATTERN.match(value)
+        unit = match.group(2).upper() if match else None
+        if unit not in SIZE_UNITS:
+            raise ValueError(f"消息大小格式无效: {value}")
+        size = int(match.group(1)) * SIZE_UNITS[unit]
+    else:
+        raise ValueError(f"消息大小格式无效: {value}")
+    if size <= 0:
+        raise ValueError("消息大小必须为正数")
+    if size > settings.MAX_MESSAGE_SIZE:
+        raise ValueError(f"消息大小不能超过{settings.MAX_MESSAGE_SIZE}字节")
+    return size
+
+def parse_message_sizes(parameters: Optional[Dict[str, Any]]) -> Optional[List[int]]:
+    """读取任务参数中的message_sizes，未指定时返回None（使用固定的默认消息）"""
+    sizes = (parameters or {}).get('message_sizes')
+    if sizes is None:
+        return None
+    if not isinstance(sizes, list) or not sizes:
+        raise ValueError("message_sizes必须是非空的消息大小列表")
+    return sorted({parse_size(size) for size in sizes})
+
+def format_size(size: int) -> str:
+    """消息大小的指标后缀，如32B、4KiB、1MiB"""
+    for unit, factor in (('MiB', 1024 ** 2), ('KiB', 1024)):
+        if size % factor == 0:
+            return f"{size // factor}{unit}"
+    return f"{size}B"
+
+def sweep_metric(metric_name: str, size: int) -> str:
+    """按消息大小区分的指标名称，如sign_time_1KiB"""
+    return f"{metric_name}_{format_size(size)}"
+
+def sweep_base_metric(metric_name: str) -> Optional[str]:
+    """按消息大小区分的指标对应的原指标名称（如sign_time_1KiB对应sign_time），其他指标返回None"""
+    base, _, suffix = metric_name.rpartition('_')
+    if base in SWEEP_METRICS and _SIZE_SUFFIX_PATTERN.match(suffix):
+        return base
+    return None
+
+def random_message(size: int) -> bytearray:
+    """生成随机消息缓冲区，可写的bytearray可以零拷贝转换为ctypes数组"""
+    return bytearray(os.urandom(size))
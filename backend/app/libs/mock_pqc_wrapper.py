@@ -1,5 +1,6 @@
 import time
 import random
+from array import array
 from typing import Dict, List, Optional, Any
 
 class MockPQCWrapper:
@@ -15,6 +16,25 @@ class MockPQCWrapper:
         """获取支持的算法列表"""
         return self.supported_algorithms
     
+    def get_capability_index(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """获取模拟的算法能力索引"""
+        index = {"KEM": {}, "SIGNATURE": {}}
+        for name in self.supported_algorithms["KEM"]:
+            index["KEM"][name] = {
+                'method_name': name,
+                'alg_version': None,
+                'claimed_nist_level': self._get_nist_level(name),
+                **self._get_kem_sizes(name)
+            }
+        for name in self.supported_algorithms["SIGNATURE"]:
+            index["SIGNATURE"][name] = {
+                'method_name': name,
+                'alg_version': None,
+                'claimed_nist_level': self._get_nist_level(name),
+                **self._get_sig_sizes(name)
+            }
+        return index
+    
     def test_algorithm(self, algorithm_name: str, category: str, source: str) -> bool:
         """测试算法可用性"""
         if category == "KEM":
@@ -34,14 +54,7 @@ class MockPQCWrapper:
         base_decaps_time = 0.3
         
         # 不同算法有不同的基准时间
-        if "512" in algorithm_name:
-            multiplier = 1.0
-        elif "768" in algorithm_name:
-            multiplier = 1.5
-        elif "1024" in algorithm_name:
-            multiplier = 2.0
-        else:
-            multiplier = 1.0
+        multiplier = self._get_kem_multiplier(algorithm_name)
         
         # 添加随机变化（±20%）
         def add_variance(base_time):
@@ -75,24 +88,7 @@ class MockPQCWrapper:
         base_verify_time = 0.2
         
         # 不同算法有不同的性能特征
-        if "Dilithium" in algorithm_name:
-            if "2" in algorithm_name:
-                multiplier = 1.0
-            elif "3" in algorithm_name:
-                multiplier = 1.4
-            elif "5" in algorithm_name:
-                multiplier = 2.0
-            else:
-                multiplier = 1.0
-        elif "Falcon" in algorithm_name:
-            if "512" in algorithm_name:
-                multiplier = 0.8
-            elif "1024" in algorithm_name:
-                multiplier = 1.2
-            else:
-                multiplier = 1.0
-        else:
-            multiplier = 1.0
+        multiplier = self._get_sig_multiplier(algorithm_name)
         
         def add_variance(base_time):
             variance = random.uniform(0.8, 1.2)
@@ -114,6 +110,175 @@ class MockPQCWrapper:
             'signature_size': sizes['max_signature_size']
         }
     
+    def run_kem_batch(
+        self,
+        algorithm_name: str,
+        iterations: int,
+        library_name: Optional[str] = None,
+        timer=None,
+        key_reuse=None
+    ) -> Dict[str, Any]:
+        """模拟批量KEM算法测试（耗时为生成的模拟值，timer不参与计时）"""
+        if algorithm_name not in self.supported_algorithms["KEM"]:
+            raise Exception(f"不支持的KEM算法: {algorithm_name}")
+        
+        multiplier = self._get_kem_multiplier(algorithm_name)
+        
+        # 模拟实际测试时间
+        time.sleep(0.001)
+        
+        sizes = self._get_kem_sizes(algorithm_name)
+        
+        return {
+            'success': array('b', [1]) * iterations,
+            'keygen_time': self._simulate_keygen_times(0.5 * multiplier, iterations, key_reuse),
+            'encaps_time': self._simulate_times(0.3 * multiplier, iterations),
+            'decaps_time': self._simulate_times(0.3 * multiplier, iterations),
+            'public_key_size': sizes['public_key_size'],
+            'private_key_size': sizes['secret_key_size'],
+            'ciphertext_size': sizes['ciphertext_size']
+        }
+    
+    def run_signature_batch(
+        self,
+        algorithm_name: str,
+        iterations: int,
+        library_name: Optional[str] = None,
+        timer=None,
+        message: Optional[bytearray] = None,
+        key_reuse=None
+    ) -> Dict[str, Any]:
+        """模拟批量签名算法测试（耗时为生成的模拟值，timer不参与计时）
+        
+        签名和验证的模拟耗时随消息大小线性增加（每KiB约0.002毫秒的哈希开销）。
+        """
+        if algorithm_name not in self.supported_algorithms["SIGNATURE"]:
+            raise Exception(f"不支持的签名算法: {algorithm_name}")
+        
+        multiplier = self._get_sig_multiplier(algorithm_name)
+        hash_time = len(message) / 1024 * 0.002 if message is not None else 0.0
+        
+        # 模拟实际测试时间
+        time.sleep(0.001)
+        
+        sizes = self._get_sig_sizes(algorithm_name)
+        
+        return {
+            'success': array('b', [1]) * iterations,
+            'keygen_time': self._simulate_keygen_times(0.8 * multiplier, iterations, key_reuse),
+            'sign_time': self._simulate_times(0.6 * multiplier + hash_time, iterations),
+            'verify_time': self._simulate_times(0.2 * multiplier + hash_time, iterations),
+            'public_key_size': sizes['public_key_size'],
+            'private_key_size': sizes['secret_key_size'],
+            'signature_size': sizes['max_signature_size']
+        }
+    
+    def throughput_worker(
+        self,
+        category: str,
+        algorithm_name: str,
+        operation: str,
+        duration: float,
+        barrier,
+        library_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """模拟吞吐量测试的单个工作线程
+        
+        每次操作按模拟耗时休眠，休眠期间释放GIL，与真实C调用一样可以并发执行。
+        """
+        try:
+            if algorithm_name not in self.supported_algorithms.get(category, []):
+                raise Exception(f"不支持的算法: {algorithm_name}")
+            if category == "KEM":
+                multiplier = self._get_kem_multiplier(algorithm_name)
+                base_times = {'keygen': 0.5, 'encaps': 0.3, 'decaps': 0.3}
+                sizes = self._get_kem_sizes(algorithm_name)
+                size_metrics = {'ciphertext_size': sizes['ciphertext_size']}
+            else:
+                multiplier = self._get_sig_multiplier(algorithm_name)
+                base_times = {'keygen': 0.8, 'sign': 0.6, 'verify': 0.2}
+                sizes = self._get_sig_sizes(algorithm_name)
+                size_metrics = {'signature_size': sizes['max_signature_size']}
+            base_times['round'] = sum(base_times.values())
+            if operation not in base_times:
+                raise Exception(f"不支持的吞吐量测试操作: {operation}")
+            operation_time = base_times[operation] * multiplier / 1000
+        except Exception:
+            barrier.abort()
+            raise
+        
+        operations = 0
+        barrier.wait()
+        start = time.perf_counter()
+        deadline = start + duration
+        while True:
+            time.sleep(operation_time * random.uniform(0.8, 1.2))
+            operations += 1
+            if time.perf_counter() >= deadline:
+                break
+        
+        return {
+            'operations': operations,
+            'failures': 0,
+            'elapsed': time.perf_counter() - start,
+            'public_key_size': sizes['public_key_size'],
+            'private_key_size': sizes['secret_key_size'],
+            **size_metrics
+        }
+    
+    @staticmethod
+    def _simulate_times(base_time: float, iterations: int) -> array:
+        """生成带±20%随机变化的模拟耗时序列"""
+        return array('d', (base_time * random.uniform(0.8, 1.2) for _ in range(iterations)))
+    
+    @classmethod
+    def _simulate_keygen_times(cls, base_time: float, iterations: int, key_reuse=None) -> array:
+        """生成模拟的密钥生成耗时，复用密钥对时未生成密钥的轮次记为NaN"""
+        times = cls._simulate_times(base_time, iterations)
+        if key_reuse is not None:
+            for i in range(iterations):
+                if key_reuse.due():
+                    key_reuse.renewed()
+                else:
+                    times[i] = float('nan')
+                key_reuse.used()
+        return times
+    
+    def _get_kem_multiplier(self, algorithm_name: str) -> float:
+        """获取KEM算法的模拟耗时倍数"""
+        if "512" in algorithm_name:
+            return 1.0
+        elif "768" in algorithm_name:
+            return 1.5
+        elif "1024" in algorithm_name:
+            return 2.0
+        return 1.0
+    
+    def _get_sig_multiplier(self, algorithm_name: str) -> float:
+        """获取签名算法的模拟耗时倍数"""
+        if "Dilithium" in algorithm_name:
+            if "2" in algorithm_name:
+                return 1.0
+            elif "3" in algorithm_name:
+                return 1.4
+            elif "5" in algorithm_name:
+                return 2.0
+        elif "Falcon" in algorithm_name:
+            if "512" in algorithm_name:
+                return 0.8
+            elif "1024" in algorithm_name:
+                return 1.2
+        return 1.0
+    
+    def _get_nist_level(self, algorithm_name: str) -> int:
+        """获取算法声明的NIST安全级别"""
+        levels = {
+            "Kyber512": 1, "Kyber768": 3, "Kyber1024": 5,
+            "Dilithium2": 2, "Dilithium3": 3, "Dilithium5": 5,
+            "Falcon512": 1, "Falcon1024": 5
+        }
+        return levels.get(algorithm_name, 1)
+    
     def _get_kem_sizes(self, algorithm_name: str) -> Dict[str, int]:
         """获取KEM算法的密钥大小"""
         sizes = {
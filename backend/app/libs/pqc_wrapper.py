@@ -1,10 +1,85 @@
 import ctypes
+import functools
+import multiprocessing
 import os
 import platform
+import queue
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
 from app.core.config import settings
 from app.libs.mock_pqc_wrapper import MockPQCWrapper
+from app.libs.timing import Timer
+from app.libs.key_reuse import KeyReuse
+
+class OQS_KEM(ctypes.Structure):
+    """liboqs的OQS_KEM结构体
+
+    只声明需要读取的前缀字段，后续的函数指针成员不通过结构体访问。
+    """
+    _fields_ = [
+        ('method_name', ctypes.c_char_p),
+        ('alg_version', ctypes.c_char_p),
+        ('claimed_nist_level', ctypes.c_uint8),
+        ('ind_cca', ctypes.c_bool),
+        ('length_public_key', ctypes.c_size_t),
+        ('length_secret_key', ctypes.c_size_t),
+        ('length_ciphertext', ctypes.c_size_t),
+        ('length_shared_secret', ctypes.c_size_t)
+    ]
+
+class OQS_SIG(ctypes.Structure):
+    """liboqs的OQS_SIG结构体
+
+    新版本liboqs在euf_cma之后增加了若干bool字段，它们与claimed_nist_level
+    共处同一个8字节对齐单元，不影响后续长度字段的偏移。
+    """
+    _fields_ = [
+        ('method_name', ctypes.c_char_p),
+        ('alg_version', ctypes.c_char_p),
+        ('claimed_nist_level', ctypes.c_uint8),
+        ('euf_cma', ctypes.c_bool),
+        ('length_public_key', ctypes.c_size_t),
+        ('length_secret_key', ctypes.c_size_t),
+        ('length_signature', ctypes.c_size_t)
+    ]
+
+# 未执行的操作在耗时序列中记为NaN
+NAN = float('nan')
+
+# 未指定消息时签名测试使用的默认消息
+DEFAULT_MESSAGE = b"Hello, Post-Quantum Cryptography!"
+
+# 进程级算法描述符缓存，键为(类别, liboqs算法名)
+_descriptor_registry: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_descriptor_lock = threading.Lock()
+
+def _describe_kem(kem) -> Dict[str, Any]:
+    """从OQS_KEM实例读取算法描述信息"""
+    info = kem.contents
+    return {
+        'method_name': info.method_name.decode('utf-8') if info.method_name else None,
+        'alg_version': info.alg_version.decode('utf-8') if info.alg_version else None,
+        'claimed_nist_level': info.claimed_nist_level,
+        'public_key_size': info.length_public_key,
+        'secret_key_size': info.length_secret_key,
+        'ciphertext_size': info.length_ciphertext,
+        'shared_secret_size': info.length_shared_secret
+    }
+
+def _describe_sig(sig) -> Dict[str, Any]:
+    """从OQS_SIG实例读取算法描述信息"""
+    info = sig.contents
+    return {
+        'method_name': info.method_name.decode('utf-8') if info.method_name else None,
+        'alg_version': info.alg_version.decode('utf-8') if info.alg_version else None,
+        'claimed_nist_level': info.claimed_nist_level,
+        'public_key_size': info.length_public_key,
+        'secret_key_size': info.length_secret_key,
+        'max_signature_size': info.length_signature
+    }
 
 class PQCWrapper:
     """后量子密码算法C库封装类"""
@@ -14,6 +89,9 @@ class PQCWrapper:
         self.liboqs = None
         self.pqclean = None
         self.use_mock = use_mock
+        self._has_enumeration = False
+        self._capability_index: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None
+        self._capability_lock = threading.Lock()
         
         # 检测当前操作系统
         self.system = platform.system().lower()
@@ -82,17 +160,17 @@ class PQCWrapper:
         try:
             # KEM函数
             self.liboqs.OQS_KEM_new.argtypes = [ctypes.c_char_p]
-            self.liboqs.OQS_KEM_new.restype = ctypes.c_void_p
+            self.liboqs.OQS_KEM_new.restype = ctypes.POINTER(OQS_KEM)
             
             self.liboqs.OQS_KEM_keypair.argtypes = [
-                ctypes.c_void_p,  # kem
+                ctypes.POINTER(OQS_KEM),  # kem
                 ctypes.POINTER(ctypes.c_uint8),  # public_key
                 ctypes.POINTER(ctypes.c_uint8)   # secret_key
             ]
             self.liboqs.OQS_KEM_keypair.restype = ctypes.c_int
             
             self.liboqs.OQS_KEM_encaps.argtypes = [
-                ctypes.c_void_p,  # kem
+                ctypes.POINTER(OQS_KEM),  # kem
                 ctypes.POINTER(ctypes.c_uint8),  # ciphertext
                 ctypes.POINTER(ctypes.c_uint8),  # shared_secret
                 ctypes.POINTER(ctypes.c_uint8)   # public_key
@@ -100,29 +178,29 @@ class PQCWrapper:
             self.liboqs.OQS_KEM_encaps.restype = ctypes.c_int
             
             self.liboqs.OQS_KEM_decaps.argtypes = [
-                ctypes.c_void_p,  # kem
+                ctypes.POINTER(OQS_KEM),  # kem
                 ctypes.POINTER(ctypes.c_uint8),  # shared_secret
                 ctypes.POINTER(ctypes.c_uint8),  # ciphertext
                 ctypes.POINTER(ctypes.c_uint8)   # secret_key
             ]
             self.liboqs.OQS_KEM_decaps.restype = ctypes.c_int
             
-            self.liboqs.OQS_KEM_free.argtypes = [ctypes.c_void_p]
+            self.liboqs.OQS_KEM_free.argtypes = [ctypes.POINTER(OQS_KEM)]
             self.liboqs.OQS_KEM_free.restype = None
             
             # 签名函数
             self.liboqs.OQS_SIG_new.argtypes = [ctypes.c_char_p]
-            self.liboqs.OQS_SIG_new.restype = ctypes.c_void_p
+            self.liboqs.OQS_SIG_new.restype = ctypes.POINTER(OQS_SIG)
             
             self.liboqs.OQS_SIG_keypair.argtypes = [
-                ctypes.c_void_p,  # sig
+                ctypes.POINTER(OQS_SIG),  # sig
                 ctypes.POINTER(ctypes.c_uint8),  # public_key
                 ctypes.POINTER(ctypes.c_uint8)   # secret_key
             ]
             self.liboqs.OQS_SIG_keypair.restype = ctypes.c_int
             
             self.liboqs.OQS_SIG_sign.argtypes = [
-                ctypes.c_void_p,  # sig
+                ctypes.POINTER(OQS_SIG),  # sig
                 ctypes.POINTER(ctypes.c_uint8),  # signature
                 ctypes.POINTER(ctypes.c_size_t), # signature_len
                 ctypes.POINTER(ctypes.c_uint8),  # message
@@ -132,7 +210,7 @@ class PQCWrapper:
             self.liboqs.OQS_SIG_sign.restype = ctypes.c_int
             
             self.liboqs.OQS_SIG_verify.argtypes = [
-                ctypes.c_void_p,  # sig
+                ctypes.POINTER(OQS_SIG),  # sig
                 ctypes.POINTER(ctypes.c_uint8),  # message
                 ctypes.c_size_t,  # message_len
                 ctypes.POINTER(ctypes.c_uint8),  # signature
@@ -141,68 +219,138 @@ class PQCWrapper:
             ]
             self.liboqs.OQS_SIG_verify.restype = ctypes.c_int
             
-            self.liboqs.OQS_SIG_free.argtypes = [ctypes.c_void_p]
+            self.liboqs.OQS_SIG_free.argtypes = [ctypes.POINTER(OQS_SIG)]
             self.liboqs.OQS_SIG_free.restype = None
             
         except Exception as e:
             print(f"设置liboqs函数签名失败: {e}")
+        
+        try:
+            # 算法枚举函数（旧版本liboqs可能不提供）
+            self.liboqs.OQS_KEM_alg_count.argtypes = []
+            self.liboqs.OQS_KEM_alg_count.restype = ctypes.c_size_t
+            self.liboqs.OQS_KEM_alg_identifier.argtypes = [ctypes.c_size_t]
+            self.liboqs.OQS_KEM_alg_identifier.restype = ctypes.c_char_p
+            self.liboqs.OQS_KEM_alg_is_enabled.argtypes = [ctypes.c_char_p]
+            self.liboqs.OQS_KEM_alg_is_enabled.restype = ctypes.c_int
+            
+            self.liboqs.OQS_SIG_alg_count.argtypes = []
+            self.liboqs.OQS_SIG_alg_count.restype = ctypes.c_size_t
+            self.liboqs.OQS_SIG_alg_identifier.argtypes = [ctypes.c_size_t]
+            self.liboqs.OQS_SIG_alg_identifier.restype = ctypes.c_char_p
+            self.liboqs.OQS_SIG_alg_is_enabled.argtypes = [ctypes.c_char_p]
+            self.liboqs.OQS_SIG_alg_is_enabled.restype = ctypes.c_int
+            self._has_enumeration = True
+        except AttributeError as e:
+            print(f"[警告] liboqs未提供算法枚举函数，将使用内置算法列表: {e}")
+        
+        try:
+            self.liboqs.OQS_version.argtypes = []
+            self.liboqs.OQS_version.restype = ctypes.c_char_p
+        except AttributeError:
+            pass
+    
+    # 不提供枚举函数的旧版本liboqs使用的内置算法列表
+    _KNOWN_KEM_ALGORITHMS = [
+        "Kyber512", "Kyber768", "Kyber1024",
+        "NTRU-HPS-2048-509", "NTRU-HPS-2048-677", 
+        "NTRU-HRSS-701", "LightSaber-KEM", "Saber-KEM", "FireSaber-KEM"
+    ]
+    _KNOWN_SIG_ALGORITHMS = [
+        "Dilithium2", "Dilithium3", "Dilithium5",
+        "Falcon-512", "Falcon-1024", "SPHINCS+-Haraka-128f-robust",
+        "SPHINCS+-Haraka-128s-robust", "SPHINCS+-SHA256-128f-robust"
+    ]
     
     def get_supported_algorithms(self) -> Dict[str, List[str]]:
         """获取支持的算法列表"""
         if self.use_mock:
             return self.mock_wrapper.get_supported_algorithms()
         
-        algorithms = {
-            "KEM": [],
-            "SIGNATURE": []
-        }
+        index = self.get_capability_index()
+        return {category: list(algorithms) for category, algorithms in index.items()}
+    
+    def get_capability_index(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """获取算法能力索引
         
-        # 常见的liboqs KEM算法
-        kem_algorithms = [
-            "Kyber512", "Kyber768", "Kyber1024",
-            "NTRU-HPS-2048-509", "NTRU-HPS-2048-677", 
-            "NTRU-HRSS-701", "LightSaber-KEM", "Saber-KEM", "FireSaber-KEM"
-        ]
+        索引按类别和liboqs算法名保存每个可用算法的描述符（名称、版本、
+        安全级别和各项长度），首次调用时构建一次，之后的查询不再调用C库。
+        """
+        if self.use_mock:
+            return self.mock_wrapper.get_capability_index()
         
-        # 常见的liboqs签名算法
-        sig_algorithms = [
-            "Dilithium2", "Dilithium3", "Dilithium5",
-            "Falcon-512", "Falcon-1024", "SPHINCS+-Haraka-128f-robust",
-            "SPHINCS+-Haraka-128s-robust", "SPHINCS+-SHA256-128f-robust"
-        ]
+        if self._capability_index is None:
+            with self._capability_lock:
+                if self._capability_index is None:
+                    self._capability_index = self._build_capability_index()
+        return self._capability_index
+    
+    def get_library_info(self) -> Dict[str, Optional[str]]:
+        """获取当前使用的算法库信息"""
+        if self.use_mock:
+            return {'library': 'mock', 'version': None}
+        
+        version = None
+        if self.liboqs and hasattr(self.liboqs, 'OQS_version'):
+            raw_version = self.liboqs.OQS_version()
+            version = raw_version.decode('utf-8') if raw_version else None
+        return {'library': 'liboqs', 'version': version}
+    
+    def _build_capability_index(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """通过liboqs的枚举函数构建算法能力索引"""
+        index = {
+            "KEM": {},
+            "SIGNATURE": {}
+        }
+        if not self.liboqs:
+            return index
         
-        # 测试算法可用性
-        for alg in kem_algorithms:
-            if self._test_algorithm_available(alg, "KEM"):
-                algorithms["KEM"].append(alg)
+        if self._has_enumeration:
+            kem_algorithms = self._enumerate_algorithms(
+                self.liboqs.OQS_KEM_alg_count,
+                self.liboqs.OQS_KEM_alg_identifier,
+                self.liboqs.OQS_KEM_alg_is_enabled
+            )
+            sig_algorithms = self._enumerate_algorithms(
+                self.liboqs.OQS_SIG_alg_count,
+                self.liboqs.OQS_SIG_alg_identifier,
+                self.liboqs.OQS_SIG_alg_is_enabled
+            )
+        else:
+            kem_algorithms = self._KNOWN_KEM_ALGORITHMS
+            sig_algorithms = self._KNOWN_SIG_ALGORITHMS
         
-        for alg in sig_algorithms:
-            if self._test_algorithm_available(alg, "SIGNATURE"):
-                algorithms["SIGNATURE"].append(alg)
+        for category, names in (("KEM", kem_algorithms), ("SIGNATURE", sig_algorithms)):
+            for oqs_name in names:
+                try:
+                    index[category][oqs_name] = self._get_descriptor(category, oqs_name)
+                except Exception:
+                    # 已编译但无法实例化的算法视为不可用
+                    continue
         
-        return algorithms
+        print(f"[INFO] 算法能力索引构建完成: KEM {len(index['KEM'])}个, 签名 {len(index['SIGNATURE'])}个")
+        return index
+    
+    @staticmethod
+    def _enumerate_algorithms(alg_count, alg_identifier, alg_is_enabled) -> List[str]:
+        """枚举liboqs中已启用的算法名称"""
+        names = []
+        for i in range(alg_count()):
+            identifier = alg_identifier(i)
+            if identifier and alg_is_enabled(identifier):
+                names.append(identifier.decode('utf-8'))
+        return names
     
     def _test_algorithm_available(self, algorithm_name: str, category: str) -> bool:
-        """测试算法是否可用"""
+        """测试算法是否可用（查询能力索引）"""
         if not self.liboqs:
             return False
-            
-        try:
-            if category == "KEM":
-                kem_name = self._get_kem_name(algorithm_name)
-                kem = self.liboqs.OQS_KEM_new(kem_name.encode('utf-8'))
-                if kem:
-                    self.liboqs.OQS_KEM_free(kem)
-                    return True
-            elif category == "SIGNATURE":
-                sig_name = self._get_sig_name(algorithm_name)
-                sig = self.liboqs.OQS_SIG_new(sig_name.encode('utf-8'))
-                if sig:
-                    self.liboqs.OQS_SIG_free(sig)
-                    return True
-        except Exception:
-            pass
         
+        index = self.get_capability_index()
+        if category == "KEM":
+            return self._get_kem_name(algorithm_name) in index["KEM"]
+        elif category == "SIGNATURE":
+            return self._get_sig_name(algorithm_name) in index["SIGNATURE"]
         return False
     
     def _get_kem_name(self, algorithm_name: str) -> str:
@@ -241,10 +389,48 @@ class PQCWrapper:
         return self._test_algorithm_available(algorithm_name, category)
     
     def test_kem_algorithm(self, algorithm_name: str, library_name: Optional[str] = None) -> Dict[str, Any]:
-        """测试KEM算法性能"""
+        """测试KEM算法性能（单轮）"""
         if self.use_mock:
             return self.mock_wrapper.test_kem_algorithm(algorithm_name, library_name)
         
+        return self._single_round(self.run_kem_batch(algorithm_name, 1, library_name))
+    
+    def test_signature_algorithm(self, algorithm_name: str, library_name: Optional[str] = None) -> Dict[str, Any]:
+        """测试签名算法性能（单轮）"""
+        if self.use_mock:
+            return self.mock_wrapper.test_signature_algorithm(algorithm_name, library_name)
+        
+        return self._single_round(self.run_signature_batch(algorithm_name, 1, library_name))
+    
+    @staticmethod
+    def _single_round(batch: Dict[str, Any]) -> Dict[str, Any]:
+        """将批量测试结果转换为单轮测试结果格式"""
+        result = {}
+        for key, value in batch.items():
+            if isinstance(value, array):
+                result[key] = bool(value[0]) if key == 'success' else value[0]
+            else:
+                result[key] = value
+        return result
+    
+    def run_kem_batch(
+        self,
+        algorithm_name: str,
+        iterations: int,
+        library_name: Optional[str] = None,
+        timer: Optional[Timer] = None,
+        key_reuse: Optional[KeyReuse] = None
+    ) -> Dict[str, Any]:
+        """批量测试KEM算法性能
+        
+        KEM实例只创建一次，缓冲区预先分配并在各轮之间复用，
+        每轮的耗时（毫秒）保存在连续的array('d')中。
+        timer为空时不预热、不校准，逐次计时。
+        key_reuse为空时每轮生成新密钥对；否则只在密钥过期时生成，未生成密钥的轮次密钥生成耗时为NaN。
+        """
+        if self.use_mock:
+            return self.mock_wrapper.run_kem_batch(algorithm_name, iterations, library_name, timer, key_reuse)
+        
         if not self.liboqs:
             raise Exception("liboqs库未加载")
         
@@ -256,53 +442,76 @@ class PQCWrapper:
         
         try:
             # 获取密钥大小信息
-            # 注意：这里需要根据实际的liboqs结构体定义来获取大小信息
-            # 这是一个简化的示例实现
-            
-            # 模拟获取密钥大小（实际应该从C结构体中读取）
-            key_sizes = self._get_kem_sizes(algorithm_name)
+            key_sizes = self._get_kem_sizes(algorithm_name, kem)
+            shared_secret_size = key_sizes['shared_secret_size']
             
             public_key = (ctypes.c_uint8 * key_sizes['public_key_size'])()
             secret_key = (ctypes.c_uint8 * key_sizes['secret_key_size'])()
             ciphertext = (ctypes.c_uint8 * key_sizes['ciphertext_size'])()
-            shared_secret_enc = (ctypes.c_uint8 * key_sizes['shared_secret_size'])()
-            shared_secret_dec = (ctypes.c_uint8 * key_sizes['shared_secret_size'])()
-            
-            # 密钥生成测试
-            start_time = time.perf_counter()
-            result = self.liboqs.OQS_KEM_keypair(kem, public_key, secret_key)
-            keygen_time = (time.perf_counter() - start_time) * 1000  # 转换为毫秒
-            
-            if result != 0:
-                raise Exception("密钥生成失败")
-            
-            # 封装测试
-            start_time = time.perf_counter()
-            result = self.liboqs.OQS_KEM_encaps(kem, ciphertext, shared_secret_enc, public_key)
-            encaps_time = (time.perf_counter() - start_time) * 1000
-            
-            if result != 0:
-                raise Exception("封装失败")
-            
-            # 解封装测试
-            start_time = time.perf_counter()
-            result = self.liboqs.OQS_KEM_decaps(kem, shared_secret_dec, ciphertext, secret_key)
-            decaps_time = (time.perf_counter() - start_time) * 1000
-            
-            if result != 0:
-                raise Exception("解封装失败")
-            
-            # 验证共享密钥是否相同
-            shared_secret_match = all(
-                shared_secret_enc[i] == shared_secret_dec[i] 
-                for i in range(key_sizes['shared_secret_size'])
-            )
-            
+            shared_secret_enc = (ctypes.c_uint8 * shared_secret_size)()
+            shared_secret_dec = (ctypes.c_uint8 * shared_secret_size)()
+            
+            keygen_times = array('d', bytes(8 * iterations))
+            encaps_times = array('d', bytes(8 * iterations))
+            decaps_times = array('d', bytes(8 * iterations))
+            success = array('b', bytes(iterations))
+            
+            # 循环内只使用局部变量，减少属性查找开销
+            keypair = self.liboqs.OQS_KEM_keypair
+            encaps = self.liboqs.OQS_KEM_encaps
+            decaps = self.liboqs.OQS_KEM_decaps
+            keypair_args = (kem, public_key, secret_key)
+            encaps_args = (kem, ciphertext, shared_secret_enc, public_key)
+            decaps_args = (kem, shared_secret_dec, ciphertext, secret_key)
+            
+            timer = timer or Timer(warmup_rounds=0, calibrate=False)
+            
+            def warmup():
+                keypair(*keypair_args)
+                encaps(*encaps_args)
+                decaps(*decaps_args)
+            
+            timer.prepare(warmup, {
+                'keygen_time': (keypair, keypair_args),
+                'encaps_time': (encaps, encaps_args),
+                'decaps_time': (decaps, decaps_args)
+            })
+            measure = timer.measure
+            
+            # 间隔为1的复用状态等价于每轮生成新密钥对；预热之后再载入上一批次保存的密钥对
+            key_reuse = key_reuse or KeyReuse(interval=1)
+            key_reuse.load(public_key, secret_key)
+            
+            for i in range(iterations):
+                # 密钥生成测试（毫秒），复用的密钥对未过期时跳过
+                if key_reuse.due():
+                    keygen_times[i], keygen_result = measure('keygen_time', keypair, keypair_args)
+                    if keygen_result != 0:
+                        key_reuse.invalidate()
+                        continue
+                    key_reuse.renewed()
+                else:
+                    keygen_times[i] = NAN
+                key_reuse.used()
+                
+                # 封装测试
+                encaps_times[i], encaps_result = measure('encaps_time', encaps, encaps_args)
+                if encaps_result != 0:
+                    continue
+                
+                # 解封装测试
+                decaps_times[i], decaps_result = measure('decaps_time', decaps, decaps_args)
+                
+                # 验证共享密钥是否相同
+                if decaps_result == 0 and bytes(shared_secret_enc) == bytes(shared_secret_dec):
+                    success[i] = 1
+            
+            key_reuse.store(public_key, secret_key)
             return {
-                'success': shared_secret_match,
-                'keygen_time': keygen_time,
-                'encaps_time': encaps_time,
-                'decaps_time': decaps_time,
+                'success': success,
+                'keygen_time': keygen_times,
+                'encaps_time': encaps_times,
+                'decaps_time': decaps_times,
                 'public_key_size': key_sizes['public_key_size'],
                 'private_key_size': key_sizes['secret_key_size'],
                 'ciphertext_size': key_sizes['ciphertext_size']
@@ -311,10 +520,26 @@ class PQCWrapper:
         finally:
             self.liboqs.OQS_KEM_free(kem)
     
-    def test_signature_algorithm(self, algorithm_name: str, library_name: Optional[str] = None) -> Dict[str, Any]:
-        """测试签名算法性能"""
+    def run_signature_batch(
+        self,
+        algorithm_name: str,
+        iterations: int,
+        library_name: Optional[str] = None,
+        timer: Optional[Timer] = None,
+        message: Optional[bytearray] = None,
+        key_reuse: Optional[KeyReuse] = None
+    ) -> Dict[str, Any]:
+        """批量测试签名算法性能
+        
+        签名实例只创建一次，缓冲区预先分配并在各轮之间复用，
+        每轮的耗时（毫秒）保存在连续的array('d')中。
+        timer为空时不预热、不校准，逐次计时。
+        message为待签名的消息，bytearray直接作为C缓冲区使用，为空时使用固定的默认消息。
+        key_reuse为空时每轮生成新密钥对；否则只在密钥过期时生成，未生成密钥的轮次密钥生成耗时为NaN。
+        """
         if self.use_mock:
-            return self.mock_wrapper.test_signature_algorithm(algorithm_name, library_name)
+            return self.mock_wrapper.run_signature_batch(
+                algorithm_name, iterations, library_name, timer, message, key_reuse)
         
         if not self.liboqs:
             raise Exception("liboqs库未加载")
@@ -327,132 +552,371 @@ class PQCWrapper:
         
         try:
             # 获取密钥大小信息
-            key_sizes = self._get_sig_sizes(algorithm_name)
+            key_sizes = self._get_sig_sizes(algorithm_name, sig)
             
             public_key = (ctypes.c_uint8 * key_sizes['public_key_size'])()
             secret_key = (ctypes.c_uint8 * key_sizes['secret_key_size'])()
-            
-            # 密钥生成测试
-            start_time = time.perf_counter()
-            result = self.liboqs.OQS_SIG_keypair(sig, public_key, secret_key)
-            keygen_time = (time.perf_counter() - start_time) * 1000
-            
-            if result != 0:
-                raise Exception("密钥生成失败")
-            
-            # 准备要签名的消息
-            message = b"Hello, Post-Quantum Cryptography!"
-            message_array = (ctypes.c_uint8 * len(message)).from_buffer_copy(message)
-            
-            # 签名测试
             signature = (ctypes.c_uint8 * key_sizes['max_signature_size'])()
-            signature_len = ctypes.c_size_t(key_sizes['max_signature_size'])
-            
-            start_time = time.perf_counter()
-            result = self.liboqs.OQS_SIG_sign(
-                sig, signature, ctypes.byref(signature_len),
-                message_array, len(message), secret_key
-            )
-            sign_time = (time.perf_counter() - start_time) * 1000
-            
-            if result != 0:
-                raise Exception("签名失败")
-            
-            # 验证测试
-            start_time = time.perf_counter()
-            result = self.liboqs.OQS_SIG_verify(
-                sig, message_array, len(message),
-                signature, signature_len.value, public_key
-            )
-            verify_time = (time.perf_counter() - start_time) * 1000
-            
-            success = (result == 0)
-            
+            signature_len = ctypes.c_size_t(0)
+            signature_len_ref = ctypes.byref(signature_len)
+            
+            # 准备要签名的消息，调用方提供的缓冲区不复制
+            if message is None:
+                message = DEFAULT_MESSAGE
+            message_len = len(message)
+            if isinstance(message, bytearray):
+                message_array = (ctypes.c_uint8 * message_len).from_buffer(message)
+            else:
+                message_array = (ctypes.c_uint8 * message_len).from_buffer_copy(message)
+            
+            keygen_times = array('d', bytes(8 * iterations))
+            sign_times = array('d', bytes(8 * iterations))
+            verify_times = array('d', bytes(8 * iterations))
+            success = array('b', bytes(iterations))
+            
+            # 循环内只使用局部变量，减少属性查找开销
+            keypair = self.liboqs.OQS_SIG_keypair
+            sign = self.liboqs.OQS_SIG_sign
+            verify = self.liboqs.OQS_SIG_verify
+            keypair_args = (sig, public_key, secret_key)
+            sign_args = (sig, signature, signature_len_ref, message_array, message_len, secret_key)
+            
+            timer = timer or Timer(warmup_rounds=0, calibrate=False)
+            
+            def warmup():
+                keypair(*keypair_args)
+                sign(*sign_args)
+                verify(sig, message_array, message_len, signature, signature_len.value, public_key)
+            
+            timer.prepare(warmup, {
+                'keygen_time': (keypair, keypair_args),
+                'sign_time': (sign, sign_args),
+                'verify_time': (verify, (sig, message_array, message_len, signature, signature_len.value, public_key))
+            })
+            measure = timer.measure
+            
+            # 间隔为1的复用状态等价于每轮生成新密钥对；预热之后再载入上一批次保存的密钥对
+            key_reuse = key_reuse or KeyReuse(interval=1)
+            key_reuse.load(public_key, secret_key)
+            
+            for i in range(iterations):
+                # 密钥生成测试（毫秒），复用的密钥对未过期时跳过
+                if key_reuse.due():
+                    keygen_times[i], keygen_result = measure('keygen_time', keypair, keypair_args)
+                    if keygen_result != 0:
+                        key_reuse.invalidate()
+                        continue
+                    key_reuse.renewed()
+                else:
+                    keygen_times[i] = NAN
+                key_reuse.used()
+                
+                # 签名测试
+                sign_times[i], sign_result = measure('sign_time', sign, sign_args)
+                if sign_result != 0:
+                    continue
+                
+                # 验证测试
+                verify_times[i], verify_result = measure(
+                    'verify_time', verify, (sig, message_array, message_len, signature, signature_len.value, public_key))
+                
+                if verify_result == 0:
+                    success[i] = 1
+            
+            key_reuse.store(public_key, secret_key)
             return {
                 'success': success,
-                'keygen_time': keygen_time,
-                'sign_time': sign_time,
-                'verify_time': verify_time,
+                'keygen_time': keygen_times,
+                'sign_time': sign_times,
+                'verify_time': verify_times,
                 'public_key_size': key_sizes['public_key_size'],
                 'private_key_size': key_sizes['secret_key_size'],
-                'signature_size': signature_len.value
+                'signature_size': signature_len.value or key_sizes['max_signature_size']
             }
             
         finally:
             self.liboqs.OQS_SIG_free(sig)
     
-    def _get_kem_sizes(self, algorithm_name: str) -> Dict[str, int]:
-        """获取KEM算法的密钥大小（硬编码，实际应该从C库读取）"""
-        sizes = {
-            "Kyber512": {
-                'public_key_size': 800,
-                'secret_key_size': 1632,
-                'ciphertext_size': 768,
-                'shared_secret_size': 32
-            },
-            "Kyber768": {
-                'public_key_size': 1184,
-                'secret_key_size': 2400,
-                'ciphertext_size': 1088,
-                'shared_secret_size': 32
-            },
-            "Kyber1024": {
-                'public_key_size': 1568,
-                'secret_key_size': 3168,
-                'ciphertext_size': 1568,
-                'shared_secret_size': 32
-            }
+    def run_throughput(
+        self,
+        category: str,
+        algorithm_name: str,
+        operation: str,
+        concurrency: int,
+        duration: float,
+        library_name: Optional[str] = None,
+        use_processes: bool = False
+    ) -> Dict[str, Any]:
+        """吞吐量测试：在concurrency个线程（或进程）中并发执行同一操作，持续duration秒
+        
+        ctypes调用C函数时释放GIL，多个线程可以真正并行执行；
+        use_processes为True时每个工作进程各自加载C库。
+        各工作单元通过屏障同时开始计时，返回总吞吐量和每个工作单元的吞吐量（次/秒）。
+        """
+        if use_processes:
+            workers = self._run_throughput_processes(
+                category, algorithm_name, operation, concurrency, duration, library_name)
+        else:
+            barrier = threading.Barrier(concurrency)
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="throughput") as pool:
+                futures = [
+                    pool.submit(self.throughput_worker, category, algorithm_name, operation,
+                                duration, barrier, library_name)
+                    for _ in range(concurrency)
+                ]
+            errors = [future.exception() for future in futures if future.exception()]
+            if errors:
+                # 优先报告导致屏障中止的原始异常
+                raise next((e for e in errors if not isinstance(e, threading.BrokenBarrierError)), errors[0])
+            workers = [future.result() for future in futures]
+        
+        worker_ops_per_sec = [worker['operations'] / worker['elapsed'] for worker in workers]
+        result = {
+            'ops_per_sec': sum(worker_ops_per_sec),
+            'worker_ops_per_sec': worker_ops_per_sec,
+            'operations': sum(worker['operations'] for worker in workers),
+            'failures': sum(worker['failures'] for worker in workers)
         }
+        # 密钥、密文和签名大小
+        result.update({key: value for key, value in workers[0].items() if key.endswith('_size')})
+        return result
+    
+    def _run_throughput_processes(
+        self,
+        category: str,
+        algorithm_name: str,
+        operation: str,
+        concurrency: int,
+        duration: float,
+        library_name: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """在独立进程中执行吞吐量测试，屏障等待时间包含进程启动和加载C库的时间"""
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(concurrency, timeout=settings.THROUGHPUT_STARTUP_TIMEOUT)
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=_throughput_process,
+                args=(self.use_mock, category, algorithm_name, operation, duration, library_name, barrier, results),
+                daemon=True
+            )
+            for _ in range(concurrency)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            workers, errors = [], []
+            for _ in processes:
+                try:
+                    status, payload = results.get(timeout=settings.THROUGHPUT_STARTUP_TIMEOUT + duration * 2)
+                except queue.Empty:
+                    raise Exception("吞吐量测试进程未在规定时间内返回结果")
+                (workers if status == 'ok' else errors).append(payload)
+            if errors:
+                # 屏障被中止的进程没有错误信息，优先报告原始异常
+                raise Exception(f"吞吐量测试进程异常: {max(errors, key=bool)}")
+            return workers
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+    
+    def throughput_worker(
+        self,
+        category: str,
+        algorithm_name: str,
+        operation: str,
+        duration: float,
+        barrier,
+        library_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """吞吐量测试的单个工作单元
+        
+        使用独立的算法实例和缓冲区，等待屏障后循环执行操作直到时长结束，
+        返回完成次数、失败次数和实际耗时（秒）。
+        """
+        if self.use_mock:
+            return self.mock_wrapper.throughput_worker(
+                category, algorithm_name, operation, duration, barrier, library_name)
+        
+        instance = None
+        try:
+            if not self.liboqs:
+                raise Exception("liboqs库未加载")
+            if category == "KEM":
+                instance, free, step, sizes = self._prepare_kem_step(algorithm_name, operation)
+            elif category == "SIGNATURE":
+                instance, free, step, sizes = self._prepare_sig_step(algorithm_name, operation)
+            else:
+                raise Exception(f"不支持的算法类型: {category}")
+        except Exception:
+            # 其他工作单元不再等待屏障
+            barrier.abort()
+            raise
+        
+        try:
+            clock = time.perf_counter_ns
+            operations = 0
+            failures = 0
+            barrier.wait()
+            start = clock()
+            deadline = start + int(duration * 1e9)
+            while True:
+                if step() != 0:
+                    failures += 1
+                operations += 1
+                if clock() >= deadline:
+                    break
+            elapsed = (clock() - start) / 1e9
+        finally:
+            free(instance)
+        
+        return {'operations': operations, 'failures': failures, 'elapsed': elapsed, **sizes}
+    
+    def _prepare_kem_step(self, algorithm_name: str, operation: str):
+        """创建KEM实例和缓冲区，返回(实例, 释放函数, 单次操作, 大小指标)
+        
+        预先生成一组密钥和密文，封装和解封装可以直接重复执行。
+        """
+        kem = self.liboqs.OQS_KEM_new(self._get_kem_name(algorithm_name).encode('utf-8'))
+        if not kem:
+            raise Exception(f"无法创建KEM实例: {algorithm_name}")
+        key_sizes = self._get_kem_sizes(algorithm_name, kem)
+        public_key = (ctypes.c_uint8 * key_sizes['public_key_size'])()
+        secret_key = (ctypes.c_uint8 * key_sizes['secret_key_size'])()
+        ciphertext = (ctypes.c_uint8 * key_sizes['ciphertext_size'])()
+        shared_secret_enc = (ctypes.c_uint8 * key_sizes['shared_secret_size'])()
+        shared_secret_dec = (ctypes.c_uint8 * key_sizes['shared_secret_size'])()
         
-        return sizes.get(algorithm_name, {
-            'public_key_size': 1000,
-            'secret_key_size': 2000,
-            'ciphertext_size': 1000,
-            'shared_secret_size': 32
-        })
+        keygen = functools.partial(self.liboqs.OQS_KEM_keypair, kem, public_key, secret_key)
+        encaps = functools.partial(self.liboqs.OQS_KEM_encaps, kem, ciphertext, shared_secret_enc, public_key)
+        decaps = functools.partial(self.liboqs.OQS_KEM_decaps, kem, shared_secret_dec, ciphertext, secret_key)
+        steps = {
+            'keygen': keygen,
+            'encaps': encaps,
+            'decaps': decaps,
+            'round': lambda: keygen() | encaps() | decaps()
+        }
+        if operation not in steps or keygen() != 0 or encaps() != 0:
+            self.liboqs.OQS_KEM_free(kem)
+            raise Exception(f"无法准备KEM吞吐量测试: {algorithm_name} {operation}")
+        sizes = {
+            'public_key_size': key_sizes['public_key_size'],
+            'private_key_size': key_sizes['secret_key_size'],
+            'ciphertext_size': key_sizes['ciphertext_size']
+        }
+        return kem, self.liboqs.OQS_KEM_free, steps[operation], sizes
     
-    def _get_sig_sizes(self, algorithm_name: str) -> Dict[str, int]:
-        """获取签名算法的密钥大小（硬编码，实际应该从C库读取）"""
+    def _prepare_sig_step(self, algorithm_name: str, operation: str):
+        """创建签名实例和缓冲区，返回(实例, 释放函数, 单次操作, 大小指标)
+        
+        预先生成一组密钥和签名，签名和验证可以直接重复执行。
+        """
+        sig = self.liboqs.OQS_SIG_new(self._get_sig_name(algorithm_name).encode('utf-8'))
+        if not sig:
+            raise Exception(f"无法创建签名实例: {algorithm_name}")
+        key_sizes = self._get_sig_sizes(algorithm_name, sig)
+        public_key = (ctypes.c_uint8 * key_sizes['public_key_size'])()
+        secret_key = (ctypes.c_uint8 * key_sizes['secret_key_size'])()
+        signature = (ctypes.c_uint8 * key_sizes['max_signature_size'])()
+        signature_len = ctypes.c_size_t(0)
+        message_len = len(DEFAULT_MESSAGE)
+        message_array = (ctypes.c_uint8 * message_len).from_buffer_copy(DEFAULT_MESSAGE)
+        
+        verify_fn = self.liboqs.OQS_SIG_verify
+        keygen = functools.partial(self.liboqs.OQS_SIG_keypair, sig, public_key, secret_key)
+        sign = functools.partial(self.liboqs.OQS_SIG_sign, sig, signature, ctypes.byref(signature_len),
+                                 message_array, message_len, secret_key)
+        
+        def verify():
+            return verify_fn(sig, message_array, message_len, signature, signature_len.value, public_key)
+        
+        steps = {
+            'keygen': keygen,
+            'sign': sign,
+            'verify': verify,
+            'round': lambda: keygen() | sign() | verify()
+        }
+        if operation not in steps or keygen() != 0 or sign() != 0:
+            self.liboqs.OQS_SIG_free(sig)
+            raise Exception(f"无法准备签名吞吐量测试: {algorithm_name} {operation}")
         sizes = {
-            "Dilithium2": {
-                'public_key_size': 1312,
-                'secret_key_size': 2528,
-                'max_signature_size': 2420
-            },
-            "Dilithium3": {
-                'public_key_size': 1952,
-                'secret_key_size': 4000,
-                'max_signature_size': 3293
-            },
-            "Dilithium5": {
-                'public_key_size': 2592,
-                'secret_key_size': 4864,
-                'max_signature_size': 4595
-            },
-            "Falcon-512": {
-                'public_key_size': 897,
-                'secret_key_size': 1281,
-                'max_signature_size': 690
-            },
-            "Falcon512": {
-                'public_key_size': 897,
-                'secret_key_size': 1281,
-                'max_signature_size': 690
-            },
-            "Falcon-1024": {
-                'public_key_size': 1793,
-                'secret_key_size': 2305,
-                'max_signature_size': 1330
-            },
-            "Falcon1024": {
-                'public_key_size': 1793,
-                'secret_key_size': 2305,
-                'max_signature_size': 1330
-            }
+            'public_key_size': key_sizes['public_key_size'],
+            'private_key_size': key_sizes['secret_key_size'],
+            'signature_size': signature_len.value or key_sizes['max_signature_size']
         }
+        return sig, self.liboqs.OQS_SIG_free, steps[operation], sizes
+    
+    def _get_kem_sizes(self, algorithm_name: str, kem=None) -> Dict[str, Any]:
+        """获取KEM算法的密钥大小，从OQS_KEM结构体读取并按算法缓存"""
+        return self._get_descriptor("KEM", self._get_kem_name(algorithm_name), kem)
+    
+    def _get_sig_sizes(self, algorithm_name: str, sig=None) -> Dict[str, Any]:
+        """获取签名算法的密钥大小，从OQS_SIG结构体读取并按算法缓存"""
+        return self._get_descriptor("SIGNATURE", self._get_sig_name(algorithm_name), sig)
+    
+    def _get_descriptor(self, category: str, oqs_name: str, instance=None) -> Dict[str, Any]:
+        """获取算法描述符
+        
+        优先使用进程级缓存；未缓存时从传入的实例读取，
+        没有实例则临时创建一个实例读取后释放。
+        """
+        key = (category, oqs_name)
+        descriptor = _descriptor_registry.get(key)
+        if descriptor is not None:
+            return descriptor
+        
+        if not self.liboqs:
+            raise Exception("liboqs库未加载")
+        
+        if category == "KEM":
+            new, free, describe = self.liboqs.OQS_KEM_new, self.liboqs.OQS_KEM_free, _describe_kem
+        else:
+            new, free, describe = self.liboqs.OQS_SIG_new, self.liboqs.OQS_SIG_free, _describe_sig
         
-        return sizes.get(algorithm_name, {
-            'public_key_size': 1000,
-            'secret_key_size': 2000,
-            'max_signature_size': 2000
-        })
\ No newline at end of file
+        if instance is not None:
+            descriptor = describe(instance)
+        else:
+            instance = new(oqs_name.encode('utf-8'))
+            if not instance:
+                raise Exception(f"算法不可用: {oqs_name}")
+            try:
+                descriptor = describe(instance)
+            finally:
+                free(instance)
+        
+        with _descriptor_lock:
+            return _descriptor_registry.setdefault(key, descriptor)
+
+
+def _throughput_process(use_mock, category, algorithm_name, operation, duration, library_name, barrier, results):
+    """吞吐量测试工作进程入口，结果通过队列返回"""
+    try:
+        wrapper = get_pqc_wrapper(use_mock=use_mock)
+        results.put(('ok', wrapper.throughput_worker(
+            category, algorithm_name, operation, duration, barrier, library_name)))
+    except Exception as e:
+        barrier.abort()
+        results.put(('error', '' if isinstance(e, threading.BrokenBarrierError) else str(e)))
+
+# 进程级共享的封装器实例，按是否使用模拟模式区分
+_wrapper_instances: Dict[bool, PQCWrapper] = {}
+_wrapper_lock = threading.Lock()
+
+def get_pqc_wrapper(use_mock: bool = False) -> PQCWrapper:
+    """获取进程内共享的PQC封装器
+    
+    首次调用时才加载C库并设置函数签名，之后所有服务和工作进程内的调用
+    都复用同一个实例，避免在每个请求中重复查找和加载动态库。
+    """
+    wrapper = _wrapper_instances.get(use_mock)
+    if wrapper is not None:
+        return wrapper
+    
+    with _wrapper_lock:
+        wrapper = _wrapper_instances.get(use_mock)
+        if wrapper is None:
+            wrapper = PQCWrapper(use_mock=use_mock)
+            _wrapper_instances[use_mock] = wrapper
+        return wrapper
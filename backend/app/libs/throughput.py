@@ -0,0 +1,115 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.config import settings
+
+# 吞吐量测试支持的操作，round为一次完整的密钥生成和封装/签名流程
+THROUGHPUT_OPERATIONS = {
+    'KEM': ('keygen', 'encaps', 'decaps', 'round'),
+    'SIGNATURE': ('keygen', 'sign', 'verify', 'round')
+}
+WORKER_KINDS = ('threads', 'processes')
+
+# 任务参数throughput字段中可配置的选项
+THROUGHPUT_OPTIONS = ('duration', 'concurrency', 'operations', 'workers')
+
+def default_concurrency() -> List[int]:
+    """默认并发度：1到CPU核心数之间的2的幂，并包含核心数本身"""
+    cpu_count = os.cpu_count() or 1
+    levels = [1]
+    while levels[-1] * 2 <= cpu_count:
+        levels.append(levels[-1] * 2)
+    if levels[-1] != cpu_count:
+        levels.append(cpu_count)
+    return levels
+
+class ThroughputConfig:
+    """吞吐量测试配置
+
+    每个操作在各并发度下持续执行duration秒。并发度列表总是包含1，
+    作为计算扩展效率的单线程基准。
+    """
+
+    def __init__(
+        self,
+        duration: Optional[float] = None,
+        concurrency: Optional[Sequence[int]] = None,
+        operations: Optional[Sequence[str]] = None,
+        workers: str = 'threads'
+    ):
+        duration = settings.THROUGHPUT_DURATION if duration is None else duration
+        if isinstance(duration, bool) or not isinstance(duration, (int, float)) or duration <= 0:
+            raise ValueError("吞吐量测试时长必须为正数")
+        if duration > settings.THROUGHPUT_MAX_DURATION:
+            raise ValueError(f"吞吐量测试时长不能超过{settings.THROUGHPUT_MAX_DURATION}秒")
+
+        if concurrency is None:
+            concurrency = default_concurrency()
+        elif isinstance(concurrency, int) and not isinstance(concurrency, bool):
+            concurrency = [concurrency]
+        if not isinstance(concurrency, (list, tuple)) or not all(
+            isinstance(level, int) and not isinstance(level, bool) and level > 0 for level in concurrency
+        ):
+            raise ValueError("并发度必须是正整数或正整数列表")
+        if max(concurrency, default=1) > settings.THROUGHPUT_MAX_CONCURRENCY:
+            raise ValueError(f"并发度不能超过{settings.THROUGHPUT_MAX_CONCURRENCY}")
+
+        if operations is not None and (
+            not isinstance(operations, (list, tuple)) or not operations
+            or not all(isinstance(operation, str) for operation in operations)
+        ):
+            raise ValueError("operations必须是非空的操作名称列表")
+        known = {operation for names in THROUGHPUT_OPERATIONS.values() for operation in names}
+        unknown = sorted(set(operations or ()) - known)
+        if unknown:
+            raise ValueError(f"不支持的吞吐量测试操作: {', '.join(unknown)}")
+
+        if workers not in WORKER_KINDS:
+            raise ValueError(f"不支持的并发方式: {workers}，可选: {', '.join(WORKER_KINDS)}")
+
+        self.duration = float(duration)
+        self.concurrency = sorted(set(concurrency) | {1})
+        self.operations = list(dict.fromkeys(operations)) if operations else None
+        self.use_processes = workers == 'processes'
+
+    @classmethod
+    def from_parameters(cls, parameters: Optional[Dict[str, Any]]) -> Optional['ThroughputConfig']:
+        """任务参数mode为throughput时根据throughput字段创建配置，否则返回None"""
+        parameters = parameters or {}
+        mode = parameters.get('mode', 'latency')
+        if mode not in ('latency', 'throughput'):
+            raise ValueError(f"不支持的测试模式: {mode}")
+        if mode != 'throughput':
+            return None
+        options = parameters.get('throughput') or {}
+        if not isinstance(options, dict):
+            raise ValueError("throughput参数必须是对象")
+        return cls(**{key: options[key] for key in THROUGHPUT_OPTIONS if key in options})
+
+    def operations_for(self, category: str) -> List[str]:
+        """算法类别对应的测试操作，未指定时测试各单项操作"""
+        category = getattr(category, 'value', category)
+        supported = THROUGHPUT_OPERATIONS.get(category)
+        if supported is None:
+            raise ValueError(f"Unsupported algorithm type: {category}")
+        if self.operations is None:
+            return [operation for operation in supported if operation != 'round']
+        invalid = [operation for operation in self.operations if operation not in supported]
+        if invalid:
+            raise ValueError(f"{category}算法不支持吞吐量测试操作: {', '.join(invalid)}")
+        return self.operations
+
+    def describe(self, category: str) -> Dict[str, Any]:
+        """实际使用的吞吐量测试配置，记录到任务参数中"""
+        return {
+            'duration': self.duration,
+            'concurrency': self.concurrency,
+            'operations': self.operations_for(category),
+            'workers': 'processes' if self.use_processes else 'threads'
+        }
+
+def scaling_efficiency(ops_per_sec: float, concurrency: int, baseline: float) -> float:
+    """扩展效率（%）：并发吞吐量与单线程吞吐量线性放大值之比"""
+    if baseline <= 0:
+        return 0.0
+    return ops_per_sec / (baseline * concurrency) * 100
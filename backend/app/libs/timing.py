@@ -0,0 +1,163 @@
+import ctypes
+import ctypes.util
+import platform
+import time
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+# 支持的计时时钟：perf_counter为单调墙钟，thread_time只统计当前线程的CPU时间
+CLOCKS: Dict[str, Callable[[], int]] = {
+    'perf_counter': time.perf_counter_ns,
+    'thread_time': time.thread_time_ns
+}
+
+# 任务参数timing字段中可配置的选项
+TIMING_OPTIONS = ('clock', 'warmup_rounds', 'batch_size', 'calibrate')
+
+# 空调用目标函数地址，按需加载
+_null_target: Optional[int] = None
+_null_calls: Dict[Tuple[Any, ...], Any] = {}
+
+# 调用方清理栈、整型和指针参数按寄存器传递的64位平台，多传的参数不会影响被调用函数
+_NULL_CALL_MACHINES = ('x86_64', 'amd64', 'aarch64', 'arm64')
+
+def _load_null_target() -> Optional[int]:
+    """获取C库中abs函数的地址，作为空调用的目标
+
+    abs只读取第一个整型参数，在_NULL_CALL_MACHINES列出的平台上按C调用约定
+    多余参数被忽略，因此可以用与被测函数相同的参数签名调用它；其他平台不提供空调用。
+    """
+    global _null_target
+    if _null_target is None:
+        _null_target = 0
+        if platform.machine().lower() in _NULL_CALL_MACHINES and ctypes.sizeof(ctypes.c_void_p) == 8:
+            try:
+                if platform.system().lower() == 'windows':
+                    libc = ctypes.cdll.msvcrt
+                else:
+                    libc = ctypes.CDLL(ctypes.util.find_library('c'))
+                _null_target = ctypes.cast(libc.abs, ctypes.c_void_p).value or 0
+            except (OSError, AttributeError):
+                pass
+    return _null_target or None
+
+def _is_scalar_argtype(argtype: Any) -> bool:
+    """参数是否为整型或指针（按值传递的结构体和浮点数不经过整型寄存器，不能安全地转给abs）"""
+    if argtype in (ctypes.c_char_p, ctypes.c_wchar_p, ctypes.c_void_p):
+        return True
+    if isinstance(argtype, type) and issubclass(argtype, (ctypes._Pointer, ctypes._SimpleCData)):
+        return getattr(argtype, '_type_', None) not in ('f', 'd', 'g')
+    return False
+
+def null_call(argtypes: Optional[Sequence[Any]]):
+    """构造与被测函数参数签名相同的空调用，参数转换开销与真实调用一致
+
+    无法确认以该签名调用abs是安全的时返回None，此时不扣除调用开销。
+    """
+    argtypes = tuple(argtypes or ())
+    func = _null_calls.get(argtypes)
+    if func is None:
+        target = _load_null_target()
+        if target is None or not all(_is_scalar_argtype(argtype) for argtype in argtypes):
+            return None
+        func = _null_calls[argtypes] = ctypes.CFUNCTYPE(ctypes.c_int, *argtypes)(target)
+    return func
+
+class Timer:
+    """校准后的C库调用计时引擎
+
+    - 首次测量前执行warmup_rounds轮预热，结果丢弃；
+    - 用相同参数签名的空调用和相同的计时循环测量ctypes调用和计时本身的开销，
+      并从样本中扣除（无法安全构造空调用的平台或签名不扣除）；
+    - 每对时间戳之间连续执行batch_size次操作，样本为单次操作的平均耗时。
+    同一任务的各批次共用一个Timer，预热和校准只执行一次。
+    """
+
+    def __init__(
+        self,
+        clock: str = 'perf_counter',
+        warmup_rounds: Optional[int] = None,
+        batch_size: int = 1,
+        calibrate: Optional[bool] = None
+    ):
+        if clock not in CLOCKS:
+            raise ValueError(f"不支持的计时时钟: {clock}，可选: {', '.join(CLOCKS)}")
+        warmup_rounds = settings.BENCHMARK_WARMUP_ROUNDS if warmup_rounds is None else int(warmup_rounds)
+        batch_size = int(batch_size)
+        if warmup_rounds < 0:
+            raise ValueError("预热轮数不能为负数")
+        if batch_size < 1:
+            raise ValueError("批量计时的操作次数必须为正整数")
+
+        self.clock_name = clock
+        self.clock = CLOCKS[clock]
+        self.warmup_rounds = warmup_rounds
+        self.batch_size = batch_size
+        self.calibrate = settings.BENCHMARK_CALIBRATE if calibrate is None else bool(calibrate)
+        self.overhead_ns: Dict[str, float] = {}
+        self.prepared = False
+        self._ops = range(batch_size)
+
+    @classmethod
+    def from_parameters(cls, parameters: Optional[Dict[str, Any]]) -> 'Timer':
+        """根据任务参数中的timing字段创建计时器，已记录的校准数据被忽略"""
+        options = (parameters or {}).get('timing') or {}
+        if not isinstance(options, dict):
+            raise ValueError("timing参数必须是对象")
+        try:
+            return cls(**{key: options[key] for key in TIMING_OPTIONS if key in options})
+        except TypeError as e:
+            raise ValueError(f"timing参数无效: {str(e)}")
+
+    def prepare(self, warmup: Callable[[], Any], calls: Dict[str, Tuple[Callable, tuple]]):
+        """执行预热并校准各操作的空调用开销（只在首次调用时执行）
+
+        calls以指标名称为键，值为(被测函数, 调用参数)。
+        """
+        if self.prepared:
+            return
+        for _ in range(self.warmup_rounds):
+            warmup()
+        if self.calibrate:
+            for name, (func, args) in calls.items():
+                overhead = self._calibrate(func, args)
+                if overhead is not None:
+                    self.overhead_ns[name] = overhead
+        self.prepared = True
+
+    def _calibrate(self, func, args: tuple) -> Optional[float]:
+        """空调用单次操作耗时的中位数（纳秒），与measure使用同一个计时循环"""
+        null = null_call(getattr(func, 'argtypes', None))
+        if null is None:
+            return None
+        samples = sorted(
+            self._run_batch(null, args)[0] / self.batch_size
+            for _ in range(settings.BENCHMARK_CALIBRATION_SAMPLES)
+        )
+        return samples[len(samples) // 2]
+
+    def _run_batch(self, func, args: tuple) -> Tuple[int, int]:
+        """计时执行batch_size次调用，返回(耗时纳秒, 返回码按位或)"""
+        clock, ops = self.clock, self._ops
+        result = 0
+        start = clock()
+        for _ in ops:
+            result |= func(*args)
+        return clock() - start, result
+
+    def measure(self, name: str, func, args: tuple) -> Tuple[float, int]:
+        """计时执行batch_size次操作，返回(扣除开销后的单次耗时毫秒, 返回码按位或)"""
+        elapsed, result = self._run_batch(func, args)
+        return max(elapsed / self.batch_size - self.overhead_ns.get(name, 0.0), 0.0) / 1e6, result
+
+    def describe(self) -> Dict[str, Any]:
+        """计时模式和校准数据，记录到任务参数中"""
+        return {
+            'clock': self.clock_name,
+            'clock_resolution_ns': time.get_clock_info(self.clock_name).resolution * 1e9,
+            'warmup_rounds': self.warmup_rounds,
+            'batch_size': self.batch_size,
+            'calibrate': self.calibrate,
+            'overhead_ns': {name: round(value, 1) for name, value in self.overhead_ns.items()}
+        }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Float, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Float, Boolean, ForeignKey, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -43,14 +43,20 @@ class TestTask(Base):
     test_count = Column(Integer, default=100)  # 测试次数
     status = Column(Enum(TaskStatus), default=TaskStatus.PENDING)
     error_message = Column(Text)
+    host_metrics = Column(Text)  # JSON格式存储测试期间的主机负载
+    queued_at = Column(DateTime(timezone=True))  # 进入执行队列的时间
     started_at = Column(DateTime(timezone=True))
     finished_at = Column(DateTime(timezone=True))
+    results_version = Column(Integer, default=0)  # 结果或聚合每次变更时递增，用于分析缓存失效
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # 关系
     algorithm = relationship("Algorithm", back_populates="test_tasks")
     results = relationship("TestResult", back_populates="task", cascade="all, delete-orphan")
+    metric_aggregates = relationship("TaskMetricAggregate", back_populates="task", cascade="all, delete-orphan")
+    result_series = relationship("ResultSeries", back_populates="task", cascade="all, delete-orphan")
     reports = relationship("Report", back_populates="task", cascade="all, delete-orphan")
+    report_jobs = relationship("ReportJob", back_populates="task", cascade="all, delete-orphan")
 
 class TestResult(Base):
     """测试结果表"""
@@ -67,6 +73,49 @@ class TestResult(Base):
     # 关系
     task = relationship("TestTask", back_populates="results")
 
+class TaskMetricAggregate(Base):
+    """任务指标聚合表，写入结果时增量维护"""
+    __tablename__ = "task_metric_aggregates"
+    
+    task_id = Column(Integer, ForeignKey("test_tasks.id"), primary_key=True)
+    metric_name = Column(String(100), primary_key=True)  # 指标名称
+    unit = Column(String(20))  # 单位
+    count = Column(Integer, nullable=False, default=0)  # 样本数
+    total = Column(Float, nullable=False, default=0.0)  # 样本和
+    m2 = Column(Float, nullable=False, default=0.0)  # 离均差平方和
+    min_value = Column(Float)
+    max_value = Column(Float)
+    last_value = Column(Float)  # 最后写入的值
+    median = Column(Float)  # 以下分位数在任务结束时定稿
+    p95 = Column(Float)
+    p99 = Column(Float)
+    is_final = Column(Boolean, default=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # 关系
+    task = relationship("TestTask", back_populates="metric_aggregates")
+
+class ResultSeries(Base):
+    """测试结果序列表，按列压缩存储单个指标的逐轮样本"""
+    __tablename__ = "result_series"
+    __table_args__ = (
+        Index("idx_series_task_metric", "task_id", "metric_name", "segment", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("test_tasks.id"), nullable=False)
+    metric_name = Column(String(100), nullable=False)  # 指标名称
+    segment = Column(Integer, nullable=False, default=0)  # 分段序号，每次刷新追加一段
+    unit = Column(String(20))  # 单位
+    dtype = Column(String(10), nullable=False, default="float64")  # 样本存储类型
+    count = Column(Integer, nullable=False, default=0)  # 样本数
+    data = Column(LargeBinary(length=2**32 - 1), nullable=False)  # 压缩后的样本值
+    rounds = Column(LargeBinary(length=2**32 - 1))  # 压缩后的测试轮次
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # 关系
+    task = relationship("TestTask", back_populates="result_series")
+
 class Report(Base):
     """报告记录表"""
     __tablename__ = "reports"
@@ -80,4 +129,22 @@ class Report(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # 关系
-    task = relationship("TestTask", back_populates="reports")
\ No newline at end of file
+    task = relationship("TestTask", back_populates="reports")
+    jobs = relationship("ReportJob", back_populates="report")
+
+class ReportJob(Base):
+    """报告生成任务表"""
+    __tablename__ = "report_jobs"
+    
+    id = Column(String(32), primary_key=True)  # 报告生成任务ID
+    task_id = Column(Integer, ForeignKey("test_tasks.id"), nullable=False)
+    report_type = Column(String(10), nullable=False)  # pdf 或 csv
+    status = Column(Enum(TaskStatus), default=TaskStatus.PENDING)
+    report_id = Column(Integer, ForeignKey("reports.id"))  # 生成完成的报告
+    error_message = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    
+    # 关系
+    task = relationship("TestTask", back_populates="report_jobs")
+    report = relationship("Report", back_populates="jobs")
\ No newline at end of file
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
+import json
 
 class AlgorithmCategory(str, Enum):
     KEM = "KEM"
@@ -67,8 +68,16 @@ class TestTask(TestTaskBase):
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
     created_at: datetime
+    host_metrics: Optional[Dict[str, Any]] = Field(None, description="测试期间的主机负载")
     algorithm: Algorithm
     
+    # 数据库中以JSON文本存储的字段
+    @validator('parameters', 'host_metrics', pre=True)
+    def parse_json_text(cls, value):
+        if isinstance(value, str):
+            return json.loads(value) if value else None
+        return value
+    
     class Config:
         orm_mode = True
 
@@ -84,12 +93,16 @@ class TestResultCreate(TestResultBase):
     pass
 
 class TestResult(TestResultBase):
-    id: int
+    id: Optional[int] = Field(None, description="结果ID，压缩序列中的样本没有独立ID")
     created_at: datetime
     
     class Config:
         orm_mode = True
 
+class TestResultPage(BaseModel):
+    items: List[TestResult] = Field(..., description="本页结果")
+    next_cursor: Optional[str] = Field(None, description="下一页游标，为空表示没有更多数据")
+
 # 报告相关模式
 class ReportBase(BaseModel):
     task_id: int = Field(..., description="任务ID")
@@ -108,6 +121,16 @@ class Report(ReportBase):
     class Config:
         orm_mode = True
 
+class ReportJob(BaseModel):
+    job_id: str = Field(..., description="报告生成任务ID")
+    task_id: int = Field(..., description="测试任务ID")
+    report_type: str = Field(..., description="报告类型")
+    status: TaskStatus = Field(..., description="生成状态")
+    report: Optional[Report] = Field(None, description="生成完成的报告")
+    error_message: Optional[str] = Field(None, description="错误信息")
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
 # 算法验证相关模式
 class AlgorithmValidationRequest(BaseModel):
     name: str = Field(..., description="算法名称")
@@ -122,6 +145,23 @@ class AlgorithmValidationResponse(BaseModel):
     suggestions: Optional[List[str]] = Field(None, description="改进建议")
     warnings: Optional[List[str]] = Field(None, description="警告信息")
 
+# 算法能力相关模式
+class AlgorithmCapability(BaseModel):
+    name: str = Field(..., description="算法库中的算法标识")
+    category: AlgorithmCategory = Field(..., description="算法类别")
+    alg_version: Optional[str] = Field(None, description="算法实现版本")
+    claimed_nist_level: Optional[int] = Field(None, description="声明的NIST安全级别")
+    public_key_size: int = Field(..., description="公钥长度(字节)")
+    secret_key_size: int = Field(..., description="私钥长度(字节)")
+    ciphertext_size: Optional[int] = Field(None, description="密文长度(字节)")
+    shared_secret_size: Optional[int] = Field(None, description="共享密钥长度(字节)")
+    max_signature_size: Optional[int] = Field(None, description="最大签名长度(字节)")
+
+class AlgorithmCapabilitiesResponse(BaseModel):
+    library: str = Field(..., description="算法库名称")
+    version: Optional[str] = Field(None, description="算法库版本")
+    algorithms: List[AlgorithmCapability] = Field(..., description="可用算法列表")
+
 # 通用响应模式
 class MessageResponse(BaseModel):
     message: str
@@ -3,7 +3,8 @@ from typing import List, Optional
 import logging
 from app.models.models import Algorithm
 from app.models import schemas
-from app.libs.pqc_wrapper import PQCWrapper
+from app.db.database import AsyncDatabase
+from app.libs.pqc_wrapper import get_pqc_wrapper
 from app.core.config import settings
 
 # 配置日志
@@ -17,15 +18,12 @@ class AlgorithmService:
     def __init__(self, db: Session):
         self.db = db
         try:
-            # 使用配置中的设置初始化PQC包装器
-            self.pqc_wrapper = PQCWrapper(
-                use_mock=settings.USE_MOCK_MODE
-            )
-            logger.info(f"PQC包装器初始化成功，模式: {'模拟' if settings.USE_MOCK_MODE else '真实'}")
+            # 使用进程内共享的PQC包装器
+            self.pqc_wrapper = get_pqc_wrapper(use_mock=settings.USE_MOCK_MODE)
         except Exception as e:
             logger.error(f"PQC包装器初始化失败: {str(e)}")
-            # 即使初始化失败，也要创建一个模拟模式的包装器以确保服务可用
-            self.pqc_wrapper = PQCWrapper(use_mock=True)
+            # 即使初始化失败，也要使用模拟模式的包装器以确保服务可用
+            self.pqc_wrapper = get_pqc_wrapper(use_mock=True)
 
     def get_algorithms(
         self, 
@@ -271,6 +269,24 @@ class AlgorithmService:
             # 返回空的支持列表，确保服务不会崩溃
             return {"KEM": [], "SIGNATURE": []}
     
+    def get_algorithm_capabilities(self, category: Optional[str] = None) -> schemas.AlgorithmCapabilitiesResponse:
+        """获取算法能力索引"""
+        try:
+            index = self.pqc_wrapper.get_capability_index()
+            algorithms = [
+                schemas.AlgorithmCapability(name=name, category=alg_category, **descriptor)
+                for alg_category, entries in index.items()
+                if category is None or alg_category == category
+                for name, descriptor in entries.items()
+            ]
+            return schemas.AlgorithmCapabilitiesResponse(
+                **self.pqc_wrapper.get_library_info(),
+                algorithms=algorithms
+            )
+        except Exception as e:
+            logger.error(f"获取算法能力索引失败: {str(e)}")
+            raise
+    
     def validate_algorithm_config(self, validation_request: schemas.AlgorithmValidationRequest) -> schemas.AlgorithmValidationResponse:
         """验证算法配置是否正确"""
         try:
@@ -468,4 +484,33 @@ class AlgorithmService:
             return created_algorithms
         except Exception as e:
             logger.error(f"默认算法初始化过程异常: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+
+class AsyncAlgorithmService:
+    """AlgorithmService读接口的异步版本，返回值在会话内转换为响应模型"""
+
+    def __init__(self, db: AsyncDatabase):
+        self.db = db
+
+    async def get_algorithms(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        category: Optional[str] = None,
+        is_active: Optional[bool] = True
+    ) -> List[schemas.Algorithm]:
+        def load(session: Session):
+            algorithms = AlgorithmService(session).get_algorithms(
+                skip=skip, limit=limit, category=category, is_active=is_active
+            )
+            return [schemas.Algorithm.from_orm(algorithm) for algorithm in algorithms]
+        return await self.db.run(load)
+
+    async def get_algorithm(self, algorithm_id: int) -> Optional[schemas.Algorithm]:
+        def load(session: Session):
+            algorithm = AlgorithmService(session).get_algorithm(algorithm_id)
+            return schemas.Algorithm.from_orm(algorithm) if algorithm else None
+        return await self.db.run(load)
+
+    async def get_algorithm_capabilities(self, category: Optional[str] = None) -> schemas.AlgorithmCapabilitiesResponse:
+        return await self.db.run(lambda session: AlgorithmService(session).get_algorithm_capabilities(category))
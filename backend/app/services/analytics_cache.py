@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+class CacheEntry(NamedTuple):
+    value: Any
+    etag: str
+
+class AnalyticsCache:
+    """已完成任务的分析结果缓存
+
+    任务完成后结果不再变化，摘要、性能指标、分布和降采样序列按
+    (task_id, 版本, 类型, 参数)缓存：进程内为有界LRU，配置ANALYTICS_CACHE_DIR后
+    同时写入磁盘，供其他进程（如执行引擎工作进程预热的结果）和重启后复用。
+    版本由任务的创建和完成时间生成，任务ID在删除后被重用时不会命中旧任务的缓存。
+    缓存值为JSON兼容数据，ETag由版本和内容哈希生成。
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries or settings.ANALYTICS_CACHE_SIZE
+        self.cache_dir = cache_dir if cache_dir is not None else settings.ANALYTICS_CACHE_DIR
+        self._entries: "OrderedDict[tuple, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def persistent(self) -> bool:
+        return bool(self.cache_dir)
+
+    @staticmethod
+    def _key(task_id: int, version: str, kind: str, params: Dict[str, Any]) -> tuple:
+        return (task_id, kind, version) + tuple(sorted(params.items()))
+
+    def _path(self, key: tuple) -> str:
+        task_id, kind = key[0], key[1]
+        suffix = hashlib.sha1(repr(key[2:]).encode()).hexdigest()[:12]
+        return os.path.join(self.cache_dir, str(task_id), f"{kind}-{suffix}.json")
+
+    def get(self, task_id: int, version: Optional[str], kind: str, **params) -> Optional[CacheEntry]:
+        """读取缓存，内存未命中时尝试磁盘；version为None（任务未完成）时不读取缓存"""
+        if version is None:
+            return None
+        key = self._key(task_id, version, kind, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if not self.persistent:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to read analytics cache for task %d (%s): %s", task_id, kind, str(e))
+            return None
+        entry = CacheEntry(stored["value"], stored["etag"])
+        self._remember(key, entry)
+        return entry
+
+    def put(self, task_id: int, version: str, kind: str, value: Any, **params) -> CacheEntry:
+        """写入缓存，返回带ETag的缓存项"""
+        value = jsonable_encoder(value)
+        body = json.dumps(value, sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(f"{task_id}:{version}:".encode() + body.encode()).hexdigest()[:32]
+        entry = CacheEntry(value, f'"{digest}"')
+        key = self._key(task_id, version, kind, params)
+        self._remember(key, entry)
+
+        if self.persistent:
+            path = self._path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"etag": entry.etag, "value": value}, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning("Failed to write analytics cache for task %d (%s): %s", task_id, kind, str(e))
+        return entry
+
+    def get_or_compute(
+        self,
+        task_id: int,
+        kind: str,
+        compute: Callable[[], Any],
+        version: Callable[[], Optional[str]],
+        **params
+    ) -> Any:
+        """命中时返回缓存值，否则计算
+
+        version返回任务的缓存版本（任务未完成时为None）。计算前后各读取一次，
+        只有计算前任务已完成且计算后版本不变时才写入缓存，
+        计算期间任务结束时得到的部分结果不会被缓存。
+        """
+        cache_version = version()
+        entry = self.get(task_id, cache_version, kind, **params)
+        if entry is not None:
+            return entry.value
+        value = compute()
+        if value is not None and cache_version is not None and version() == cache_version:
+            return self.put(task_id, cache_version, kind, value, **params).value
+        return value
+
+    def _remember(self, key: tuple, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, task_id: int):
+        """清除任务的全部缓存（结果或任务被删除时调用）"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == task_id]:
+                del self._entries[key]
+        if self.persistent:
+            shutil.rmtree(os.path.join(self.cache_dir, str(task_id)), ignore_errors=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# 进程级共享的分析结果缓存
+analytics_cache = AnalyticsCache()
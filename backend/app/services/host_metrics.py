@@ -0,0 +1,119 @@
+from collections import deque
+from typing import Any, Dict, List, Optional
+import threading
+import logging
+import platform
+import time
+
+from app.core.config import settings
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+except ImportError:  # psutil为可选依赖，缺失时不采样
+    psutil = None
+
+class HostMetricsSampler:
+    """主机负载采样器
+
+    后台线程按固定间隔采集CPU、内存和磁盘使用率并写入环形缓冲区。
+    CPU使用率使用非阻塞的psutil.cpu_percent(interval=None)，
+    即两次采样之间的平均值，读取方不再需要同步等待。
+    """
+
+    def __init__(self, interval: Optional[float] = None, capacity: Optional[int] = None):
+        self.interval = interval or settings.HOST_METRICS_INTERVAL
+        self._samples: deque = deque(maxlen=capacity or settings.HOST_METRICS_CAPACITY)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._disk_path = 'C:\\' if platform.system() == 'Windows' else '/'
+
+    @property
+    def available(self) -> bool:
+        return psutil is not None
+
+    def start(self):
+        """启动后台采样线程"""
+        if not self.available or (self._thread and self._thread.is_alive()):
+            return
+        # 第一次调用只建立CPU时间基准
+        psutil.cpu_percent(interval=None)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="host-metrics-sampler", daemon=True)
+        self._thread.start()
+        logger.info("Host metrics sampler started with interval %.1fs", self.interval)
+
+    def stop(self):
+        """停止后台采样线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning("Failed to sample host metrics: %s", str(e))
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        """立即采集一次并写入缓冲区（非阻塞）"""
+        if not self.available:
+            return None
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self._disk_path)
+        sample = {
+            'timestamp': time.time(),
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_percent': memory.percent,
+            'memory_available': memory.available,
+            'disk_percent': disk.used / disk.total * 100 if disk.total else 0.0
+        }
+        with self._lock:
+            self._samples.append(sample)
+        return sample
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """获取最近一次采样"""
+        with self._lock:
+            return dict(self._samples[-1]) if self._samples else None
+
+    def window(self, start: float, end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """获取时间窗口内的采样"""
+        end = end or time.time()
+        with self._lock:
+            return [dict(s) for s in self._samples if start <= s['timestamp'] <= end]
+
+    def summarize(self, start: float, end: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """汇总时间窗口内的主机负载
+
+        结束时额外采集一次，使短于采样间隔的窗口也至少包含一个样本。
+        """
+        if not self.available:
+            return None
+        end = end or time.time()
+        samples = self.window(start, end)
+        final_sample = self.sample()
+        if final_sample:
+            samples.append(final_sample)
+
+        cpu = [s['cpu_percent'] for s in samples]
+        memory = [s['memory_percent'] for s in samples]
+        return {
+            'samples': len(samples),
+            'window_start': start,
+            'window_end': end,
+            'cpu_percent_avg': sum(cpu) / len(cpu),
+            'cpu_percent_max': max(cpu),
+            'memory_percent_avg': sum(memory) / len(memory),
+            'memory_percent_max': max(memory),
+            'memory_available_min': min(s['memory_available'] for s in samples),
+            'disk_percent': samples[-1]['disk_percent']
+        }
+
+# 进程级共享的主机负载采样器
+host_metrics_sampler = HostMetricsSampler()
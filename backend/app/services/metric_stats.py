@@ -0,0 +1,152 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.models import TestResult
+from app.services import result_series
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 报告和接口中统一使用的分位数（百分比）
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+def percentile_key(q: float) -> str:
+    """分位数在结果字典中的键名，如 p99、p99_9"""
+    return 'p' + f"{q:g}".replace('.', '_')
+
+def to_array(values: Optional[Iterable[float]]) -> np.ndarray:
+    """将样本转换为float64数组，array('d')等缓冲区对象零拷贝转换"""
+    if values is None:
+        return np.empty(0, dtype=np.float64)
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False)
+    try:
+        return np.frombuffer(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.fromiter(values, dtype=np.float64)
+
+def load_metric_values(db: Session, task_id: int, metric_name: str) -> np.ndarray:
+    """按写入顺序将任务某个指标的样本列直接读取为NumPy数组
+
+    同时读取test_results中的行和result_series中的压缩序列。
+    """
+    result = db.execute(
+        select(TestResult.value).where(
+            TestResult.task_id == task_id,
+            TestResult.metric_name == metric_name
+        ).order_by(TestResult.id)
+    )
+    values = np.fromiter(result.scalars(), dtype=np.float64)
+    series = result_series.load_series(db, task_id, metric_name).get(metric_name)
+    if series is not None:
+        values = np.concatenate([values, series])
+    return values
+
+def load_metric_series(db: Session, task_id: int, metric_name: str) -> Tuple[np.ndarray, np.ndarray]:
+    """读取任务某个指标的(测试轮次, 样本值)序列，缺少轮次的样本按写入位置编号"""
+    rows = db.execute(
+        select(TestResult.test_round, TestResult.value).where(
+            TestResult.task_id == task_id,
+            TestResult.metric_name == metric_name
+        ).order_by(TestResult.id)
+    ).all()
+    rounds = [np.array([row[0] if row[0] is not None else np.nan for row in rows], dtype=np.float64)]
+    values = [np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))]
+    for _, series_values, series_rounds in result_series.iter_segments(db, [task_id], metric_name):
+        values.append(series_values)
+        rounds.append(series_rounds.astype(np.float64) if series_rounds is not None
+                      else np.full(series_values.size, np.nan))
+
+    x, y = np.concatenate(rounds), np.concatenate(values)
+    missing = np.isnan(x)
+    if missing.any():
+        x[missing] = np.flatnonzero(missing) + 1
+    return x, y
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """最大三角形三桶（LTTB）降采样，保留曲线的视觉形状
+
+    桶之间的选点依赖上一个选中点，按桶循环；桶内面积计算向量化。
+    """
+    n = y.size
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    every = (n - 2) / (threshold - 2)
+    edges = (np.arange(threshold) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < threshold - 1 else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return x[selected], y[selected]
+
+def minmax_downsample(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """最小/最大值分桶降采样：每个桶保留最小值和最大值，不丢失尖峰"""
+    n = y.size
+    buckets = threshold // 2
+    if threshold >= n or buckets < 1:
+        return x, y
+
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    selected = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        window = y[start:end]
+        low, high = start + int(window.argmin()), start + int(window.argmax())
+        selected.extend(sorted({low, high}))
+    selected = np.asarray(selected, dtype=np.int64)
+    return x[selected], y[selected]
+
+# 支持的降采样方法
+DOWNSAMPLERS = {
+    'lttb': lttb,
+    'minmax': minmax_downsample
+}
+
+def describe(values: Iterable[float], percentiles: Tuple[float, ...] = PERCENTILES) -> Dict[str, Any]:
+    """一次向量化计算样本的描述统计
+
+    返回数量、均值、样本标准差、最值、中位数、各分位数和中位数绝对偏差（MAD）。
+    """
+    data = to_array(values)
+    if data.size == 0:
+        return {'count': 0}
+
+    quantiles = np.percentile(data, (50,) + tuple(percentiles))
+    median = float(quantiles[0])
+    stats = {
+        'count': int(data.size),
+        'mean': float(data.mean()),
+        'std': float(data.std(ddof=1)) if data.size > 1 else 0.0,
+        'min': float(data.min()),
+        'max': float(data.max()),
+        'median': median,
+        'mad': float(np.median(np.abs(data - median)))
+    }
+    for q, value in zip(percentiles, quantiles[1:]):
+        stats[percentile_key(q)] = float(value)
+    return stats
+
+def histogram(values: Iterable[float], bins: int = 20) -> Dict[str, List[float]]:
+    """计算等宽直方图，所有样本相同时退化为单个区间"""
+    data = to_array(values)
+    if data.size == 0:
+        return {}
+    low, high = float(data.min()), float(data.max())
+    if low == high:
+        return {'bins': [low], 'counts': [int(data.size)]}
+    counts, edges = np.histogram(data, bins=bins, range=(low, high))
+    return {'bin_edges': edges.tolist(), 'counts': counts.tolist()}
@@ -0,0 +1,156 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import asyncio
+import multiprocessing
+import threading
+import logging
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 任务结束状态
+TERMINAL_STATUSES = ("COMPLETED", "FAILED")
+
+class ProgressBus:
+    """任务进度总线
+
+    在API进程内存中保存每个任务的最新状态快照（状态、已完成轮数、进度等），
+    供状态查询接口和SSE/WebSocket推送使用，查询进度不再访问数据库。
+    执行引擎的工作进程通过跨进程队列发布进度，由API进程的监听线程汇总。
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._snapshots: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._subscribers: Dict[int, List[tuple]] = {}
+        self._lock = threading.Lock()
+        # 工作进程中指向API进程的队列；API进程中为None
+        self._remote_queue = None
+        self._listener_queue = None
+        self._listener: Optional[threading.Thread] = None
+
+    def publish(self, task_id: int, **fields) -> Optional[Dict[str, Any]]:
+        """发布任务状态更新，未提供的字段沿用上一次的快照"""
+        if self._remote_queue is not None:
+            try:
+                self._remote_queue.put_nowait((task_id, fields))
+            except Exception as e:
+                logger.warning("Failed to publish progress for task %d: %s", task_id, str(e))
+            return None
+        return self._apply(task_id, fields)
+
+    def _apply(self, task_id: int, fields: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._snapshots.pop(task_id, None) or {'task_id': task_id})
+            snapshot.update(fields)
+            snapshot['progress'] = self._compute_progress(snapshot)
+            snapshot['updated_at'] = datetime.utcnow()
+            self._snapshots[task_id] = snapshot
+            self._evict()
+            subscribers = list(self._subscribers.get(task_id, ()))
+
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, snapshot)
+        return snapshot
+
+    @classmethod
+    def snapshot(cls, task_id: int, **fields) -> Dict[str, Any]:
+        """构造状态快照但不写入总线，用于从数据库读取的状态"""
+        snapshot = {'task_id': task_id, **fields}
+        snapshot['progress'] = cls._compute_progress(snapshot)
+        snapshot['updated_at'] = datetime.utcnow()
+        return snapshot
+
+    @staticmethod
+    def _compute_progress(snapshot: Dict[str, Any]) -> float:
+        status = snapshot.get('status')
+        if status == "COMPLETED":
+            return 100
+        total = snapshot.get('test_count') or 0
+        completed = snapshot.get('completed_rounds') or 0
+        if status != "RUNNING" or total <= 0:
+            return 0
+        # 限制进度最高为95%，保留5%用于最终处理
+        return min(95, completed / total * 100)
+
+    def _evict(self):
+        """超出容量时淘汰最早的已结束任务（调用方需持有锁）"""
+        if len(self._snapshots) <= self.max_entries:
+            return
+        for task_id in list(self._snapshots):
+            if len(self._snapshots) <= self.max_entries:
+                break
+            if self._snapshots[task_id].get('status') in TERMINAL_STATUSES and task_id not in self._subscribers:
+                del self._snapshots[task_id]
+
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """获取任务的最新快照"""
+        with self._lock:
+            snapshot = self._snapshots.get(task_id)
+            return dict(snapshot) if snapshot else None
+
+    def forget(self, task_id: int):
+        """删除任务的快照"""
+        with self._lock:
+            self._snapshots.pop(task_id, None)
+
+    def subscribe(self, task_id: int) -> asyncio.Queue:
+        """订阅任务的状态更新（需在事件循环中调用）"""
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(task_id, []).append((loop, queue))
+        return queue
+
+    def unsubscribe(self, task_id: int, queue: asyncio.Queue):
+        """取消订阅"""
+        with self._lock:
+            subscribers = [item for item in self._subscribers.get(task_id, []) if item[1] is not queue]
+            if subscribers:
+                self._subscribers[task_id] = subscribers
+            else:
+                self._subscribers.pop(task_id, None)
+
+    def attach_remote(self, queue):
+        """在工作进程中调用：之后的发布都转发到API进程"""
+        self._remote_queue = queue
+
+    def start_listener(self):
+        """创建跨进程队列并启动监听线程，返回供工作进程使用的队列"""
+        with self._lock:
+            if self._listener is None:
+                self._listener_queue = multiprocessing.get_context("spawn").Queue()
+                self._listener = threading.Thread(
+                    target=self._listen, args=(self._listener_queue,),
+                    name="progress-bus-listener", daemon=True
+                )
+                self._listener.start()
+            return self._listener_queue
+
+    def _listen(self, queue):
+        while True:
+            try:
+                message = queue.get()
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+            task_id, fields = message
+            try:
+                self._apply(task_id, fields)
+            except Exception as e:
+                logger.error("Failed to apply progress for task %d: %s", task_id, str(e))
+
+    def stop_listener(self):
+        """停止监听线程"""
+        with self._lock:
+            listener, queue = self._listener, self._listener_queue
+            self._listener = None
+            self._listener_queue = None
+        if listener:
+            queue.put(None)
+            listener.join(timeout=5)
+
+# 进程级共享的任务进度总线
+progress_bus = ProgressBus()
@@ -0,0 +1,206 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import multiprocessing
+import threading
+import logging
+import uuid
+import os
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import schemas
+from app.models.models import ReportJob, TaskStatus
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+def _init_worker():
+    """报告工作进程初始化：重建数据库连接"""
+    from app.db.database import engine
+
+    # 丢弃从父进程继承的连接，避免跨进程共享同一连接
+    engine.dispose()
+
+def _update_job(db, job_id: str, from_statuses, **values) -> bool:
+    """仅当报告生成任务处于指定状态时更新，返回是否更新成功"""
+    updated = db.query(ReportJob).filter(
+        ReportJob.id == job_id,
+        ReportJob.status.in_(from_statuses)
+    ).update(values, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+def _generate_report(job_id: str, task_id: int, report_type: str) -> Optional[int]:
+    """在工作进程中生成报告并记录任务状态，返回报告ID"""
+    from app.db.database import SessionLocal
+    from app.services.report_service import ReportService
+
+    db = SessionLocal()
+    try:
+        # 同一任务可能被多个API进程在启动时重新提交，只有一个能开始执行
+        if not _update_job(db, job_id, (TaskStatus.PENDING,), status=TaskStatus.RUNNING):
+            return None
+        try:
+            report = ReportService(db).generate_report(task_id, report_type)
+        except Exception as e:
+            db.rollback()
+            _update_job(
+                db, job_id, (TaskStatus.RUNNING,),
+                status=TaskStatus.FAILED, error_message=str(e), finished_at=datetime.utcnow()
+            )
+            raise
+        _update_job(
+            db, job_id, (TaskStatus.RUNNING,),
+            status=TaskStatus.COMPLETED, report_id=report.id, finished_at=datetime.utcnow()
+        )
+        return report.id
+    finally:
+        db.close()
+
+class ReportJobQueue:
+    """报告生成任务队列
+
+    报告在独立的进程池中生成，PDF绘制和系统信息采集不再阻塞API事件循环，
+    批量生成的多个报告可以分布到多个CPU核心上并行执行。
+    任务状态保存在report_jobs表中，任意API进程都能查询；服务重启时
+    执行中断的任务标记为失败，尚未开始的任务重新提交。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.REPORT_WORKERS or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        """创建进程池（调用方需持有锁）"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+            logger.info("Report job queue started with %d workers", self.max_workers)
+        return self._pool
+
+    def _dispatch(self, job_id: str, task_id: int, report_type: str):
+        """将报告生成任务派发到进程池"""
+        with self._lock:
+            try:
+                future = self._ensure_pool().submit(_generate_report, job_id, task_id, report_type)
+            except BrokenProcessPool:
+                logger.error("Report job pool is broken, restarting")
+                self._pool = None
+                future = self._ensure_pool().submit(_generate_report, job_id, task_id, report_type)
+        future.add_done_callback(lambda f: self._on_job_done(job_id, f))
+
+    def submit(self, db: Session, task_id: int, report_type: str) -> Dict[str, Any]:
+        """提交报告生成任务，立即返回任务信息"""
+        job = ReportJob(
+            id=uuid.uuid4().hex,
+            task_id=task_id,
+            report_type=report_type,
+            status=TaskStatus.PENDING,
+            created_at=datetime.utcnow()
+        )
+        db.add(job)
+        db.commit()
+
+        self._dispatch(job.id, task_id, report_type)
+        logger.info("Report job %s submitted for task %d (%s)", job.id, task_id, report_type)
+        return self._describe(job)
+
+    def submit_many(self, db: Session, task_ids: List[int], report_type: str) -> List[Dict[str, Any]]:
+        """批量提交报告生成任务"""
+        return [self.submit(db, task_id, report_type) for task_id in task_ids]
+
+    def _on_job_done(self, job_id: str, future: Future):
+        # 关闭进程池时取消的任务保持待执行状态，重启后重新提交
+        if future.cancelled():
+            return
+        error = future.exception()
+        if not error:
+            if future.result() is None:
+                logger.info("Report job %s was already started by another process", job_id)
+            else:
+                logger.info("Report job %s completed", job_id)
+            return
+
+        # 工作进程崩溃时任务状态没有被记录，在这里标记为失败
+        from app.db.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            _update_job(
+                db, job_id, (TaskStatus.PENDING, TaskStatus.RUNNING),
+                status=TaskStatus.FAILED, error_message=str(error), finished_at=datetime.utcnow()
+            )
+        except Exception as e:
+            logger.error("Failed to record report job %s failure: %s", job_id, str(e))
+            db.rollback()
+        finally:
+            db.close()
+        logger.error("Report job %s failed: %s", job_id, str(error))
+
+    @staticmethod
+    def _describe(job: ReportJob) -> Dict[str, Any]:
+        return {
+            'job_id': job.id,
+            'task_id': job.task_id,
+            'report_type': job.report_type,
+            'status': job.status,
+            'report': schemas.Report.from_orm(job.report).dict() if job.report else None,
+            'error_message': job.error_message,
+            'created_at': job.created_at,
+            'finished_at': job.finished_at
+        }
+
+    def get_job(self, db: Session, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取报告生成任务的状态"""
+        job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+        return self._describe(job) if job else None
+
+    def recover(self):
+        """恢复持久化的报告生成任务：中断的任务标记为失败，尚未开始的任务重新提交"""
+        from app.db.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            interrupted = db.query(ReportJob).filter(
+                ReportJob.status == TaskStatus.RUNNING
+            ).update({
+                ReportJob.status: TaskStatus.FAILED,
+                ReportJob.error_message: "服务重启，报告生成被中断",
+                ReportJob.finished_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+            if interrupted:
+                logger.warning("Marked %d interrupted report jobs as failed", interrupted)
+
+            pending = db.query(ReportJob.id, ReportJob.task_id, ReportJob.report_type).filter(
+                ReportJob.status == TaskStatus.PENDING
+            ).order_by(ReportJob.created_at).all()
+        except Exception as e:
+            logger.error("Failed to recover report jobs: %s", str(e))
+            db.rollback()
+            return
+        finally:
+            db.close()
+
+        for job in pending:
+            self._dispatch(job.id, job.task_id, job.report_type)
+        if pending:
+            logger.info("Resubmitted %d pending report jobs", len(pending))
+
+    def shutdown(self, wait: bool = False):
+        """关闭进程池"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=wait, cancel_futures=True)
+            logger.info("Report job queue stopped")
+
+# 进程级共享的报告任务队列
+report_job_queue = ReportJobQueue()
@@ -0,0 +1,173 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import logging
+import zlib
+
+import numpy as np
+from sqlalchemy import desc, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import ResultSeries
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 结果存储方式
+STORAGE_BACKENDS = ("rows", "series")
+SERIES_DTYPES = ("float64", "float32")
+
+def storage_backend() -> str:
+    """当前配置的逐轮样本存储方式，配置无效时退回rows"""
+    backend = settings.RESULT_STORAGE_BACKEND
+    if backend not in STORAGE_BACKENDS:
+        logger.warning("Unknown RESULT_STORAGE_BACKEND %r, falling back to rows", backend)
+        return "rows"
+    return backend
+
+def series_dtype() -> str:
+    """当前配置的序列样本存储类型，配置无效时退回float64"""
+    dtype = settings.RESULT_SERIES_DTYPE
+    if dtype not in SERIES_DTYPES:
+        logger.warning("Unknown RESULT_SERIES_DTYPE %r, falling back to float64", dtype)
+        return "float64"
+    return dtype
+
+def _pack(data: np.ndarray) -> bytes:
+    """按字节位重排后压缩：同一字节位的数据相邻，指数和高位字节压缩率更高"""
+    raw = np.ascontiguousarray(data).view(np.uint8).reshape(-1, data.itemsize)
+    return zlib.compress(raw.T.tobytes(), 1)
+
+def _unpack(blob: bytes, dtype: str) -> np.ndarray:
+    itemsize = np.dtype(dtype).itemsize
+    raw = np.frombuffer(zlib.decompress(blob), dtype=np.uint8).reshape(itemsize, -1)
+    return np.ascontiguousarray(raw.T).view(dtype).ravel()
+
+def encode_values(values: Sequence[float], dtype: str = "float64") -> bytes:
+    """将样本值编码为压缩的定长浮点数组"""
+    return _pack(np.asarray(values, dtype=np.dtype(dtype).newbyteorder('<')))
+
+def decode_values(blob: bytes, dtype: str = "float64") -> np.ndarray:
+    """解码样本值，统一返回float64数组"""
+    return _unpack(blob, np.dtype(dtype).newbyteorder('<')).astype(np.float64)
+
+def encode_rounds(rounds: Sequence[int]) -> bytes:
+    """将递增的测试轮次按差分编码后压缩"""
+    return _pack(np.diff(np.asarray(rounds, dtype='<i4'), prepend=0).astype('<i4'))
+
+def decode_rounds(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    if blob is None:
+        return None
+    return np.cumsum(_unpack(blob, '<i4'), dtype=np.int64)
+
+def build_segment(
+    task_id: int,
+    metric_name: str,
+    segment: int,
+    values: Sequence[float],
+    rounds: Optional[Sequence[int]] = None,
+    unit: Optional[str] = None,
+    dtype: str = "float64"
+) -> Dict:
+    """构造一段序列的插入映射，供bulk_insert_mappings使用"""
+    return {
+        'task_id': task_id,
+        'metric_name': metric_name,
+        'segment': segment,
+        'unit': unit,
+        'dtype': dtype,
+        'count': len(values),
+        'data': encode_values(values, dtype),
+        'rounds': encode_rounds(rounds) if rounds is not None else None
+    }
+
+def next_segment(db: Session, task_id: int, metric_name: str) -> int:
+    """任务某个指标下一段序列的序号"""
+    current = db.query(func.max(ResultSeries.segment)).filter(
+        ResultSeries.task_id == task_id,
+        ResultSeries.metric_name == metric_name
+    ).scalar()
+    return 0 if current is None else current + 1
+
+def iter_segments(
+    db: Session,
+    task_ids: Iterable[int],
+    metric_name: Optional[str] = None
+) -> Iterator[Tuple[ResultSeries, np.ndarray, Optional[np.ndarray]]]:
+    """按任务、指标和分段顺序逐段解码序列"""
+    query = db.query(ResultSeries).filter(ResultSeries.task_id.in_(list(task_ids)))
+    if metric_name:
+        query = query.filter(ResultSeries.metric_name == metric_name)
+    # 分批读取，避免一次加载全部序列段
+    for row in query.order_by(ResultSeries.task_id, ResultSeries.metric_name, ResultSeries.segment).yield_per(16):
+        yield row, decode_values(row.data, row.dtype), decode_rounds(row.rounds)
+
+def iter_segment_rounds(
+    db: Session,
+    task_ids: Iterable[int],
+    metric_name: Optional[str] = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """按任务、指标和分段顺序只解码各段的测试轮次（不读取样本值），产出(段ID, 轮次)
+
+    未记录轮次的段按轮次0处理。
+    """
+    query = db.query(ResultSeries.id, ResultSeries.count, ResultSeries.rounds).filter(
+        ResultSeries.task_id.in_(list(task_ids))
+    )
+    if metric_name:
+        query = query.filter(ResultSeries.metric_name == metric_name)
+    for row in query.order_by(ResultSeries.task_id, ResultSeries.metric_name, ResultSeries.segment).yield_per(64):
+        rounds = decode_rounds(row.rounds)
+        yield row.id, rounds if rounds is not None else np.zeros(row.count, dtype=np.int64)
+
+def load_segments(db: Session, segment_ids: Iterable[int]) -> Dict[int, ResultSeries]:
+    """按ID读取序列段"""
+    segment_ids = list(segment_ids)
+    if not segment_ids:
+        return {}
+    return {row.id: row for row in db.query(ResultSeries).filter(ResultSeries.id.in_(segment_ids))}
+
+def latest_segments(
+    db: Session,
+    task_ids: Iterable[int],
+    limit: int
+) -> List[Tuple[ResultSeries, np.ndarray, Optional[np.ndarray]]]:
+    """选出覆盖最新limit条样本的序列段并解码，每段只保留末尾最多limit条样本
+
+    先只读取段的写入时间和样本数，按写入时间倒序累计到limit条为止
+    （与最后一段写入时间相同的段一并选入），只有选中的段才读取并解码数据。
+    """
+    selected = []
+    total = 0
+    boundary = None
+    query = db.query(ResultSeries.id, ResultSeries.count, ResultSeries.created_at).filter(
+        ResultSeries.task_id.in_(list(task_ids))
+    ).order_by(desc(ResultSeries.created_at), desc(ResultSeries.segment))
+    for row in query.yield_per(256):
+        if total >= limit and row.created_at != boundary:
+            break
+        selected.append(row.id)
+        total += row.count
+        boundary = row.created_at
+
+    segments = []
+    for row in load_segments(db, selected).values():
+        rounds = decode_rounds(row.rounds)
+        segments.append((
+            row,
+            decode_values(row.data, row.dtype)[-limit:],
+            rounds[-limit:] if rounds is not None else None
+        ))
+    return segments
+
+def load_series(db: Session, task_id: int, metric_name: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """读取任务各指标的完整序列，返回以指标名称为键的样本数组"""
+    parts: Dict[str, List[np.ndarray]] = {}
+    for row, values, _ in iter_segments(db, [task_id], metric_name):
+        parts.setdefault(row.metric_name, []).append(values)
+    return {name: np.concatenate(chunks) for name, chunks in parts.items()}
+
+def count_samples(db: Session, task_id: int) -> int:
+    """任务序列中的样本总数"""
+    return db.query(func.coalesce(func.sum(ResultSeries.count), 0)).filter(
+        ResultSeries.task_id == task_id
+    ).scalar()
@@ -1,17 +1,281 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, NamedTuple, Tuple
 from datetime import datetime, timedelta
-from app.models.models import TestResult, TestTask, Algorithm
+from app.models.models import TestResult, TestTask, Algorithm, TaskMetricAggregate, TaskStatus, ResultSeries
 from app.models import schemas
-import statistics
+from array import array
+import numpy as np
 import logging
+import math
+import time
 from app.core.config import settings
+from app.db.database import AsyncDatabase
+from app.services import metric_stats, result_series
+from app.services.analytics_cache import analytics_cache
+from app.libs.message_sweep import sweep_base_metric
 
 # 配置日志记录器
 logger = logging.getLogger(settings.LOGGER_NAME)
 logger.setLevel(settings.LOG_LEVEL)
 
+class MetricAccumulator:
+    """单个指标的增量统计（Welford算法）"""
+
+    __slots__ = ('count', 'total', 'mean', 'm2', 'min_value', 'max_value', 'last_value', 'unit')
+
+    def __init__(self, unit: Optional[str] = None):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min_value = None
+        self.max_value = None
+        self.last_value = None
+        self.unit = unit
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if self.max_value is None or value > self.max_value:
+            self.max_value = value
+        self.last_value = value
+
+def _merge_accumulator(aggregate: TaskMetricAggregate, acc: MetricAccumulator):
+    """将一批增量统计合并到聚合行（Chan并行合并公式）"""
+    count_a = aggregate.count or 0
+    count = count_a + acc.count
+    mean_a = aggregate.total / count_a if count_a else 0.0
+    delta = acc.mean - mean_a
+    aggregate.m2 = (aggregate.m2 or 0.0) + acc.m2 + delta * delta * count_a * acc.count / count
+    aggregate.total = (aggregate.total or 0.0) + acc.total
+    aggregate.count = count
+    if aggregate.min_value is None or acc.min_value < aggregate.min_value:
+        aggregate.min_value = acc.min_value
+    if aggregate.max_value is None or acc.max_value > aggregate.max_value:
+        aggregate.max_value = acc.max_value
+    aggregate.last_value = acc.last_value
+    aggregate.unit = acc.unit or aggregate.unit
+    aggregate.is_final = False
+
+def _merge_metric_aggregates(db: Session, task_id: int, accumulators: Dict[str, MetricAccumulator]):
+    """将各指标的增量统计合并到任务聚合表（由调用方提交事务）"""
+    if not accumulators:
+        return
+    existing = {
+        aggregate.metric_name: aggregate
+        for aggregate in db.query(TaskMetricAggregate).filter(
+            TaskMetricAggregate.task_id == task_id,
+            TaskMetricAggregate.metric_name.in_(list(accumulators))
+        ).all()
+    }
+    for metric_name, acc in accumulators.items():
+        aggregate = existing.get(metric_name)
+        if aggregate is None:
+            aggregate = TaskMetricAggregate(task_id=task_id, metric_name=metric_name, count=0, total=0.0, m2=0.0)
+            db.add(aggregate)
+        _merge_accumulator(aggregate, acc)
+
+def _bump_results_version(db: Session, task_id: int):
+    """递增任务的结果版本（随调用方的事务提交），使分析缓存和ETag失效"""
+    db.query(TestTask).filter(TestTask.id == task_id).update(
+        {TestTask.results_version: func.coalesce(TestTask.results_version, 0) + 1},
+        synchronize_session=False
+    )
+
+def _finalize_aggregate(aggregate: TaskMetricAggregate, values):
+    """根据指标的全部样本写入分位数并标记聚合已定稿"""
+    data = metric_stats.to_array(values)
+    if data.size:
+        aggregate.median, aggregate.p95, aggregate.p99 = (
+            float(value) for value in np.percentile(data, (50, 95, 99))
+        )
+    aggregate.is_final = True
+
+# 性能指标中取平均值的时间指标
+TIME_METRICS = ('keygen_time', 'encaps_time', 'decaps_time', 'sign_time', 'verify_time')
+
+class AggregateStats(NamedTuple):
+    """与聚合查询结果行字段一致的统计，用于即时计算的聚合"""
+    count: int
+    avg: float
+    min: float
+    max: float
+    last_value: float
+
+    @classmethod
+    def from_aggregate(cls, aggregate: TaskMetricAggregate) -> "AggregateStats":
+        return cls(aggregate.count, aggregate.total / aggregate.count,
+                   aggregate.min_value, aggregate.max_value, aggregate.last_value)
+
+class HistoryRow(NamedTuple):
+    """性能历史查询结果行"""
+    id: int
+    task_name: str
+    finished_at: datetime
+    avg_value: float
+    sample_count: int
+
+class ResultBatchWriter:
+    """测试结果批量写入器
+
+    缓冲单个任务的TestResult行，达到批量大小或刷新间隔时通过
+    bulk_insert_mappings一次性写入并提交，避免逐行查询和提交。
+    每次刷新时同步合并task_metric_aggregates中的增量统计。
+    RESULT_STORAGE_BACKEND为series时，带测试轮次的逐轮样本按指标打包为
+    result_series中的一段压缩序列，其余标量指标仍写入test_results。
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        task_id: int,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None
+    ):
+        """初始化批量写入器
+
+        Args:
+            db: 数据库会话对象
+            task_id: 任务ID（调用方需保证任务已存在）
+            batch_size: 每批写入的最大行数，默认使用配置RESULT_BATCH_SIZE
+            flush_interval: 最长刷新间隔（秒），默认使用配置RESULT_FLUSH_INTERVAL
+        """
+        self.db = db
+        self.task_id = task_id
+        self.batch_size = max(1, batch_size or settings.RESULT_BATCH_SIZE)
+        self.flush_interval = settings.RESULT_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.total_written = 0
+        self.use_series = result_series.storage_backend() == "series"
+        self.series_dtype = result_series.series_dtype()
+        self._buffer: List[Dict[str, Any]] = []
+        self._pending = 0
+        self._series: Dict[str, Dict[str, Any]] = {}
+        self._segments: Dict[str, int] = {}
+        self._accumulators: Dict[str, MetricAccumulator] = {}
+        self._values: Dict[str, array] = {}
+        self._last_flush = time.monotonic()
+
+    def add(
+        self,
+        metric_name: str,
+        value: float,
+        unit: Optional[str] = None,
+        test_round: Optional[int] = None
+    ):
+        """添加一条结果到缓冲区，必要时触发刷新"""
+        value = float(value)
+        if self.use_series and test_round is not None:
+            series = self._series.get(metric_name)
+            if series is None:
+                series = self._series[metric_name] = {'values': array('d'), 'rounds': array('i'), 'unit': unit}
+            series['values'].append(value)
+            series['rounds'].append(test_round)
+        else:
+            self._buffer.append({
+                'task_id': self.task_id,
+                'metric_name': metric_name,
+                'value': value,
+                'unit': unit,
+                'test_round': test_round
+            })
+        self._pending += 1
+
+        acc = self._accumulators.get(metric_name)
+        if acc is None:
+            acc = self._accumulators[metric_name] = MetricAccumulator(unit)
+            if metric_name not in self._values:
+                self._values[metric_name] = array('d')
+        acc.add(value)
+        self._values[metric_name].append(value)
+
+        if self._pending >= self.batch_size or (
+            self.flush_interval and time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> int:
+        """将缓冲区中的结果写入数据库
+
+        Returns:
+            int: 本次写入的行数
+        """
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return 0
+
+        rows, self._buffer = self._buffer, []
+        series, self._series = self._series, {}
+        accumulators, self._accumulators = self._accumulators, {}
+        written, self._pending = self._pending, 0
+        try:
+            if rows:
+                self.db.bulk_insert_mappings(TestResult, rows)
+            if series:
+                self.db.bulk_insert_mappings(ResultSeries, [
+                    result_series.build_segment(
+                        self.task_id, metric_name, self._next_segment(metric_name),
+                        data['values'], data['rounds'], data['unit'], self.series_dtype
+                    )
+                    for metric_name, data in series.items()
+                ])
+            _merge_metric_aggregates(self.db, self.task_id, accumulators)
+            _bump_results_version(self.db, self.task_id)
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Failed to flush {written} results for task_id {self.task_id}: {str(e)}")
+            self.db.rollback()
+            raise
+
+        self.total_written += written
+        logger.debug(f"Flushed {written} results ({len(series)} series segments) for task_id: {self.task_id}")
+        return written
+
+    def _next_segment(self, metric_name: str) -> int:
+        """分配指标的下一段序号，首次使用时从数据库续接"""
+        if metric_name not in self._segments:
+            self._segments[metric_name] = result_series.next_segment(self.db, self.task_id, metric_name)
+        segment = self._segments[metric_name]
+        self._segments[metric_name] = segment + 1
+        return segment
+
+    def finalize(self):
+        """刷新剩余结果并为各指标写入分位数
+
+        只应在写入器覆盖了任务全部结果时调用（例如任务执行结束时）。
+        """
+        self.flush()
+        try:
+            aggregates = self.db.query(TaskMetricAggregate).filter(
+                TaskMetricAggregate.task_id == self.task_id
+            ).all()
+            for aggregate in aggregates:
+                _finalize_aggregate(aggregate, self._values.get(aggregate.metric_name))
+            _bump_results_version(self.db, self.task_id)
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Failed to finalize metric aggregates for task_id {self.task_id}: {str(e)}")
+            self.db.rollback()
+            raise
+
+    def close(self) -> int:
+        """刷新剩余结果并返回累计写入行数"""
+        self.flush()
+        return self.total_written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # 异常退出时同样保留已采集的结果
+        self.close()
+        return False
+
 class ResultService:
     def __init__(self, db: Session):
         """初始化ResultService
@@ -28,11 +292,18 @@ class ResultService:
         self.db = db
         logger.debug("ResultService initialized successfully")
 
-    def get_task_results(self, task_id: int) -> List[TestResult]:
-        """获取指定任务的所有测试结果
+    def get_task_results(
+        self,
+        task_id: int,
+        metric_name: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[TestResult]:
+        """获取指定任务的测试结果
         
         Args:
             task_id: 任务ID
+            metric_name: 指标名称（可选，只返回该指标的结果）
+            limit: 返回结果的最大数量（可选，默认返回全部结果）
         
         Returns:
             List[TestResult]: 测试结果列表
@@ -47,9 +318,24 @@ class ResultService:
                 raise ValueError("Task ID must be a positive integer")
             
             logger.debug(f"Fetching results for task_id: {task_id}")
-            results = self.db.query(TestResult).filter(
-                TestResult.task_id == task_id
-            ).order_by(TestResult.created_at).all()
+            query = self.db.query(TestResult).filter(TestResult.task_id == task_id)
+            if metric_name:
+                query = query.filter(TestResult.metric_name == metric_name)
+            # 按(task_id, id)排序可直接使用task_id索引（索引中包含主键）
+            query = query.order_by(TestResult.id)
+            if limit is not None:
+                query = query.limit(limit)
+            results = query.all()
+            if limit is None:
+                series_results = self._series_results([task_id], metric_name)
+            elif len(results) < limit:
+                series_results = self._first_series_results(task_id, metric_name, limit - len(results))
+            else:
+                series_results = []
+            if series_results:
+                results.extend(sorted(series_results, key=lambda result: result.test_round or 0))
+                if limit is not None:
+                    results = results[:limit]
             logger.info(f"Successfully fetched {len(results)} results for task_id: {task_id}")
             return results
         except ValueError as e:
@@ -59,6 +345,262 @@ class ResultService:
             logger.error(f"Failed to fetch results for task_id {task_id}: {str(e)}")
             raise
 
+    @staticmethod
+    def _expand_segment(
+        segment: ResultSeries,
+        values,
+        rounds,
+        start: int = 0,
+        stop: Optional[int] = None
+    ) -> List[schemas.TestResult]:
+        """将一段压缩序列中[start, stop)范围的样本展开为结果对象"""
+        values = values[start:stop].tolist()
+        round_list = rounds[start:stop].tolist() if rounds is not None else [None] * len(values)
+        return [
+            schemas.TestResult.construct(
+                id=None,
+                task_id=segment.task_id,
+                metric_name=segment.metric_name,
+                value=value,
+                unit=segment.unit,
+                test_round=test_round,
+                created_at=segment.created_at
+            )
+            for value, test_round in zip(values, round_list)
+        ]
+
+    def _series_results(self, task_ids: List[int], metric_name: Optional[str] = None) -> List[schemas.TestResult]:
+        """将压缩序列展开为结果对象，供需要逐条结果的接口和报告使用"""
+        results = []
+        for segment, values, rounds in result_series.iter_segments(self.db, task_ids, metric_name):
+            results.extend(self._expand_segment(segment, values, rounds))
+        return results
+
+    def _first_series_results(
+        self,
+        task_id: int,
+        metric_name: Optional[str],
+        limit: int
+    ) -> List[schemas.TestResult]:
+        """按测试轮次取压缩序列中最前面的limit条样本
+
+        先只解码各段的轮次确定轮次上限，样本值只对包含入选样本的段解码。
+        """
+        segment_rounds = list(result_series.iter_segment_rounds(self.db, [task_id], metric_name))
+        if not segment_rounds:
+            return []
+        all_rounds = np.concatenate([rounds for _, rounds in segment_rounds])
+        threshold = np.partition(all_rounds, limit - 1)[limit - 1] if limit < len(all_rounds) else None
+        selected = [
+            segment_id for segment_id, rounds in segment_rounds
+            if len(rounds) and (threshold is None or rounds.min() <= threshold)
+        ]
+        del segment_rounds, all_rounds
+
+        results = []
+        segments = result_series.load_segments(self.db, selected)
+        for segment_id in selected:
+            segment = segments[segment_id]
+            values = result_series.decode_values(segment.data, segment.dtype)
+            rounds = result_series.decode_rounds(segment.rounds)
+            if threshold is not None:
+                mask = (rounds if rounds is not None else np.zeros(len(values), dtype=np.int64)) <= threshold
+                values = values[mask]
+                rounds = rounds[mask] if rounds is not None else None
+            results.extend(self._expand_segment(segment, values, rounds))
+        return results
+
+    @staticmethod
+    def _parse_cursor(cursor: Optional[str]) -> Tuple[str, int, int]:
+        """解析分页游标
+
+        游标为"r<结果ID>"（test_results中最后返回的行）
+        或"s<序列段ID>.<段内偏移>"（result_series中下一条样本的位置）。
+        """
+        if not cursor:
+            return 'r', 0, 0
+        try:
+            if cursor[0] == 'r':
+                return 'r', int(cursor[1:]), 0
+            if cursor[0] == 's':
+                segment_id, offset = cursor[1:].split('.')
+                return 's', int(segment_id), int(offset)
+        except (ValueError, IndexError):
+            pass
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    def get_task_results_page(
+        self,
+        task_id: int,
+        limit: int = 1000,
+        cursor: Optional[str] = None,
+        metric_name: Optional[str] = None
+    ) -> Tuple[List[TestResult], Optional[str]]:
+        """按(task_id, id)键集分页获取任务结果
+        
+        先返回test_results中的行，再返回result_series中的样本，
+        翻页只依赖游标位置，不使用OFFSET扫描。
+        
+        Args:
+            task_id: 任务ID
+            limit: 每页最大数量
+            cursor: 上一页返回的游标，为空时从头开始
+            metric_name: 指标名称（可选）
+        
+        Returns:
+            Tuple[List[TestResult], Optional[str]]: 本页结果和下一页游标（没有更多数据时为None）
+        
+        Raises:
+            ValueError: 当输入参数或游标无效时
+            Exception: 当数据库查询失败时
+        """
+        try:
+            if not isinstance(task_id, int) or task_id <= 0:
+                logger.error(f"Invalid task_id: {task_id}")
+                raise ValueError("Task ID must be a positive integer")
+            
+            if not isinstance(limit, int) or limit < 1:
+                logger.error(f"Invalid limit: {limit}")
+                raise ValueError("Limit must be a positive integer")
+            
+            kind, position, offset = self._parse_cursor(cursor)
+            logger.debug(f"Fetching results page for task_id: {task_id}, cursor: {cursor}, limit: {limit}")
+            items: List[Any] = []
+
+            if kind == 'r':
+                query = self.db.query(TestResult).filter(
+                    TestResult.task_id == task_id,
+                    TestResult.id > position
+                )
+                if metric_name:
+                    query = query.filter(TestResult.metric_name == metric_name)
+                rows = query.order_by(TestResult.id).limit(limit + 1).all()
+                if len(rows) > limit:
+                    return rows[:limit], f"r{rows[limit - 1].id}"
+                items.extend(rows)
+                position, offset = 0, 0
+
+            # 只读取序列段的ID和样本数，按需解码
+            series_query = self.db.query(ResultSeries.id, ResultSeries.count).filter(
+                ResultSeries.task_id == task_id,
+                ResultSeries.id >= position
+            )
+            if metric_name:
+                series_query = series_query.filter(ResultSeries.metric_name == metric_name)
+            segments = series_query.order_by(ResultSeries.id).all()
+
+            next_cursor = None
+            for index, (segment_id, count) in enumerate(segments):
+                start = offset if segment_id == position else 0
+                if start >= count:
+                    continue
+                remaining = limit - len(items)
+                if remaining <= 0:
+                    next_cursor = f"s{segment_id}.{start}"
+                    break
+                stop = min(count, start + remaining)
+                segment = self.db.query(ResultSeries).filter(ResultSeries.id == segment_id).one()
+                items.extend(self._expand_segment(
+                    segment,
+                    result_series.decode_values(segment.data, segment.dtype),
+                    result_series.decode_rounds(segment.rounds),
+                    start, stop
+                ))
+                if stop < count:
+                    next_cursor = f"s{segment_id}.{stop}"
+                    break
+                if len(items) >= limit and index + 1 < len(segments):
+                    next_cursor = f"s{segments[index + 1][0]}.0"
+                    break
+
+            logger.info(f"Successfully fetched {len(items)} results for task_id: {task_id}, next cursor: {next_cursor}")
+            return items, next_cursor
+        except ValueError as e:
+            logger.error(f"Value error in get_task_results_page: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to fetch results page for task_id {task_id}: {str(e)}")
+            raise
+
+    def iter_task_results(
+        self,
+        task_id: int,
+        metric_name: Optional[str] = None,
+        batch_size: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """以有界内存逐条产出任务结果，供流式导出使用
+        
+        test_results通过服务端游标分批读取列值（不构造ORM对象），
+        result_series逐段解码，内存占用与结果总数无关。
+        
+        Args:
+            task_id: 任务ID
+            metric_name: 指标名称（可选）
+            batch_size: 每批读取的行数，默认使用配置RESULT_BATCH_SIZE
+        
+        Yields:
+            Dict[str, Any]: 单条结果
+        """
+        query = self.db.query(
+            TestResult.id,
+            TestResult.task_id,
+            TestResult.metric_name,
+            TestResult.value,
+            TestResult.unit,
+            TestResult.test_round,
+            TestResult.created_at
+        ).filter(TestResult.task_id == task_id)
+        if metric_name:
+            query = query.filter(TestResult.metric_name == metric_name)
+        for row in query.order_by(TestResult.id).yield_per(batch_size or settings.RESULT_BATCH_SIZE):
+            yield row._asdict()
+
+        for segment, values, rounds in result_series.iter_segments(self.db, [task_id], metric_name):
+            for result in self._expand_segment(segment, values, rounds):
+                yield result.dict()
+
+    def iter_task_result_columns(self, task_id: int, batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """按列分批产出任务结果，供生成报告文件使用
+        
+        test_results每批产出各列的值元组，result_series每段直接产出解码后的数组，
+        不为逐条样本构造对象。
+        
+        Args:
+            task_id: 任务ID
+            batch_size: 每批读取的行数，默认使用配置RESULT_BATCH_SIZE
+        
+        Yields:
+            Dict[str, Any]: 以列名为键的一批结果，单值列对整批有效
+        """
+        batch_size = batch_size or settings.RESULT_BATCH_SIZE
+        columns = ('task_id', 'metric_name', 'value', 'unit', 'test_round', 'created_at')
+        query = self.db.query(
+            TestResult.task_id,
+            TestResult.metric_name,
+            TestResult.value,
+            TestResult.unit,
+            TestResult.test_round,
+            TestResult.created_at
+        ).filter(TestResult.task_id == task_id).order_by(TestResult.id)
+        batch = []
+        for row in query.yield_per(batch_size):
+            batch.append(tuple(row))
+            if len(batch) >= batch_size:
+                yield dict(zip(columns, zip(*batch)))
+                batch = []
+        if batch:
+            yield dict(zip(columns, zip(*batch)))
+
+        for segment, values, rounds in result_series.iter_segments(self.db, [task_id]):
+            yield {
+                'task_id': segment.task_id,
+                'metric_name': segment.metric_name,
+                'value': values,
+                'unit': segment.unit,
+                'test_round': rounds,
+                'created_at': segment.created_at
+            }
+
     def get_task_result_count(self, task_id: int) -> int:
         """获取任务结果数量
         
@@ -80,7 +622,7 @@ class ResultService:
             logger.debug(f"Counting results for task_id: {task_id}")
             count = self.db.query(TestResult).filter(
                 TestResult.task_id == task_id
-            ).count()
+            ).count() + result_series.count_samples(self.db, task_id)
             logger.info(f"Successfully fetched result count: {count} for task_id: {task_id}")
             return count
         except ValueError as e:
@@ -146,8 +688,13 @@ class ResultService:
                 test_round=result.test_round if hasattr(result, 'test_round') else 1
             )
             
+            acc = MetricAccumulator(db_result.unit)
+            acc.add(float(db_result.value))
             self.db.add(db_result)
+            _merge_metric_aggregates(self.db, db_result.task_id, {db_result.metric_name: acc})
+            _bump_results_version(self.db, db_result.task_id)
             self.db.commit()
+            analytics_cache.invalidate(db_result.task_id)
             self.db.refresh(db_result)
             
             logger.info(f"Successfully created result with id: {db_result.id} for task_id: {result.task_id}")
@@ -161,6 +708,76 @@ class ResultService:
             self.db.rollback()
             raise
 
+    def open_batch_writer(
+        self,
+        task_id: int,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None
+    ) -> ResultBatchWriter:
+        """为任务创建批量结果写入器，任务存在性只校验一次
+
+        Args:
+            task_id: 任务ID
+            batch_size: 每批写入的最大行数
+            flush_interval: 最长刷新间隔（秒）
+
+        Returns:
+            ResultBatchWriter: 批量写入器
+
+        Raises:
+            ValueError: 当任务ID无效或任务不存在时
+        """
+        if not isinstance(task_id, int) or task_id <= 0:
+            logger.error(f"Invalid task_id: {task_id}")
+            raise ValueError("Task ID must be a positive integer")
+
+        task_exists = self.db.query(TestTask.id).filter(TestTask.id == task_id).first()
+        if not task_exists:
+            logger.error(f"Task with id {task_id} does not exist")
+            raise ValueError(f"Task with id {task_id} does not exist")
+
+        return ResultBatchWriter(self.db, task_id, batch_size, flush_interval)
+
+    def create_results_bulk(
+        self,
+        results: List[schemas.TestResultCreate],
+        batch_size: Optional[int] = None
+    ) -> int:
+        """批量创建测试结果
+
+        Args:
+            results: 测试结果创建对象列表
+            batch_size: 每批写入的最大行数
+
+        Returns:
+            int: 写入的结果数量
+
+        Raises:
+            ValueError: 当输入数据无效或任务不存在时
+            Exception: 当写入失败时
+        """
+        if not results:
+            return 0
+
+        for result in results:
+            if not result.metric_name:
+                raise ValueError("metric_name is required")
+            if not isinstance(result.value, (int, float)):
+                raise ValueError("Value must be a number")
+
+        # 按任务分组，每个任务只校验一次
+        written = 0
+        task_ids = list(dict.fromkeys(result.task_id for result in results))
+        for task_id in task_ids:
+            writer = self.open_batch_writer(task_id, batch_size=batch_size, flush_interval=0)
+            for result in results:
+                if result.task_id == task_id:
+                    writer.add(result.metric_name, result.value, result.unit, result.test_round)
+            written += writer.close()
+
+        logger.info(f"Successfully created {written} results in bulk for task_ids: {task_ids}")
+        return written
+
     def delete_result(self, result_id: int) -> bool:
         """删除测试结果
         
@@ -188,8 +805,12 @@ class ResultService:
                 logger.warning(f"Result with id {result_id} not found")
                 return False
             
+            # 聚合无法扣除单个样本，在同一事务中从剩余结果重建
             self.db.delete(db_result)
+            self.db.flush()
+            self._replace_metric_aggregates(db_result.task_id)
             self.db.commit()
+            analytics_cache.invalidate(db_result.task_id)
             logger.info(f"Successfully deleted result with id: {result_id}")
             return True
         except ValueError as e:
@@ -200,6 +821,70 @@ class ResultService:
             self.db.rollback()
             raise
 
+    def get_metric_series(
+        self,
+        task_id: int,
+        metric_name: str,
+        width: int = 800,
+        method: str = 'lttb'
+    ) -> Dict[str, Any]:
+        """获取按图表宽度降采样的指标序列
+        
+        Args:
+            task_id: 任务ID
+            metric_name: 指标名称
+            width: 图表宽度（像素），降采样后最多保留width个点
+            method: 降采样方法，lttb或minmax
+        
+        Returns:
+            Dict[str, Any]: 包含降采样点[测试轮次, 数值]的字典
+        
+        Raises:
+            ValueError: 当输入参数无效时
+            Exception: 当查询或降采样失败时
+        """
+        try:
+            if not isinstance(task_id, int) or task_id <= 0:
+                logger.error(f"Invalid task_id: {task_id}")
+                raise ValueError("Task ID must be a positive integer")
+            
+            if not metric_name or not isinstance(metric_name, str):
+                logger.error(f"Invalid metric_name: {metric_name}")
+                raise ValueError("Metric name must be a non-empty string")
+            
+            if method not in metric_stats.DOWNSAMPLERS:
+                logger.error(f"Invalid downsampling method: {method}")
+                raise ValueError(f"Method must be one of: {', '.join(metric_stats.DOWNSAMPLERS)}")
+            
+            # 已完成任务的降采样结果按(任务, 指标, 宽度, 方法)缓存
+            return analytics_cache.get_or_compute(
+                task_id, 'series',
+                lambda: self._compute_metric_series(task_id, metric_name, width, method),
+                lambda: self.get_cache_version(task_id),
+                metric_name=metric_name, width=width, method=method
+            )
+        except ValueError as e:
+            logger.error(f"Value error in get_metric_series: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to get metric series for task_id {task_id}, metric {metric_name}: {str(e)}")
+            raise
+
+    def _compute_metric_series(self, task_id: int, metric_name: str, width: int, method: str) -> Dict[str, Any]:
+        """读取指标序列并降采样"""
+        x, y = metric_stats.load_metric_series(self.db, task_id, metric_name)
+        sampled_x, sampled_y = metric_stats.DOWNSAMPLERS[method](x, y, width)
+        series = {
+            'task_id': task_id,
+            'metric_name': metric_name,
+            'method': method,
+            'width': width,
+            'total_points': int(y.size),
+            'points': np.column_stack((sampled_x, sampled_y)).tolist()
+        }
+        logger.info(f"Downsampled {y.size} points to {len(series['points'])} for task_id: {task_id}, metric: {metric_name}")
+        return series
+
     def get_task_results_summary(self, task_id: int) -> Optional[Dict[str, Any]]:
         """获取任务结果摘要统计
         
@@ -219,48 +904,13 @@ class ResultService:
                 raise ValueError("Task ID must be a positive integer")
             
             logger.debug(f"Generating results summary for task_id: {task_id}")
-            results = self.get_task_results(task_id)
-            if not results:
-                logger.warning(f"No results found for task_id: {task_id}")
+            summary = analytics_cache.get_or_compute(
+                task_id, 'summary',
+                lambda: self._compute_task_results_summary(task_id),
+                lambda: self.get_cache_version(task_id)
+            )
+            if summary is None:
                 return None
-
-            # 按指标分组
-            metrics_data = {}
-            for result in results:
-                metric_name = result.metric_name
-                if metric_name not in metrics_data:
-                    metrics_data[metric_name] = []
-                metrics_data[metric_name].append(result.value)
-
-            # 计算统计信息
-            summary = {}
-            for metric_name, values in metrics_data.items():
-                if values:
-                    try:
-                        metric_stats = {
-                            'count': len(values),
-                            'avg': statistics.mean(values),
-                            'min': min(values),
-                            'max': max(values),
-                            'median': statistics.median(values),
-                            'std_dev': statistics.stdev(values) if len(values) > 1 else 0
-                        }
-                        summary[metric_name] = metric_stats
-                    except statistics.StatisticsError as e:
-                        logger.warning(f"Failed to calculate statistics for metric {metric_name}: {str(e)}")
-                        summary[metric_name] = {'error': str(e)}
-
-            # 获取任务信息
-            task = self.db.query(TestTask).filter(TestTask.id == task_id).first()
-            if task:
-                summary['task_info'] = {
-                    'task_id': task.id,
-                    'task_name': task.task_name,
-                    'test_count': task.test_count,
-                    'algorithm_name': task.algorithm.name,
-                    'category': task.algorithm.category
-                }
-
             logger.info(f"Successfully generated results summary for task_id: {task_id}")
             return summary
         except ValueError as e:
@@ -270,6 +920,40 @@ class ResultService:
             logger.error(f"Failed to generate results summary for task_id {task_id}: {str(e)}")
             raise
 
+    def _compute_task_results_summary(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """由聚合统计计算任务结果摘要"""
+        aggregates = self.get_metric_aggregates(task_id)
+        if not aggregates:
+            logger.warning(f"No results found for task_id: {task_id}")
+            return None
+
+        # 直接读取聚合统计
+        summary = {}
+        for metric_name, aggregate in aggregates.items():
+            summary[metric_name] = {
+                'count': aggregate.count,
+                'avg': aggregate.total / aggregate.count,
+                'min': aggregate.min_value,
+                'max': aggregate.max_value,
+                'median': aggregate.median,
+                'p95': aggregate.p95,
+                'p99': aggregate.p99,
+                'std_dev': self._aggregate_std_dev(aggregate)
+            }
+
+        # 获取任务信息
+        task = self.db.query(TestTask).filter(TestTask.id == task_id).first()
+        if task:
+            summary['task_info'] = {
+                'task_id': task.id,
+                'task_name': task.task_name,
+                'test_count': task.test_count,
+                'algorithm_name': task.algorithm.name,
+                'category': task.algorithm.category
+            }
+
+        return summary
+
     def get_performance_metrics(self, task_id: int) -> Optional[schemas.PerformanceMetrics]:
         """获取任务性能指标
         
@@ -289,48 +973,14 @@ class ResultService:
                 raise ValueError("Task ID must be a positive integer")
             
             logger.debug(f"Calculating performance metrics for task_id: {task_id}")
-            results = self.get_task_results(task_id)
-            if not results:
-                logger.warning(f"No results found for task_id: {task_id}")
+            performance_data = analytics_cache.get_or_compute(
+                task_id, 'metrics',
+                lambda: self._compute_performance_metrics(task_id),
+                lambda: self.get_cache_version(task_id)
+            )
+            if performance_data is None:
                 return None
 
-            # 提取各项指标的平均值
-            metrics = {}
-            for result in results:
-                metric_name = result.metric_name
-                if metric_name not in metrics:
-                    metrics[metric_name] = []
-                metrics[metric_name].append(result.value)
-
-            # 计算平均值并构造性能指标对象
-            performance_data = {}
-            
-            # 时间指标（需要计算平均值）
-            time_metrics = ['keygen_time', 'encaps_time', 'decaps_time', 'sign_time', 'verify_time']
-            for metric in time_metrics:
-                if metric in metrics:
-                    try:
-                        performance_data[f'avg_{metric}'] = statistics.mean(metrics[metric])
-                    except statistics.StatisticsError as e:
-                        logger.warning(f"Failed to calculate mean for metric {metric}: {str(e)}")
-                        performance_data[f'avg_{metric}'] = 0.0
-
-            # 大小指标（取最大值或唯一值）
-            size_metrics = ['public_key_size', 'private_key_size', 'signature_size', 'ciphertext_size']
-            for metric in size_metrics:
-                if metric in metrics:
-                    try:
-                        performance_data[metric] = max(metrics[metric])
-                    except ValueError as e:
-                        logger.warning(f"Failed to calculate max for metric {metric}: {str(e)}")
-                        performance_data[metric] = 0
-
-            # 成功率（取最后一个值）
-            if 'success_rate' in metrics:
-                performance_data['success_rate'] = metrics['success_rate'][-1]
-            else:
-                performance_data['success_rate'] = 0.0
-
             logger.info(f"Successfully calculated performance metrics for task_id: {task_id}")
             return schemas.PerformanceMetrics(**performance_data)
         except ValueError as e:
@@ -340,6 +990,181 @@ class ResultService:
             logger.error(f"Failed to calculate performance metrics for task_id {task_id}: {str(e)}")
             raise
 
+    def _compute_performance_metrics(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """由聚合统计计算任务性能指标"""
+        aggregates = self.get_metric_aggregates(task_id)
+        if not aggregates:
+            logger.warning(f"No results found for task_id: {task_id}")
+            return None
+
+        # 时间指标（取平均值）
+        performance_data = self._average_times({
+            metric_name: AggregateStats.from_aggregate(aggregate) for metric_name, aggregate in aggregates.items()
+        })
+
+        # 大小指标（取最大值或唯一值）
+        size_metrics = ['public_key_size', 'private_key_size', 'signature_size', 'ciphertext_size']
+        for metric in size_metrics:
+            if metric in aggregates:
+                performance_data[metric] = aggregates[metric].max_value
+
+        # 成功率（取最后一个值）
+        if 'success_rate' in aggregates:
+            performance_data['success_rate'] = aggregates['success_rate'].last_value
+        else:
+            performance_data['success_rate'] = 0.0
+
+        return performance_data
+
+    def get_cache_version(self, task_id: int) -> Optional[str]:
+        """获取已完成任务的分析缓存版本，任务不存在或未完成时返回None
+        
+        版本由创建时间、完成时间和结果版本组成：任务删除后ID被重用时新任务的版本不同；
+        已完成任务的结果被删除或聚合被重建时结果版本递增，不会命中旧缓存或旧ETag。
+        """
+        task = self.db.query(
+            TestTask.status, TestTask.created_at, TestTask.finished_at, TestTask.results_version
+        ).filter(TestTask.id == task_id).first()
+        if task is None or task.status != TaskStatus.COMPLETED:
+            return None
+        return "/".join(
+            value.isoformat() if value else "" for value in (task.created_at, task.finished_at)
+        ) + f"/{task.results_version or 0}"
+
+    def warm_analytics_cache(self, task_id: int):
+        """任务完成时预先计算并缓存摘要和性能指标"""
+        try:
+            self.get_task_results_summary(task_id)
+            self.get_performance_metrics(task_id)
+        except Exception as e:
+            logger.warning(f"Failed to warm analytics cache for task_id {task_id}: {str(e)}")
+
+    def get_metric_aggregates(self, task_id: int) -> Dict[str, TaskMetricAggregate]:
+        """获取任务各指标的聚合统计
+        
+        已结束的任务如果缺少聚合或聚合尚未定稿（例如历史数据），会从结果表
+        即时计算聚合但不写回数据库，读接口不修改数据；运行中的任务直接返回当前的增量统计。
+        
+        Args:
+            task_id: 任务ID
+        
+        Returns:
+            Dict[str, TaskMetricAggregate]: 以指标名称为键的聚合统计
+        """
+        aggregates = self.db.query(TaskMetricAggregate).filter(
+            TaskMetricAggregate.task_id == task_id
+        ).all()
+        if aggregates and all(aggregate.is_final for aggregate in aggregates):
+            return {aggregate.metric_name: aggregate for aggregate in aggregates}
+
+        task_status = self.db.query(TestTask.status).filter(TestTask.id == task_id).scalar()
+        if task_status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+            aggregates = self.compute_metric_aggregates(task_id)
+        return {aggregate.metric_name: aggregate for aggregate in aggregates}
+
+    def compute_metric_aggregates(self, task_id: int) -> List[TaskMetricAggregate]:
+        """从结果表计算任务的全部指标聚合（已定稿，不加入会话）
+        
+        Args:
+            task_id: 任务ID
+        
+        Returns:
+            List[TaskMetricAggregate]: 计算得到的聚合统计
+        """
+        logger.debug(f"Computing metric aggregates for task_id: {task_id}")
+        rows = self.db.query(
+            TestResult.metric_name, TestResult.value, TestResult.unit
+        ).filter(
+            TestResult.task_id == task_id
+        ).order_by(TestResult.id).all()
+
+        accumulators: Dict[str, MetricAccumulator] = {}
+        values: Dict[str, array] = {}
+        for metric_name, value, unit in rows:
+            if metric_name not in accumulators:
+                accumulators[metric_name] = MetricAccumulator(unit)
+                values[metric_name] = array('d')
+            accumulators[metric_name].add(value)
+            values[metric_name].append(value)
+
+        # 合并压缩序列中的样本
+        for segment, series_values, _ in result_series.iter_segments(self.db, [task_id]):
+            if segment.metric_name not in accumulators:
+                accumulators[segment.metric_name] = MetricAccumulator(segment.unit)
+                values[segment.metric_name] = array('d')
+            for value in series_values.tolist():
+                accumulators[segment.metric_name].add(value)
+            values[segment.metric_name].extend(series_values.tolist())
+
+        aggregates = []
+        for metric_name, acc in accumulators.items():
+            aggregate = TaskMetricAggregate(task_id=task_id, metric_name=metric_name, count=0, total=0.0, m2=0.0)
+            _merge_accumulator(aggregate, acc)
+            _finalize_aggregate(aggregate, values[metric_name])
+            aggregates.append(aggregate)
+        return aggregates
+
+    def rebuild_metric_aggregates(self, task_id: int) -> List[TaskMetricAggregate]:
+        """从结果表重新计算任务的全部指标聚合并写入数据库
+        
+        由写入方在任务异常结束时调用（执行失败、被停止或工作进程崩溃），
+        删除单条结果时在同一事务中执行相同的重建，读接口不调用此方法。
+        
+        Args:
+            task_id: 任务ID
+        
+        Returns:
+            List[TaskMetricAggregate]: 重建后的聚合统计
+        
+        Raises:
+            Exception: 当重建失败时
+        """
+        try:
+            aggregates = self._replace_metric_aggregates(task_id)
+            self.db.commit()
+
+            logger.info(f"Rebuilt {len(aggregates)} metric aggregates for task_id: {task_id}")
+            return aggregates
+        except Exception as e:
+            logger.error(f"Failed to rebuild metric aggregates for task_id {task_id}: {str(e)}")
+            self.db.rollback()
+            raise
+
+    def _replace_metric_aggregates(self, task_id: int) -> List[TaskMetricAggregate]:
+        """用从结果表计算的聚合替换任务现有的聚合（不提交，由调用方控制事务）"""
+        aggregates = self.compute_metric_aggregates(task_id)
+        self.db.query(TaskMetricAggregate).filter(
+            TaskMetricAggregate.task_id == task_id
+        ).delete(synchronize_session=False)
+        self.db.add_all(aggregates)
+        _bump_results_version(self.db, task_id)
+        return aggregates
+
+    def _unfinalized_metric_aggregates(self, task_ids: List[int]) -> Dict[int, Dict[str, AggregateStats]]:
+        """为缺少已定稿聚合的已结束任务即时计算聚合（通常只涉及历史数据，不写回数据库）"""
+        if not task_ids:
+            return {}
+        finalized = {
+            row.task_id for row in self.db.query(TaskMetricAggregate.task_id).filter(
+                TaskMetricAggregate.task_id.in_(task_ids),
+                TaskMetricAggregate.is_final == True
+            ).distinct()
+        }
+        return {
+            task_id: {
+                metric_name: AggregateStats.from_aggregate(aggregate)
+                for metric_name, aggregate in self.get_metric_aggregates(task_id).items()
+            }
+            for task_id in task_ids if task_id not in finalized
+        }
+
+    @staticmethod
+    def _aggregate_std_dev(aggregate: TaskMetricAggregate) -> float:
+        """由聚合统计计算样本标准差"""
+        if aggregate.count > 1:
+            return math.sqrt(max(aggregate.m2, 0.0) / (aggregate.count - 1))
+        return 0
+
     def compare_algorithms(
         self,
         algorithm_ids: List[int],
@@ -372,55 +1197,90 @@ class ResultService:
             logger.debug(f"Comparing algorithms with ids: {algorithm_ids}, metric: {metric_name}")
             comparison_data = {}
 
-            for algorithm_id in algorithm_ids:
-                # 获取该算法的最新任务
-                latest_task = self.db.query(TestTask).filter(
-                    TestTask.algorithm_id == algorithm_id,
-                    TestTask.status == 'COMPLETED'
-                ).order_by(desc(TestTask.finished_at)).first()
-
-                if latest_task:
-                    algorithm_data = {
-                        'algorithm_id': algorithm_id,
-                        'algorithm_name': latest_task.algorithm.name,
-                        'category': latest_task.algorithm.category,
-                        'latest_task_id': latest_task.id,
-                        'test_date': latest_task.finished_at
+            # 一次查询获取每个算法最新完成的任务（窗口函数按完成时间排序）
+            ranked_tasks = self.db.query(
+                TestTask.id.label('task_id'),
+                TestTask.algorithm_id.label('algorithm_id'),
+                TestTask.finished_at.label('finished_at'),
+                func.row_number().over(
+                    partition_by=TestTask.algorithm_id,
+                    order_by=(desc(TestTask.finished_at), desc(TestTask.id))
+                ).label('rank')
+            ).filter(
+                TestTask.algorithm_id.in_(algorithm_ids),
+                TestTask.status == 'COMPLETED'
+            ).subquery()
+
+            latest_tasks = {
+                row.algorithm_id: row
+                for row in self.db.query(
+                    ranked_tasks.c.task_id,
+                    ranked_tasks.c.algorithm_id,
+                    ranked_tasks.c.finished_at,
+                    Algorithm.name,
+                    Algorithm.category
+                ).join(
+                    Algorithm, Algorithm.id == ranked_tasks.c.algorithm_id
+                ).filter(ranked_tasks.c.rank == 1)
+            }
+
+            # 一次查询读取各任务的指标聚合（两种存储方式的样本都已计入聚合）
+            task_metric_stats = {}
+            if latest_tasks:
+                task_ids = [row.task_id for row in latest_tasks.values()]
+                unfinalized = self._unfinalized_metric_aggregates(task_ids)
+                stats_query = self.db.query(
+                    TaskMetricAggregate.task_id,
+                    TaskMetricAggregate.metric_name,
+                    TaskMetricAggregate.count.label('count'),
+                    (TaskMetricAggregate.total / TaskMetricAggregate.count).label('avg'),
+                    TaskMetricAggregate.min_value.label('min'),
+                    TaskMetricAggregate.max_value.label('max'),
+                    TaskMetricAggregate.last_value.label('last_value')
+                ).filter(
+                    TaskMetricAggregate.task_id.in_(task_ids)
+                )
+                if metric_name:
+                    stats_query = stats_query.filter(TaskMetricAggregate.metric_name == metric_name)
+                for row in stats_query:
+                    if row.task_id not in unfinalized:
+                        task_metric_stats.setdefault(row.task_id, {})[row.metric_name] = row
+                for task_id, task_stats in unfinalized.items():
+                    task_metric_stats[task_id] = {
+                        name: stats for name, stats in task_stats.items() if not metric_name or name == metric_name
                     }
 
-                    if metric_name:
-                        # 获取特定指标的数据
-                        metric_results = self.db.query(TestResult).filter(
-                            TestResult.task_id == latest_task.id,
-                            TestResult.metric_name == metric_name
-                        ).all()
-                        
-                        if metric_results:
-                            values = [r.value for r in metric_results]
-                            try:
-                                algorithm_data['metric_data'] = {
-                                    'metric_name': metric_name,
-                                    'avg': statistics.mean(values),
-                                    'min': min(values),
-                                    'max': max(values),
-                                    'count': len(values)
-                                }
-                            except statistics.StatisticsError as e:
-                                logger.warning(f"Failed to calculate statistics for metric {metric_name} in algorithm {algorithm_id}: {str(e)}")
-                                algorithm_data['metric_data'] = {'error': str(e)}
-                    else:
-                        # 获取性能指标摘要
-                        try:
-                            metrics = self.get_performance_metrics(latest_task.id)
-                            if metrics:
-                                algorithm_data['performance_metrics'] = metrics.dict()
-                        except Exception as e:
-                            logger.warning(f"Failed to get performance metrics for task {latest_task.id}: {str(e)}")
-                            algorithm_data['performance_metrics_error'] = str(e)
-
-                    comparison_data[latest_task.algorithm.name] = algorithm_data
-                else:
+            for algorithm_id in algorithm_ids:
+                latest_task = latest_tasks.get(algorithm_id)
+                if not latest_task:
                     logger.warning(f"No completed tasks found for algorithm_id: {algorithm_id}")
+                    continue
+
+                algorithm_data = {
+                    'algorithm_id': algorithm_id,
+                    'algorithm_name': latest_task.name,
+                    'category': latest_task.category,
+                    'latest_task_id': latest_task.task_id,
+                    'test_date': latest_task.finished_at
+                }
+                task_stats = task_metric_stats.get(latest_task.task_id, {})
+
+                if metric_name:
+                    # 特定指标的数据
+                    stats = task_stats.get(metric_name)
+                    if stats:
+                        algorithm_data['metric_data'] = {
+                            'metric_name': metric_name,
+                            'avg': stats.avg,
+                            'min': stats.min,
+                            'max': stats.max,
+                            'count': stats.count
+                        }
+                elif task_stats:
+                    # 性能指标摘要（与performance_summary视图的取值规则一致）
+                    algorithm_data['performance_metrics'] = self._build_performance_metrics(task_stats).dict()
+
+                comparison_data[latest_task.name] = algorithm_data
 
             logger.info(f"Successfully compared {len(comparison_data)} algorithms")
             return {
@@ -435,6 +1295,33 @@ class ResultService:
             logger.error(f"Failed to compare algorithms: {str(e)}")
             raise
 
+    @staticmethod
+    def _average_times(task_stats: Dict[str, Any]) -> Dict[str, float]:
+        """计算各时间指标的平均值（avg_前缀）
+        
+        消息大小扫描任务没有sign_time/verify_time，按各消息大小指标（如sign_time_1KiB）
+        的全部样本合并计算平均值。
+        """
+        totals: Dict[str, Tuple[int, float]] = {}
+        for metric_name, stats in task_stats.items():
+            metric = metric_name if metric_name in TIME_METRICS else sweep_base_metric(metric_name)
+            if metric is None or not stats.count:
+                continue
+            count, total = totals.get(metric, (0, 0.0))
+            totals[metric] = (count + stats.count, total + stats.avg * stats.count)
+        return {f'avg_{metric}': total / count for metric, (count, total) in totals.items()}
+
+    @staticmethod
+    def _build_performance_metrics(task_stats: Dict[str, Any]) -> schemas.PerformanceMetrics:
+        """由按指标聚合的统计构造性能指标：时间取平均值，大小取最大值，成功率取最后写入的值"""
+        performance_data = ResultService._average_times(task_stats)
+        for metric in ['public_key_size', 'private_key_size', 'signature_size', 'ciphertext_size']:
+            if metric in task_stats:
+                performance_data[metric] = task_stats[metric].max
+        success_rate = task_stats.get('success_rate')
+        performance_data['success_rate'] = success_rate.last_value if success_rate else 0.0
+        return schemas.PerformanceMetrics(**performance_data)
+
     def get_algorithm_latest_results(
         self,
         algorithm_id: int,
@@ -484,6 +1371,16 @@ class ResultService:
             results = self.db.query(TestResult).filter(
                 TestResult.task_id.in_(task_ids)
             ).order_by(desc(TestResult.created_at)).limit(actual_limit).all()
+            # 只解码覆盖最新actual_limit条样本的序列段
+            series_results = []
+            for segment, values, rounds in result_series.latest_segments(self.db, task_ids, actual_limit):
+                series_results.extend(self._expand_segment(segment, values, rounds))
+            if series_results:
+                results = sorted(
+                    results + series_results,
+                    key=lambda result: (result.created_at, result.test_round or 0),
+                    reverse=True
+                )[:actual_limit]
             
             logger.info(f"Successfully fetched {len(results)} latest results for algorithm_id: {algorithm_id}")
             return results
@@ -532,40 +1429,60 @@ class ResultService:
             end_date = datetime.utcnow()
             start_date = end_date - timedelta(days=days)
 
-            # 获取时间范围内的任务
-            tasks = self.db.query(TestTask).filter(
+            # 时间范围内已完成的任务
+            task_filter = (
                 TestTask.algorithm_id == algorithm_id,
                 TestTask.status == 'COMPLETED',
                 TestTask.finished_at >= start_date,
                 TestTask.finished_at <= end_date
+            )
+            unfinalized = self._unfinalized_metric_aggregates(
+                [row.id for row in self.db.query(TestTask.id).filter(*task_filter)]
+            )
+
+            # 一次查询从指标聚合表读取各任务的平均值
+            rows = self.db.query(
+                TestTask.id,
+                TestTask.task_name,
+                TestTask.finished_at,
+                (TaskMetricAggregate.total / TaskMetricAggregate.count).label('avg_value'),
+                TaskMetricAggregate.count.label('sample_count')
+            ).join(
+                TaskMetricAggregate, TaskMetricAggregate.task_id == TestTask.id
+            ).filter(
+                *task_filter,
+                TaskMetricAggregate.metric_name == metric_name,
+                TestTask.id.notin_(list(unfinalized))
             ).order_by(TestTask.finished_at).all()
 
-            if not tasks:
-                logger.warning(f"No completed tasks found for algorithm_id: {algorithm_id} in the last {days} days")
-                return {'data': [], 'algorithm_id': algorithm_id, 'metric_name': metric_name}
-
-            history_data = []
-            for task in tasks:
-                # 获取该任务的指定指标数据
-                metric_results = self.db.query(TestResult).filter(
-                    TestResult.task_id == task.id,
-                    TestResult.metric_name == metric_name
-                ).all()
-
-                if metric_results:
-                    values = [r.value for r in metric_results]
-                    try:
-                        avg_value = statistics.mean(values)
-                        
-                        history_data.append({
-                            'date': task.finished_at.isoformat(),
-                            'task_id': task.id,
-                            'task_name': task.task_name,
-                            'value': avg_value,
-                            'sample_count': len(values)
-                        })
-                    except statistics.StatisticsError as e:
-                        logger.warning(f"Failed to calculate mean for metric {metric_name} in task {task.id}: {str(e)}")
+            # 未定稿任务使用即时计算的聚合
+            unfinalized_stats = {
+                task_id: task_stats[metric_name]
+                for task_id, task_stats in unfinalized.items() if metric_name in task_stats
+            }
+            if unfinalized_stats:
+                rows.extend(
+                    HistoryRow(task.id, task.task_name, task.finished_at,
+                               unfinalized_stats[task.id].avg, unfinalized_stats[task.id].count)
+                    for task in self.db.query(TestTask.id, TestTask.task_name, TestTask.finished_at).filter(
+                        TestTask.id.in_(list(unfinalized_stats))
+                    )
+                )
+                rows.sort(key=lambda row: row.finished_at)
+
+            if not rows:
+                logger.warning(f"No completed tasks with metric {metric_name} found for algorithm_id: {algorithm_id} in the last {days} days")
+
+            history_data = [
+                {
+                    'date': row.finished_at.isoformat(),
+                    'task_id': row.id,
+                    'task_name': row.task_name,
+                    'value': row.avg_value,
+                    'sample_count': row.sample_count
+                }
+                for row in rows
+            ]
 
             logger.info(f"Successfully fetched performance history with {len(history_data)} points for algorithm_id: {algorithm_id}")
             return {
@@ -607,88 +1524,106 @@ class ResultService:
             
             logger.debug(f"Calculating metric distribution for task_id: {task_id}, metric: {metric_name}")
             
-            results = self.db.query(TestResult).filter(
-                TestResult.task_id == task_id,
-                TestResult.metric_name == metric_name
-            ).all()
-
-            if not results:
-                logger.warning(f"No results found for task_id: {task_id} and metric: {metric_name}")
-                return {
-                    'values': [],
-                    'histogram': {},
-                    'statistics': {},
-                    'message': 'No data available'
-                }
-
-            values = [r.value for r in results]
-            
-            # 创建直方图数据
-            bins = 20
-            try:
-                min_val, max_val = min(values), max(values)
-            except ValueError as e:
-                logger.error(f"Failed to calculate min/max values: {str(e)}")
-                return {
-                    'values': values,
-                    'histogram': {},
-                    'statistics': {},
-                    'error': str(e)
-                }
-                
-            if min_val == max_val:
-                logger.info(f"All values are the same ({min_val}) for task_id: {task_id}, metric: {metric_name}")
-                return {
-                    'values': values,
-                    'histogram': {'bins': [min_val], 'counts': [len(values)]},
-                    'statistics': {
-                        'count': len(values),
-                        'mean': min_val,
-                        'std': 0,
-                        'min': min_val,
-                        'max': max_val
-                    }
-                }
-
-            bin_width = (max_val - min_val) / bins
-            bin_edges = [min_val + i * bin_width for i in range(bins + 1)]
-            counts = [0] * bins
-
-            for value in values:
-                bin_index = min(int((value - min_val) / bin_width), bins - 1)
-                counts[bin_index] += 1
-
-            # 计算统计信息
-            try:
-                statistics_data = {
-                    'count': len(values),
-                    'mean': statistics.mean(values),
-                    'std': statistics.stdev(values) if len(values) > 1 else 0,
-                    'min': min_val,
-                    'max': max_val,
-                    'median': statistics.median(values)
-                }
-            except statistics.StatisticsError as e:
-                logger.warning(f"Failed to calculate some statistics: {str(e)}")
-                statistics_data = {
-                    'count': len(values),
-                    'min': min_val,
-                    'max': max_val,
-                    'error': str(e)
-                }
-
+            distribution = analytics_cache.get_or_compute(
+                task_id, 'distribution',
+                lambda: self._compute_metric_distribution(task_id, metric_name),
+                lambda: self.get_cache_version(task_id),
+                metric_name=metric_name
+            )
             logger.info(f"Successfully calculated metric distribution for task_id: {task_id}, metric: {metric_name}")
-            return {
-                'values': values,
-                'histogram': {
-                    'bin_edges': bin_edges,
-                    'counts': counts
-                },
-                'statistics': statistics_data
-            }
+            return distribution
         except ValueError as e:
             logger.error(f"Value error in get_metric_distribution: {str(e)}")
             raise
         except Exception as e:
             logger.error(f"Failed to calculate metric distribution for task_id {task_id}, metric {metric_name}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def _compute_metric_distribution(self, task_id: int, metric_name: str) -> Dict[str, Any]:
+        """向量化计算指标的直方图和统计信息"""
+        values = metric_stats.load_metric_values(self.db, task_id, metric_name)
+        if not values.size:
+            logger.warning(f"No results found for task_id: {task_id} and metric: {metric_name}")
+            return {
+                'values': [],
+                'histogram': {},
+                'statistics': {},
+                'message': 'No data available'
+            }
+        return {
+            'values': values.tolist(),
+            'histogram': metric_stats.histogram(values, bins=20),
+            'statistics': metric_stats.describe(values)
+        }
+
+class AsyncResultService:
+    """ResultService读接口的异步版本
+
+    查询在AsyncDatabase提供的会话中执行，API端点等待结果时不阻塞事件循环。
+    """
+
+    def __init__(self, db: AsyncDatabase):
+        self.db = db
+
+    async def get_task_results(
+        self,
+        task_id: int,
+        metric_name: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[TestResult]:
+        return await self.db.run(lambda session: ResultService(session).get_task_results(task_id, metric_name, limit))
+
+    async def get_task_results_page(
+        self,
+        task_id: int,
+        limit: int = 1000,
+        cursor: Optional[str] = None,
+        metric_name: Optional[str] = None
+    ) -> Tuple[List[TestResult], Optional[str]]:
+        return await self.db.run(
+            lambda session: ResultService(session).get_task_results_page(task_id, limit, cursor, metric_name)
+        )
+
+    async def get_metric_series(
+        self,
+        task_id: int,
+        metric_name: str,
+        width: int = 800,
+        method: str = 'lttb'
+    ) -> Dict[str, Any]:
+        return await self.db.run(
+            lambda session: ResultService(session).get_metric_series(task_id, metric_name, width, method)
+        )
+
+    async def get_cache_version(self, task_id: int) -> Optional[str]:
+        return await self.db.run(lambda session: ResultService(session).get_cache_version(task_id))
+
+    async def get_task_results_summary(self, task_id: int) -> Optional[Dict[str, Any]]:
+        return await self.db.run(lambda session: ResultService(session).get_task_results_summary(task_id))
+
+    async def get_performance_metrics(self, task_id: int) -> Optional[schemas.PerformanceMetrics]:
+        return await self.db.run(lambda session: ResultService(session).get_performance_metrics(task_id))
+
+    async def compare_algorithms(
+        self,
+        algorithm_ids: List[int],
+        metric_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return await self.db.run(
+            lambda session: ResultService(session).compare_algorithms(algorithm_ids, metric_name)
+        )
+
+    async def get_algorithm_latest_results(self, algorithm_id: int, limit: int = 10) -> List[TestResult]:
+        return await self.db.run(
+            lambda session: ResultService(session).get_algorithm_latest_results(algorithm_id, limit)
+        )
+
+    async def get_algorithm_performance_history(
+        self,
+        algorithm_id: int,
+        metric_name: str,
+        days: int = 30
+    ) -> Dict[str, Any]:
+        return await self.db.run(
+            lambda session: ResultService(session).get_algorithm_performance_history(algorithm_id, metric_name, days)
+        )
\ No newline at end of file
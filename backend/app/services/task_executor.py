@@ -0,0 +1,203 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, Optional
+import multiprocessing
+import threading
+import logging
+import os
+
+from app.core.config import settings
+from app.services.progress_bus import progress_bus
+from app.services.host_metrics import host_metrics_sampler
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+def _init_worker(progress_queue):
+    """工作进程初始化：重建数据库连接、连接进度总线并预先加载进程内共享的PQC封装器"""
+    from app.db.database import engine
+    from app.libs.pqc_wrapper import get_pqc_wrapper
+
+    # 丢弃从父进程继承的连接，避免跨进程共享同一连接
+    engine.dispose()
+    progress_bus.attach_remote(progress_queue)
+    host_metrics_sampler.start()
+    get_pqc_wrapper(use_mock=settings.USE_MOCK)
+    logger.info("Task worker %d initialized with mock mode: %s", os.getpid(), settings.USE_MOCK)
+
+def _run_task(task_id: int) -> Optional[str]:
+    """在工作进程中执行单个测试任务，返回任务最终状态"""
+    from app.db.database import SessionLocal
+    from app.services.task_service import TaskService
+
+    db = SessionLocal()
+    try:
+        service = TaskService(db)
+        task = service.execute_task(task_id)
+        return task.status.value if task else None
+    finally:
+        db.close()
+
+class TaskExecutor:
+    """测试任务执行引擎
+
+    使用有界进程池执行测试任务，阻塞的C库调用不再占用API事件循环。
+    队列状态持久化在test_tasks表中：已入队但未开始的任务为PENDING且queued_at非空，
+    服务重启后会按入队顺序重新派发。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.TASK_EXECUTOR_WORKERS or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._futures: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """启动进程池并恢复数据库中未完成的队列"""
+        with self._lock:
+            self._ensure_pool()
+        self.recover()
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        """创建进程池（调用方需持有锁）"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(progress_bus.start_listener(),)
+            )
+            logger.info("Task executor started with %d workers", self.max_workers)
+        return self._pool
+
+    def submit(self, task_id: int) -> Future:
+        """将任务派发到进程池"""
+        with self._lock:
+            existing = self._futures.get(task_id)
+            if existing and not existing.done():
+                return existing
+
+            try:
+                future = self._ensure_pool().submit(_run_task, task_id)
+            except BrokenProcessPool:
+                logger.error("Task executor pool is broken, restarting")
+                self._pool = None
+                future = self._ensure_pool().submit(_run_task, task_id)
+
+            self._futures[task_id] = future
+
+        future.add_done_callback(lambda f, task_id=task_id: self._on_task_done(task_id, f))
+        logger.info("Task %d submitted to executor", task_id)
+        return future
+
+    def _on_task_done(self, task_id: int, future: Future):
+        with self._lock:
+            if self._futures.get(task_id) is future:
+                del self._futures[task_id]
+
+        if future.cancelled():
+            logger.warning("Task %d was cancelled before execution", task_id)
+            return
+
+        error = future.exception()
+        if error:
+            logger.error("Task %d crashed in worker process: %s", task_id, str(error))
+            self._mark_failed(task_id, f"工作进程异常: {str(error)}")
+        else:
+            logger.info("Task %d finished in worker with status: %s", task_id, future.result())
+
+    def _mark_failed(self, task_id: int, error_message: str):
+        """工作进程崩溃时将任务标记为失败"""
+        from app.db.database import SessionLocal
+        from app.models.models import TestTask, TaskStatus
+
+        db = SessionLocal()
+        try:
+            failed = db.query(TestTask).filter(
+                TestTask.id == task_id,
+                TestTask.status.in_([TaskStatus.PENDING, TaskStatus.RUNNING])
+            ).update({
+                TestTask.status: TaskStatus.FAILED,
+                TestTask.error_message: error_message,
+                TestTask.finished_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+            progress_bus.publish(task_id, status=TaskStatus.FAILED.value, error_message=error_message,
+                                 finished_at=datetime.utcnow())
+            if failed:
+                self._rebuild_aggregates(db, [task_id])
+        except Exception as e:
+            logger.error("Failed to mark task %d as failed: %s", task_id, str(e))
+            db.rollback()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _rebuild_aggregates(db, task_ids):
+        """异常结束的任务没有定稿聚合，从已写入的结果重建"""
+        from app.services.result_service import ResultService
+
+        result_service = ResultService(db)
+        for task_id in task_ids:
+            try:
+                result_service.rebuild_metric_aggregates(task_id)
+            except Exception as e:
+                logger.warning("Failed to rebuild metric aggregates for task %d: %s", task_id, str(e))
+
+    def recover(self):
+        """恢复持久化队列：中断的任务标记为失败，已入队的任务重新派发"""
+        from app.db.database import SessionLocal
+        from app.models.models import TestTask, TaskStatus
+
+        db = SessionLocal()
+        try:
+            interrupted_ids = [row.id for row in db.query(TestTask.id).filter(
+                TestTask.status == TaskStatus.RUNNING
+            ).all()]
+            interrupted = db.query(TestTask).filter(
+                TestTask.id.in_(interrupted_ids),
+                TestTask.status == TaskStatus.RUNNING
+            ).update({
+                TestTask.status: TaskStatus.FAILED,
+                TestTask.error_message: "服务重启，任务执行被中断",
+                TestTask.finished_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+            if interrupted:
+                logger.warning("Marked %d interrupted tasks as failed", interrupted)
+                self._rebuild_aggregates(db, interrupted_ids)
+
+            queued_ids = [row.id for row in db.query(TestTask.id).filter(
+                TestTask.status == TaskStatus.PENDING,
+                TestTask.queued_at.isnot(None)
+            ).order_by(TestTask.queued_at).all()]
+        except Exception as e:
+            logger.error("Failed to recover task queue: %s", str(e))
+            db.rollback()
+            return
+        finally:
+            db.close()
+
+        for task_id in queued_ids:
+            self.submit(task_id)
+        if queued_ids:
+            logger.info("Re-submitted %d queued tasks", len(queued_ids))
+
+    def active_task_ids(self):
+        """获取已派发但尚未结束的任务ID"""
+        with self._lock:
+            return [task_id for task_id, future in self._futures.items() if not future.done()]
+
+    def shutdown(self, wait: bool = False):
+        """关闭进程池，未开始的任务保留在持久化队列中"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._futures.clear()
+        if pool:
+            pool.shutdown(wait=wait, cancel_futures=True)
+            progress_bus.stop_listener()
+            logger.info("Task executor stopped")
+
+# 进程级共享的任务执行引擎
+task_executor = TaskExecutor()
@@ -2,24 +2,36 @@ from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import json
-import asyncio
 import os
+import time
 import logging
 
 from app.models.models import TestTask, Algorithm, TaskStatus
 from app.models import schemas
-from app.libs.pqc_wrapper import PQCWrapper
+from app.db.database import AsyncDatabase
+from app.libs.pqc_wrapper import PQCWrapper, get_pqc_wrapper
+from app.libs.timing import Timer
+from app.libs.cpu_affinity import CpuPinning
+from app.libs.throughput import ThroughputConfig, scaling_efficiency
+from app.libs.key_reuse import KeyReuse
+from app.libs.message_sweep import SWEEP_METRICS, parse_message_sizes, random_message, sweep_metric
 from app.services.result_service import ResultService
+from app.services.analytics_cache import analytics_cache
+from app.services.progress_bus import progress_bus
+from app.services.host_metrics import host_metrics_sampler
 from app.core.config import settings
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+class TaskStopped(Exception):
+    """任务在执行过程中被停止"""
+
 class TaskService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, pqc_wrapper: Optional[PQCWrapper] = None):
         self.db = db
-        # 使用配置中的模拟模式设置初始化PQCWrapper
-        self.pqc_wrapper = PQCWrapper(use_mock=settings.USE_MOCK)
+        # 默认使用进程内共享的PQC封装器
+        self.pqc_wrapper = pqc_wrapper or get_pqc_wrapper(use_mock=settings.USE_MOCK)
         self.result_service = ResultService(db)
         logger.info("TaskService initialized with mock mode: %s", settings.USE_MOCK)
 
@@ -70,8 +82,8 @@ class TaskService:
                 raise ValueError("任务名称不能为空")
             if task.test_count <= 0:
                 raise ValueError("测试次数必须为正数")
-            if task.test_count > 1000:
-                raise ValueError("测试次数不能超过1000")
+            if task.test_count > settings.MAX_TEST_COUNT:
+                raise ValueError(f"测试次数不能超过{settings.MAX_TEST_COUNT}")
 
             # 验证算法是否存在
             logger.info("Creating task for algorithm_id: %d", task.algorithm_id)
@@ -83,6 +95,7 @@ class TaskService:
             if not algorithm:
                 logger.error("Algorithm with id %d not found or inactive", task.algorithm_id)
                 raise ValueError("算法不存在或已禁用")
+            self._validate_parameters(task.parameters, algorithm.category)
 
             # 转换参数为JSON字符串
             parameters_json = json.dumps(task.parameters) if task.parameters else None
@@ -109,6 +122,22 @@ class TaskService:
             self.db.rollback()
             raise
 
+    @staticmethod
+    def _validate_parameters(parameters: Optional[Dict[str, Any]], category: Optional[str] = None):
+        """校验测试参数中的执行选项，无效时抛出ValueError"""
+        Timer.from_parameters(parameters)
+        CpuPinning.from_parameters(parameters)
+        throughput = ThroughputConfig.from_parameters(parameters)
+        if throughput is not None and category:
+            throughput.operations_for(category)
+        if KeyReuse.from_parameters(parameters) is not None and throughput is not None:
+            raise ValueError("吞吐量模式已复用预先生成的密钥，不支持key_reuse")
+        if parse_message_sizes(parameters) is not None:
+            if throughput is not None:
+                raise ValueError("吞吐量模式不支持message_sizes")
+            if category and getattr(category, 'value', category) != "SIGNATURE":
+                raise ValueError("只有签名算法支持message_sizes")
+
     def update_task(
         self, 
         task_id: int, 
@@ -130,8 +159,13 @@ class TaskService:
             
             # 处理参数字段
             if 'parameters' in update_data and update_data['parameters'] is not None:
+                self._validate_parameters(update_data['parameters'], db_task.algorithm.category)
                 update_data['parameters'] = json.dumps(update_data['parameters'])
             
+            # 验证测试次数
+            if update_data.get('test_count') is not None and not 0 < update_data['test_count'] <= settings.MAX_TEST_COUNT:
+                raise ValueError(f"测试次数必须在1到{settings.MAX_TEST_COUNT}之间")
+            
             # 验证任务名称
             if 'task_name' in update_data and update_data['task_name'] and len(update_data['task_name'].strip()) == 0:
                 raise ValueError("任务名称不能为空")
@@ -141,6 +175,8 @@ class TaskService:
 
             self.db.commit()
             self.db.refresh(db_task)
+            # 丢弃进度总线中的旧快照，下次查询时重新加载
+            progress_bus.forget(task_id)
             logger.info("Task %d updated successfully", task_id)
             return db_task
         except ValueError as e:
@@ -181,6 +217,8 @@ class TaskService:
             # 删除任务（由于设置了CASCADE，相关的test_results会自动删除）
             self.db.delete(db_task)
             self.db.commit()
+            progress_bus.forget(task_id)
+            analytics_cache.invalidate(task_id)
             logger.info("Task %d deleted successfully", task_id)
             return True
         except ValueError as e:
@@ -191,24 +229,49 @@ class TaskService:
             self.db.rollback()
             return False
 
-    async def execute_task_background(self, task_id: int):
-        """后台执行任务"""
+    def enqueue_task(self, task_id: int) -> TestTask:
+        """将待运行任务加入执行队列，由任务执行引擎在工作进程中运行"""
+        from app.services.task_executor import task_executor
+
+        task = self.get_task(task_id)
+        if not task:
+            raise ValueError(f"任务ID {task_id} 不存在")
+        if task.status != TaskStatus.PENDING:
+            raise ValueError(f"任务状态不是待运行，当前状态: {task.status}")
+
+        # 记录入队时间，服务重启后据此恢复队列
+        task.queued_at = datetime.utcnow()
+        self.db.commit()
+        self._publish_status(task)
+        
+        task_executor.submit(task_id)
+        logger.info("Task %d queued for execution", task_id)
+        return task
+
+    def execute_task(self, task_id: int) -> Optional[TestTask]:
+        """执行任务（在任务执行引擎的工作进程中同步运行）"""
+        # 以条件更新的方式认领任务，避免同一任务被重复执行
+        claimed = self.db.query(TestTask).filter(
+            TestTask.id == task_id,
+            TestTask.status == TaskStatus.PENDING
+        ).update({
+            TestTask.status: TaskStatus.RUNNING,
+            TestTask.started_at: datetime.utcnow()
+        }, synchronize_session=False)
+        self.db.commit()
+
         task = self.get_task(task_id)
         if not task:
             logger.warning("Cannot execute task: task %d not found", task_id)
-            return
+            return None
+        if not claimed:
+            logger.warning("Task %d is not in pending state, current state: %s", 
+                          task_id, task.status)
+            return task
+        self._publish_status(task, completed_rounds=0)
+        window_start = time.time()
 
         try:
-            # 检查任务状态
-            if task.status != TaskStatus.PENDING:
-                logger.warning("Task %d is not in pending state, current state: %s", 
-                              task_id, task.status)
-                return
-
-            # 更新任务状态为运行中
-            task.status = TaskStatus.RUNNING
-            task.started_at = datetime.utcnow()
-            self.db.commit()
             logger.info("Task %d started execution", task_id)
 
             # 获取算法信息
@@ -223,224 +286,275 @@ class TaskService:
             except json.JSONDecodeError as e:
                 raise ValueError(f"Invalid parameters format: {str(e)}")
 
-            # 执行测试
-            if algorithm.category == "KEM":
-                self._execute_kem_test(task, algorithm, parameters)
-            elif algorithm.category == "SIGNATURE":
-                self._execute_signature_test(task, algorithm, parameters)
-            else:
-                raise ValueError(f"Unsupported algorithm type: {algorithm.category}")
+            # 在绑定的CPU上执行测试，并记录实际生效的调度设置
+            with CpuPinning.from_parameters(parameters).applied() as cpu_applied:
+                parameters['cpu'] = dict(parameters.get('cpu') or {}, applied=cpu_applied)
+                logger.info("Task %d running with CPU settings: %s", task_id, cpu_applied)
+                throughput = ThroughputConfig.from_parameters(parameters)
+                if throughput is not None:
+                    parameters['throughput'] = throughput.describe(algorithm.category)
+                    self._execute_throughput_test(task, algorithm, throughput)
+                elif algorithm.category == "KEM":
+                    self._execute_kem_test(task, algorithm, parameters)
+                elif algorithm.category == "SIGNATURE":
+                    self._execute_signature_test(task, algorithm, parameters)
+                else:
+                    raise ValueError(f"Unsupported algorithm type: {algorithm.category}")
+            task.parameters = json.dumps(parameters)
 
-            # 更新任务状态为完成
-            task.status = TaskStatus.COMPLETED
-            task.finished_at = datetime.utcnow()
-            logger.info("Task %d completed successfully", task_id)
+            # 更新任务状态为完成（任务已被停止时保留停止状态）
+            if self._finish_task(task_id, TaskStatus.COMPLETED):
+                logger.info("Task %d completed successfully", task_id)
+
+        except TaskStopped:
+            self.db.rollback()
+            logger.info("Task %d stopped by user, execution aborted", task_id)
 
         except Exception as e:
             # 更新任务状态为失败
+            self.db.rollback()
             error_msg = str(e)
-            task.status = TaskStatus.FAILED
-            task.error_message = error_msg
-            task.finished_at = datetime.utcnow()
-            logger.error("Task %d failed: %s", task_id, error_msg)
+            if self._finish_task(task_id, TaskStatus.FAILED, error_msg):
+                logger.error("Task %d failed: %s", task_id, error_msg)
 
         finally:
+            # 记录测试期间的主机负载
+            try:
+                host_metrics = host_metrics_sampler.summarize(window_start)
+                if host_metrics:
+                    task.host_metrics = json.dumps(host_metrics)
+            except Exception as e:
+                logger.warning("Failed to record host metrics for task %d: %s", task_id, str(e))
             self.db.commit()
             self.db.refresh(task)  # 确保获取最新状态
+            # 异常结束的任务没有定稿聚合，从已写入的结果重建
+            if task.status != TaskStatus.COMPLETED:
+                try:
+                    self.result_service.rebuild_metric_aggregates(task.id)
+                except Exception as e:
+                    logger.warning("Failed to rebuild metric aggregates for task %d: %s", task_id, str(e))
+            # 配置了磁盘缓存时预先写入分析结果，API进程可直接读取
+            if task.status == TaskStatus.COMPLETED and analytics_cache.persistent:
+                self.result_service.warm_analytics_cache(task.id)
+            self._publish_status(task)
+
+        return task
+
+    def _finish_task(self, task_id: int, status: TaskStatus, error_message: Optional[str] = None) -> bool:
+        """以条件更新的方式写入任务结束状态，只有任务仍在运行时才会生效
+
+        Returns:
+            bool: 是否写入了结束状态（任务已被停止时为False）
+        """
+        values = {TestTask.status: status, TestTask.finished_at: datetime.utcnow()}
+        if error_message is not None:
+            values[TestTask.error_message] = error_message
+        finished = self.db.query(TestTask).filter(
+            TestTask.id == task_id,
+            TestTask.status == TaskStatus.RUNNING
+        ).update(values, synchronize_session=False)
+        if not finished:
+            logger.warning("Task %d is no longer running, keeping its current status", task_id)
+        return bool(finished)
+
+    def _ensure_running(self, task_id: int):
+        """批次之间检查任务是否仍在运行，任务已被停止时抛出TaskStopped"""
+        # 结束当前事务，确保读到其他会话提交的最新状态
+        self.db.commit()
+        status = self.db.query(TestTask.status).filter(TestTask.id == task_id).scalar()
+        if status != TaskStatus.RUNNING:
+            raise TaskStopped(task_id)
 
     def _execute_kem_test(self, task: TestTask, algorithm: Algorithm, parameters: Dict):
         """执行KEM算法测试"""
-        results = []
-        
-        for round_num in range(task.test_count):
-            try:
-                logger.debug("Executing KEM test round %d for task %d, algorithm: %s", 
-                            round_num + 1, task.id, algorithm.name)
-                
-                # 调用C库执行KEM测试
-                test_result = self.pqc_wrapper.test_kem_algorithm(
-                    algorithm.name,
-                    algorithm.library_name
-                )
-                
-                # 记录各项指标
-                if test_result:
-                    # 密钥生成时间
-                    if 'keygen_time' in test_result:
-                        self.result_service.create_result(schemas.TestResultCreate(
-                            task_id=task.id,
-                            metric_name='keygen_time',
-                            value=test_result['keygen_time'],
-                            unit='ms',
-                            test_round=round_num + 1
-                        ))
-                    
-                    # 封装时间
-                    if 'encaps_time' in test_result:
-                        self.result_service.create_result(schemas.TestResultCreate(
-                            task_id=task.id,
-                            metric_name='encaps_time',
-                            value=test_result['encaps_time'],
-                            unit='ms',
-                            test_round=round_num + 1
-                        ))
-                    
-                    # 解封装时间
-                    if 'decaps_time' in test_result:
-                        self.result_service.create_result(schemas.TestResultCreate(
-                            task_id=task.id,
-                            metric_name='decaps_time',
-                            value=test_result['decaps_time'],
-                            unit='ms',
-                            test_round=round_num + 1
-                        ))
-                    
-                    # 密钥和密文大小（只记录一次）
-                    if round_num == 0:
-                        if 'public_key_size' in test_result:
-                            self.result_service.create_result(schemas.TestResultCreate(
-                                task_id=task.id,
-                                metric_name='public_key_size',
-                                value=test_result['public_key_size'],
-                                unit='bytes'
-                            ))
-                        
-                        if 'private_key_size' in test_result:
-                            self.result_service.create_result(schemas.TestResultCreate(
-                                task_id=task.id,
-                                metric_name='private_key_size',
-                                value=test_result['private_key_size'],
-                                unit='bytes'
-                            ))
-                        
-                        if 'ciphertext_size' in test_result:
-                            self.result_service.create_result(schemas.TestResultCreate(
-                                task_id=task.id,
-                                metric_name='ciphertext_size',
-                                value=test_result['ciphertext_size'],
-                                unit='bytes'
-                            ))
-                    
-                    # 成功/失败标记
-                    success = test_result.get('success', False)
-                    results.append(1 if success else 0)
-                    
-                    if success:
-                        logger.debug("KEM test round %d for task %d completed successfully", 
-                                    round_num + 1, task.id)
-                    else:
-                        logger.warning("KEM test round %d for task %d completed with failure", 
-                                      round_num + 1, task.id)
-            except Exception as e:
-                logger.error("Error in KEM test round %d for task %d: %s", 
-                           round_num + 1, task.id, str(e))
-                results.append(0)
-                
-        # 计算成功率
-        success_rate = (sum(results) / len(results)) * 100 if results else 0
-        self.result_service.create_result(schemas.TestResultCreate(
-            task_id=task.id,
-            metric_name='success_rate',
-            value=success_rate,
-            unit='%'
-        ))
+        self._execute_batched_test(
+            task,
+            algorithm,
+            parameters,
+            self.pqc_wrapper.run_kem_batch,
+            time_metrics=('keygen_time', 'encaps_time', 'decaps_time'),
+            size_metrics=('public_key_size', 'private_key_size', 'ciphertext_size')
+        )
 
     def _execute_signature_test(self, task: TestTask, algorithm: Algorithm, parameters: Dict):
-        """执行签名算法测试"""
-        results = []
+        """执行签名算法测试，指定message_sizes时按各消息大小分别测试"""
+        message_sizes = parse_message_sizes(parameters)
+        if message_sizes is not None:
+            parameters['message_sizes'] = message_sizes
+        self._execute_batched_test(
+            task,
+            algorithm,
+            parameters,
+            self.pqc_wrapper.run_signature_batch,
+            time_metrics=('keygen_time', 'sign_time', 'verify_time'),
+            size_metrics=('public_key_size', 'private_key_size', 'signature_size'),
+            message_sizes=message_sizes
+        )
+
+    def _execute_batched_test(
+        self,
+        task: TestTask,
+        algorithm: Algorithm,
+        parameters: Dict,
+        run_batch,
+        time_metrics: tuple,
+        size_metrics: tuple,
+        message_sizes: Optional[List[int]] = None
+    ):
+        """按批次调用封装器的批量测试接口，并通过批量写入器记录结果
+
+        各批次共用一个计时器，预热和空调用校准只执行一次，
+        计时模式和校准数据记录到parameters中，由execute_task写回任务。
+        指定message_sizes时每个消息大小各执行test_count轮，随机消息缓冲区只生成一次，
+        签名和验证耗时按消息大小记录为单独的指标（如sign_time_1KiB），并同时记录吞吐量（MB/s）；
+        测试轮次在各消息大小之间连续编号，第k个消息大小的轮次从k*test_count+1开始。
+        指定key_reuse时密钥对在同一消息大小的各轮和各批次之间复用，每个消息大小开始时重新生成，
+        密钥生成只在实际执行的轮次记录。
+        """
+        timer = Timer.from_parameters(parameters)
+        key_reuse = KeyReuse.from_parameters(parameters)
+        # 至少分成约20批执行，使进度可以按批上报
+        chunk_size = max(1, min(settings.BENCHMARK_CHUNK_SIZE, -(-task.test_count // 20)))
+        passes = [(None, {})] if not message_sizes else [
+            (message_size, {'message': random_message(message_size)}) for message_size in message_sizes
+        ]
+        if key_reuse is not None:
+            for _, batch_kwargs in passes:
+                batch_kwargs['key_reuse'] = key_reuse
+        total_rounds = task.test_count * len(passes)
+        success_count = 0
+        sizes_recorded = False
         
-        for round_num in range(task.test_count):
-            try:
-                logger.debug("Executing signature test round %d for task %d, algorithm: %s", 
-                            round_num + 1, task.id, algorithm.name)
-                
-                # 调用C库执行签名测试
-                test_result = self.pqc_wrapper.test_signature_algorithm(
-                    algorithm.name,
-                    algorithm.library_name
-                )
-                
-                # 记录各项指标
-                if test_result:
-                    # 密钥生成时间
-                    if 'keygen_time' in test_result:
-                        self.result_service.create_result(schemas.TestResultCreate(
-                            task_id=task.id,
-                            metric_name='keygen_time',
-                            value=test_result['keygen_time'],
-                            unit='ms',
-                            test_round=round_num + 1
-                        ))
-                    
-                    # 签名时间
-                    if 'sign_time' in test_result:
-                        self.result_service.create_result(schemas.TestResultCreate(
-                            task_id=task.id,
-                            metric_name='sign_time',
-                            value=test_result['sign_time'],
-                            unit='ms',
-                            test_round=round_num + 1
-                        ))
+        with self.result_service.open_batch_writer(task.id) as writer:
+            for pass_index, (message_size, batch_kwargs) in enumerate(passes):
+                completed = 0
+                round_base = pass_index * task.test_count
+                if key_reuse is not None:
+                    key_reuse.reset()
+                # (指标名称, 记录名称, 吞吐量指标名称)
+                recorded_metrics = [
+                    (metric_name, sweep_metric(metric_name, message_size), sweep_metric(SWEEP_METRICS[metric_name], message_size))
+                    if message_size and metric_name in SWEEP_METRICS else (metric_name, metric_name, None)
+                    for metric_name in time_metrics
+                ]
+                while completed < task.test_count:
+                    self._ensure_running(task.id)
+                    iterations = min(chunk_size, task.test_count - completed)
+                    logger.debug("Executing %s test rounds %d-%d for task %d, algorithm: %s, message size: %s", 
+                                algorithm.category, completed + 1, completed + iterations, task.id, algorithm.name, message_size)
                     
-                    # 验证时间
-                    if 'verify_time' in test_result:
-                        self.result_service.create_result(schemas.TestResultCreate(
-                            task_id=task.id,
-                            metric_name='verify_time',
-                            value=test_result['verify_time'],
-                            unit='ms',
-                            test_round=round_num + 1
-                        ))
+                    try:
+                        # 调用C库批量执行测试
+                        batch = run_batch(algorithm.name, iterations, algorithm.library_name, timer, **batch_kwargs)
+                    except Exception as e:
+                        logger.error("Error in %s test rounds %d-%d for task %d: %s", 
+                                   algorithm.category, completed + 1, completed + iterations, task.id, str(e))
+                        completed += iterations
+                        progress_bus.publish(task.id, completed_rounds=(round_base + completed) // len(passes))
+                        continue
                     
-                    # 密钥和签名大小（只记录一次）
-                    if round_num == 0:
-                        if 'public_key_size' in test_result:
-                            self.result_service.create_result(schemas.TestResultCreate(
-                                task_id=task.id,
-                                metric_name='public_key_size',
-                                value=test_result['public_key_size'],
-                                unit='bytes'
-                            ))
-                        
-                        if 'private_key_size' in test_result:
-                            self.result_service.create_result(schemas.TestResultCreate(
-                                task_id=task.id,
-                                metric_name='private_key_size',
-                                value=test_result['private_key_size'],
-                                unit='bytes'
-                            ))
-                        
-                        if 'signature_size' in test_result:
-                            self.result_service.create_result(schemas.TestResultCreate(
-                                task_id=task.id,
-                                metric_name='signature_size',
-                                value=test_result['signature_size'],
-                                unit='bytes'
-                            ))
+                    # 记录各轮耗时，失败的轮次不记录耗时
+                    success = batch['success']
+                    timings = [
+                        (recorded_name, throughput_name, batch[metric_name])
+                        for metric_name, recorded_name, throughput_name in recorded_metrics if metric_name in batch
+                    ]
+                    for i in range(iterations):
+                        if not success[i]:
+                            continue
+                        for recorded_name, throughput_name, values in timings:
+                            value = values[i]
+                            # NaN表示本轮未执行该操作（如复用密钥对时的密钥生成）
+                            if value != value:
+                                continue
+                            test_round = round_base + completed + i + 1
+                            writer.add(recorded_name, value, 'ms', test_round)
+                            if throughput_name and value > 0:
+                                # 字节/毫秒换算为MB/s
+                                writer.add(throughput_name, message_size / (value * 1e3), 'MB/s', test_round)
                     
-                    # 成功/失败标记
-                    success = test_result.get('success', False)
-                    results.append(1 if success else 0)
+                    # 密钥、密文和签名大小（只记录一次）
+                    if not sizes_recorded:
+                        for metric_name in size_metrics:
+                            if metric_name in batch:
+                                writer.add(metric_name, batch[metric_name], 'bytes')
+                        sizes_recorded = True
                     
-                    if success:
-                        logger.debug("Signature test round %d for task %d completed successfully", 
-                                    round_num + 1, task.id)
-                    else:
-                        logger.warning("Signature test round %d for task %d completed with failure", 
-                                      round_num + 1, task.id)
-            except Exception as e:
-                logger.error("Error in signature test round %d for task %d: %s", 
-                           round_num + 1, task.id, str(e))
-                results.append(0)
+                    batch_success = sum(success)
+                    if batch_success < iterations:
+                        logger.warning("%s test rounds %d-%d for task %d had %d failures", 
+                                      algorithm.category, completed + 1, completed + iterations, task.id, iterations - batch_success)
+                    success_count += batch_success
+                    completed += iterations
+                    progress_bus.publish(task.id, completed_rounds=(round_base + completed) // len(passes))
                 
-        # 计算成功率
-        success_rate = (sum(results) / len(results)) * 100 if results else 0
-        self.result_service.create_result(schemas.TestResultCreate(
-            task_id=task.id,
-            metric_name='success_rate',
-            value=success_rate,
-            unit='%'
-        ))
+            # 计算成功率
+            success_rate = (success_count / total_rounds) * 100 if total_rounds else 0
+            writer.add('success_rate', success_rate, '%')
+            
+            # 记录实际使用的计时模式，模拟模式下的耗时未经计时
+            timing = timer.describe()
+            timing['simulated'] = self.pqc_wrapper.use_mock
+            parameters['timing'] = timing
+            if key_reuse is not None:
+                parameters['key_reuse'] = key_reuse.describe()
+            
+            # 写入各指标的分位数
+            writer.finalize()
+
+    def _execute_throughput_test(self, task: TestTask, algorithm: Algorithm, config: ThroughputConfig):
+        """执行吞吐量测试：每个操作在各并发度下持续执行固定时长
+
+        每个操作记录三类指标，测试轮次为并发度：{操作}_throughput为总吞吐量，
+        {操作}_worker_throughput为各线程/进程的吞吐量，{操作}_scaling_efficiency为扩展效率。
+        """
+        operations = config.operations_for(algorithm.category)
+        total_steps = len(operations) * len(config.concurrency)
+        completed_steps = 0
+        total_operations = 0
+        total_failures = 0
+        sizes_recorded = False
+
+        with self.result_service.open_batch_writer(task.id) as writer:
+            for operation in operations:
+                baseline = None
+                # 并发度从1开始，单线程结果作为扩展效率的基准
+                for concurrency in config.concurrency:
+                    self._ensure_running(task.id)
+                    result = self.pqc_wrapper.run_throughput(
+                        algorithm.category, algorithm.name, operation, concurrency,
+                        config.duration, algorithm.library_name, config.use_processes
+                    )
+                    ops_per_sec = result['ops_per_sec']
+                    if baseline is None:
+                        baseline = ops_per_sec
+                    logger.info("Task %d %s %s throughput with %d workers: %.1f ops/s",
+                                task.id, algorithm.name, operation, concurrency, ops_per_sec)
+
+                    writer.add(f'{operation}_throughput', ops_per_sec, 'ops/s', concurrency)
+                    for worker_ops_per_sec in result['worker_ops_per_sec']:
+                        writer.add(f'{operation}_worker_throughput', worker_ops_per_sec, 'ops/s', concurrency)
+                    writer.add(f'{operation}_scaling_efficiency',
+                               scaling_efficiency(ops_per_sec, concurrency, baseline), '%', concurrency)
+
+                    # 密钥、密文和签名大小（只记录一次）
+                    if not sizes_recorded:
+                        for metric_name, value in result.items():
+                            if metric_name.endswith('_size'):
+                                writer.add(metric_name, value, 'bytes')
+                        sizes_recorded = True
+
+                    total_operations += result['operations']
+                    total_failures += result['failures']
+                    completed_steps += 1
+                    progress_bus.publish(task.id, completed_rounds=task.test_count * completed_steps // total_steps)
+
+            # 计算成功率
+            success_rate = (total_operations - total_failures) / total_operations * 100 if total_operations else 0
+            writer.add('success_rate', success_rate, '%')
+
+            # 写入各指标的分位数
+            writer.finalize()
 
     def stop_task(self, task_id: int) -> bool:
         """停止正在运行的任务"""
@@ -451,11 +565,21 @@ class TaskService:
                 logger.warning("Cannot stop task %d: not found or not running", task_id)
                 return False
             
-            # 将状态设置为失败
-            task.status = TaskStatus.FAILED
-            task.error_message = "任务被用户停止"
-            task.finished_at = datetime.utcnow()
+            # 将状态设置为失败，工作进程在下一批次前检测到后中止执行
+            stopped = self.db.query(TestTask).filter(
+                TestTask.id == task_id,
+                TestTask.status == TaskStatus.RUNNING
+            ).update({
+                TestTask.status: TaskStatus.FAILED,
+                TestTask.error_message: "任务被用户停止",
+                TestTask.finished_at: datetime.utcnow()
+            }, synchronize_session=False)
             self.db.commit()
+            if not stopped:
+                logger.warning("Cannot stop task %d: it finished before it could be stopped", task_id)
+                return False
+            self.db.refresh(task)
+            self._publish_status(task)
             logger.info("Task %d stopped successfully", task_id)
             return True
         except Exception as e:
@@ -464,62 +588,71 @@ class TaskService:
             return False
 
     def get_task_status(self, task_id: int) -> Optional[Dict[str, Any]]:
-        """获取任务执行状态"""
+        """获取任务执行状态
+        
+        优先读取进度总线中的内存快照，只有快照不存在时（如服务重启后、
+        任务由其他API进程执行）才查询数据库。数据库中的状态不写回总线，
+        否则任务在其他进程中结束后本进程会一直返回过期的快照。
+        """
+        snapshot = progress_bus.get(task_id)
+        if snapshot and 'task_name' in snapshot:
+            return snapshot
+        
         try:
-            logger.debug("Getting status for task %d", task_id)
+            logger.debug("Loading status for task %d from database", task_id)
             task = self.get_task(task_id)
             if not task:
                 return None
-            
-            status_info = {
-                'task_id': task.id,
-                'status': task.status,
-                'progress': 0,
-                'started_at': task.started_at,
-                'finished_at': task.finished_at,
-                'error_message': task.error_message,
-                'algorithm_id': task.algorithm_id,
-                'test_count': task.test_count,
-                'task_name': task.task_name
-            }
-            
-            # 如果任务完成，计算进度为100%
-            if task.status == TaskStatus.COMPLETED:
-                status_info['progress'] = 100
-            elif task.status == TaskStatus.RUNNING:
-                # 通过结果数量估算进度，优化进度计算逻辑
-                result_count = self.result_service.get_task_result_count(task_id)
-                
-                # 根据算法类型动态调整估算的总结果数
-                algorithm = self.db.query(Algorithm).filter(Algorithm.id == task.algorithm_id).first()
-                if algorithm:
-                    if algorithm.category == "KEM":
-                        # KEM算法每轮产生3个时间结果，加上3个大小结果（仅第一轮）
-                        estimated_total = min(task.test_count * 3 + 3, result_count + (task.test_count * 3))
-                    else:  # SIGNATURE
-                        # 签名算法每轮产生3个时间结果，加上3个大小结果（仅第一轮）
-                        estimated_total = min(task.test_count * 3 + 3, result_count + (task.test_count * 3))
-                else:
-                    # 默认估算
-                    estimated_total = max(1, task.test_count * 3)
-                    
-                if estimated_total > 0:
-                    progress = (result_count / estimated_total) * 100
-                    # 限制进度最高为95%，保留5%用于最终处理
-                    status_info['progress'] = min(95, progress)
-                    logger.debug("Task %d progress: %d%% (results: %d/%d)", 
-                                task_id, status_info['progress'], result_count, estimated_total)
+            return progress_bus.snapshot(task.id, **self._status_fields(task))
         except Exception as e:
             logger.error("Error getting status for task %d: %s", task_id, str(e))
-            # 返回基本状态信息，避免完全失败
-            task = self.get_task(task_id)
-            if task:
-                return {
-                    'task_id': task.id,
-                    'status': task.status,
-                    'progress': 0 if task.status != TaskStatus.COMPLETED else 100,
-                    'error_message': f"获取详细状态出错: {str(e)}"
-                }
-            return None
-        
-        return status_info
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def _status_fields(task: TestTask) -> Dict[str, Any]:
+        """任务状态快照中来自数据库的字段"""
+        status = task.status.value if isinstance(task.status, TaskStatus) else task.status
+        return {
+            'status': status,
+            'started_at': task.started_at,
+            'finished_at': task.finished_at,
+            'error_message': task.error_message,
+            'algorithm_id': task.algorithm_id,
+            'test_count': task.test_count,
+            'task_name': task.task_name
+        }
+
+    def _publish_status(self, task: TestTask, **fields) -> Optional[Dict[str, Any]]:
+        """将任务的当前状态发布到进度总线"""
+        return progress_bus.publish(task.id, **self._status_fields(task), **fields)
+
+class AsyncTaskService:
+    """TaskService读接口的异步版本，返回值在会话内转换为响应模型"""
+
+    def __init__(self, db: AsyncDatabase):
+        self.db = db
+
+    async def get_tasks(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        algorithm_id: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> List[schemas.TestTask]:
+        def load(session: Session):
+            tasks = TaskService(session).get_tasks(skip=skip, limit=limit, algorithm_id=algorithm_id, status=status)
+            return [schemas.TestTask.from_orm(task) for task in tasks]
+        return await self.db.run(load)
+
+    async def get_task(self, task_id: int) -> Optional[schemas.TestTask]:
+        def load(session: Session):
+            task = TaskService(session).get_task(task_id)
+            return schemas.TestTask.from_orm(task) if task else None
+        return await self.db.run(load)
+
+    async def get_task_status(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """进度总线中有快照时直接返回，不占用数据库连接"""
+        snapshot = progress_bus.get(task_id)
+        if snapshot and 'task_name' in snapshot:
+            return snapshot
+        return await self.db.run(lambda session: TaskService(session).get_task_status(task_id))
@@ -1,13 +1,20 @@
 import uvicorn
+import asyncio
 import os
 import logging
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from app.core.config import settings
 from app.api.router import api_router
-from app.db.database import engine, Base
+from app.db.database import select_database_engine, prepare_schema, warm_up_pool, dispose_async_engine
+from app.services.task_executor import task_executor
+from app.services.report_jobs import report_job_queue
+from app.services.host_metrics import host_metrics_sampler
 
 # 配置日志
 logging.basicConfig(
@@ -16,13 +23,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# 创建数据库表
-try:
-    Base.metadata.create_all(bind=engine)
-    logger.info("数据库表创建成功")
-except Exception as e:
-    logger.error(f"创建数据库表时出错: {e}")
-
 # 确保reports目录存在
 try:
     reports_dir = settings.REPORTS_DIR
@@ -32,12 +32,71 @@ try:
 except Exception as e:
     logger.error(f"创建reports目录时出错: {e}")
 
+async def _run_startup_step(name: str, step, timeout: float) -> bool:
+    """在线程池中执行阻塞的启动步骤，出错时记录日志后继续启动
+
+    线程池中的步骤无法被取消，超时后继续启动会让服务与仍在执行的步骤
+    （如建表、切换引擎）并发运行，因此超时时终止启动。
+    """
+    try:
+        await asyncio.wait_for(run_in_threadpool(step), timeout=timeout)
+        return True
+    except asyncio.TimeoutError:
+        logger.error(f"{name}超时（{timeout}秒），终止启动")
+        raise RuntimeError(f"{name}超时（{timeout}秒）")
+    except Exception as e:
+        logger.error(f"{name}时出错: {e}")
+    return False
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用启动和关闭阶段
+
+    启动时先确定数据库引擎，再并发执行建表检查和连接池预热，
+    每个步骤都有超时限制，超时时终止启动。SKIP_DATABASE_PROBE只跳过MySQL探测，
+    SKIP_SCHEMA_CHECK跳过建表检查。
+    """
+    start_time = time.perf_counter()
+    timeout = settings.STARTUP_STEP_TIMEOUT
+    if settings.SKIP_DATABASE_PROBE:
+        if not settings.DATABASE_URL:
+            logger.warning("SKIP_DATABASE_PROBE已启用但未设置DATABASE_URL，MySQL不可用时不会切换到SQLite")
+        logger.info("已跳过数据库探测")
+    else:
+        await _run_startup_step("探测数据库", select_database_engine, timeout)
+
+    warm_up = _run_startup_step("预热数据库连接池", warm_up_pool, timeout)
+    if settings.SKIP_SCHEMA_CHECK:
+        logger.info("已跳过建表检查")
+        await warm_up
+    else:
+        schema_ready, _ = await asyncio.gather(
+            _run_startup_step("创建数据库表", prepare_schema, timeout),
+            warm_up
+        )
+        if schema_ready:
+            logger.info("数据库表创建成功")
+
+    # 任务执行引擎生命周期
+    host_metrics_sampler.start()
+    await _run_startup_step("启动任务执行引擎", task_executor.start, timeout)
+    await _run_startup_step("恢复报告生成任务", report_job_queue.recover, timeout)
+    logger.info(f"应用启动完成，耗时 {time.perf_counter() - start_time:.3f} 秒")
+
+    yield
+
+    task_executor.shutdown()
+    report_job_queue.shutdown()
+    host_metrics_sampler.stop()
+    await dispose_async_engine()
+
 # 应用初始化
 app = FastAPI(
     title="算法测试平台 API",
     description="用于测试和验证 NIST 标准化的后量子密码（PQC）算法的 API 接口",
     version="1.0.0",
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
 # 设置CORS
@@ -94,8 +153,8 @@ async def health_check():
     # 检查C库加载状态
     c_lib_status = "unhealthy"
     try:
-        from app.libs.pqc_wrapper import PQCWrapper
-        pqc = PQCWrapper(use_mock=False)
+        from app.libs.pqc_wrapper import get_pqc_wrapper
+        pqc = get_pqc_wrapper(use_mock=False)
         if pqc.liboqs or pqc.pqclean:
             c_lib_status = "healthy"
         elif pqc.use_mock:
@@ -117,6 +176,7 @@ async def health_check():
         "database": db_status,
         "c_library": c_lib_status,
         "reports_directory": reports_dir_status,
+        "host": host_metrics_sampler.latest(),
         "timestamp": str(os.path.getmtime(__file__))
     }
 
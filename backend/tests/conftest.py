@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# 在导入应用模块之前配置：使用临时SQLite数据库和模拟模式
+_DATABASE_DIR = tempfile.mkdtemp(prefix="algorithm-testing-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DATABASE_DIR, 'test.db')}"
+os.environ["USE_MYSQL"] = "false"
+os.environ["USE_MOCK"] = "true"
+os.environ.setdefault("ENVIRONMENT", "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.db.database import SessionLocal, prepare_schema  # noqa: E402
+from app.models.models import Algorithm, AlgorithmCategory, TaskStatus, TestTask  # noqa: E402
+
+prepare_schema()
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def algorithm(db):
+    algorithm = db.query(Algorithm).filter(Algorithm.name == "Kyber512").first()
+    if algorithm is None:
+        algorithm = Algorithm(name="Kyber512", category=AlgorithmCategory.KEM,
+                              source="liboqs", library_name="liboqs", is_active=True)
+        db.add(algorithm)
+        db.commit()
+    return algorithm
+
+@pytest.fixture
+def make_task(db, algorithm):
+    """创建测试任务，默认为已完成状态"""
+    def make(status=TaskStatus.COMPLETED, **fields):
+        task = TestTask(algorithm_id=algorithm.id, task_name="test", test_count=10, status=status, **fields)
+        db.add(task)
+        db.commit()
+        return task
+    return make
+
+@pytest.fixture
+def series_storage(monkeypatch):
+    """使用压缩序列存储逐轮样本"""
+    monkeypatch.setattr(settings, "RESULT_STORAGE_BACKEND", "series")
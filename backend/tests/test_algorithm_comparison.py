@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+import uuid
+
+import pytest
+
+from app.models import models
+from app.models.models import Algorithm, AlgorithmCategory, TaskStatus
+from app.services.result_service import ResultBatchWriter, ResultService
+
+@pytest.fixture
+def make_algorithm(db):
+    """创建独立的算法，避免与其他测试的任务混在一起"""
+    def make():
+        algorithm = Algorithm(name=f"Dilithium-{uuid.uuid4().hex[:8]}", category=AlgorithmCategory.SIGNATURE,
+                              source="liboqs", library_name="liboqs", is_active=True)
+        db.add(algorithm)
+        db.commit()
+        return algorithm
+    return make
+
+def _completed_task(db, algorithm, finished_at, metrics, finalize=True):
+    task = models.TestTask(algorithm_id=algorithm.id, task_name="history", test_count=10,
+                    status=TaskStatus.COMPLETED, finished_at=finished_at)
+    db.add(task)
+    db.commit()
+    writer = ResultBatchWriter(db, task.id)
+    for metric_name, values in metrics.items():
+        for test_round, value in enumerate(values, 1):
+            writer.add(metric_name, value, 'ms', test_round)
+    if finalize:
+        writer.finalize()
+    else:
+        writer.close()
+    return task
+
+def test_compare_uses_latest_completed_task_per_algorithm(db, make_algorithm):
+    now = datetime.utcnow()
+    first, second = make_algorithm(), make_algorithm()
+    _completed_task(db, first, now - timedelta(days=2), {'sign_time': [9.0, 9.0]})
+    latest = _completed_task(db, first, now, {'sign_time': [1.0, 3.0], 'signature_size': [2420, 2420]})
+    # 没有定稿聚合的历史任务即时计算
+    other = _completed_task(db, second, now, {'sign_time': [4.0, 6.0]}, finalize=False)
+
+    comparison = ResultService(db).compare_algorithms([first.id, second.id])
+
+    first_data = comparison['algorithms'][first.name]
+    assert first_data['latest_task_id'] == latest.id
+    assert first_data['performance_metrics']['avg_sign_time'] == 2.0
+    assert first_data['performance_metrics']['signature_size'] == 2420
+    assert comparison['algorithms'][second.name]['latest_task_id'] == other.id
+    assert comparison['algorithms'][second.name]['performance_metrics']['avg_sign_time'] == 5.0
+
+def test_compare_single_metric(db, make_algorithm):
+    algorithm = make_algorithm()
+    _completed_task(db, algorithm, datetime.utcnow(), {'sign_time': [1.0, 2.0, 6.0], 'verify_time': [1.0]})
+
+    comparison = ResultService(db).compare_algorithms([algorithm.id, 999999], 'sign_time')
+
+    assert comparison['total_algorithms'] == 1
+    assert comparison['algorithms'][algorithm.name]['metric_data'] == {
+        'metric_name': 'sign_time', 'avg': 3.0, 'min': 1.0, 'max': 6.0, 'count': 3
+    }
+
+def test_compare_rejects_invalid_ids(db):
+    with pytest.raises(ValueError):
+        ResultService(db).compare_algorithms([0])
+
+def test_performance_history_orders_tasks_within_period(db, make_algorithm):
+    now = datetime.utcnow()
+    algorithm = make_algorithm()
+    _completed_task(db, algorithm, now - timedelta(days=40), {'verify_time': [1.0]})
+    older = _completed_task(db, algorithm, now - timedelta(days=3), {'verify_time': [2.0, 4.0]}, finalize=False)
+    newer = _completed_task(db, algorithm, now - timedelta(days=1), {'verify_time': [5.0]})
+
+    history = ResultService(db).get_algorithm_performance_history(algorithm.id, 'verify_time', days=30)
+
+    assert [(point['task_id'], point['value'], point['sample_count']) for point in history['data']] == [
+        (older.id, 3.0, 2), (newer.id, 5.0, 1)
+    ]
+    assert history['total_points'] == 2
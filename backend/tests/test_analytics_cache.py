@@ -0,0 +1,78 @@
+from fastapi.testclient import TestClient
+
+from app.models import schemas
+from app.models.models import TaskStatus
+from app.services.analytics_cache import AnalyticsCache
+from app.services.result_service import ResultService
+from main import app
+
+client = TestClient(app)
+
+def test_etag_depends_on_version_and_content():
+    cache = AnalyticsCache(max_entries=8, cache_dir="")
+    first = cache.put(1, "v1", 'summary', {'count': 1})
+
+    assert cache.put(1, "v1", 'summary', {'count': 1}).etag == first.etag
+    assert cache.put(1, "v2", 'summary', {'count': 1}).etag != first.etag
+    assert cache.put(1, "v1", 'summary', {'count': 2}).etag != first.etag
+    assert first.etag.startswith('"') and first.etag.endswith('"')
+    assert cache.get(1, None, 'summary') is None
+
+def test_lru_eviction_and_invalidate():
+    cache = AnalyticsCache(max_entries=2, cache_dir="")
+    cache.put(1, "v", 'summary', 1)
+    cache.put(2, "v", 'summary', 2)
+    cache.get(1, "v", 'summary')
+    cache.put(3, "v", 'summary', 3)
+
+    assert cache.get(2, "v", 'summary') is None
+    cache.invalidate(1)
+    assert cache.get(1, "v", 'summary') is None
+    assert cache.get(3, "v", 'summary').value == 3
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    entry = AnalyticsCache(cache_dir=str(tmp_path)).put(5, "v", 'series', [[1, 2]], width=800)
+
+    restored = AnalyticsCache(cache_dir=str(tmp_path)).get(5, "v", 'series', width=800)
+
+    assert restored == entry
+    assert AnalyticsCache(cache_dir=str(tmp_path)).get(5, "v", 'series', width=400) is None
+
+def test_result_changed_during_compute_is_not_cached():
+    cache = AnalyticsCache(max_entries=8, cache_dir="")
+    versions = iter(["v1", "v2"])
+
+    assert cache.get_or_compute(1, 'summary', lambda: {'count': 1}, lambda: next(versions)) == {'count': 1}
+    assert cache.get(1, "v1", 'summary') is None
+    # 未完成的任务不缓存
+    cache.get_or_compute(1, 'summary', lambda: {'count': 1}, lambda: None)
+    assert not cache._entries
+
+def test_summary_endpoint_revalidates_with_etag(db, make_task):
+    task = make_task()
+    service = ResultService(db)
+    result = service.create_result(schemas.TestResultCreate(task_id=task.id, metric_name='keygen_time', value=1.0))
+    service.create_result(schemas.TestResultCreate(task_id=task.id, metric_name='keygen_time', value=3.0))
+    url = f"/api/v1/results/task/{task.id}/summary"
+
+    first = client.get(url)
+    etag = first.headers['etag']
+    assert first.headers['cache-control'] == "no-cache"
+    revalidated = client.get(url, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['etag'] == etag
+
+    # 删除结果后版本递增，旧ETag失效
+    assert service.delete_result(result.id)
+    changed = client.get(url, headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['etag'] != etag
+
+def test_running_task_is_not_cached(db, make_task):
+    task = make_task(status=TaskStatus.RUNNING)
+    ResultService(db).create_result(schemas.TestResultCreate(task_id=task.id, metric_name='keygen_time', value=1.0))
+
+    response = client.get(f"/api/v1/results/task/{task.id}/summary")
+
+    assert response.status_code == 200
+    assert 'etag' not in response.headers
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.db import database
+from app.db.database import AsyncDatabase
+from app.models import models
+from app.services.result_service import AsyncResultService
+
+def _task_name(session, task_id):
+    return session.query(models.TestTask.task_name).filter(models.TestTask.id == task_id).scalar()
+
+@pytest.mark.parametrize("use_mysql, explicit, expected", [
+    (True, None, True),
+    (False, None, False),
+    (False, True, True),
+    (True, False, False),
+])
+def test_async_engine_defaults_to_mysql_only(monkeypatch, use_mysql, explicit, expected):
+    monkeypatch.setattr(settings, "USE_MYSQL", use_mysql)
+    monkeypatch.setattr(settings, "ASYNC_DATABASE", explicit)
+    assert settings.use_async_database() is expected
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./a.db", "sqlite+aiosqlite:///./a.db"),
+    ("mysql+pymysql://u:p@h/db", "mysql+asyncmy://u:p@h/db"),
+    ("mysql://u:p@h/db", "mysql+asyncmy://u:p@h/db"),
+])
+def test_async_url_is_derived_from_sync_url(monkeypatch, url, expected):
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", None)
+    assert settings.get_async_database_url() == expected
+
+def test_threadpool_fallback_runs_off_event_loop(make_task):
+    task = make_task()
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def read(session, task_id):
+            threads.append(threading.get_ident())
+            return _task_name(session, task_id)
+
+        return await AsyncDatabase().run(read, task.id), threads[0] != loop_thread
+
+    assert asyncio.run(scenario()) == ("test", True)
+
+def test_async_session_runs_service_queries(make_task):
+    pytest.importorskip("aiosqlite")
+    task = make_task()
+
+    async def scenario():
+        async_engine = database._create_async_engine()
+        sessionmaker = database._create_async_sessionmaker(async_engine)
+        try:
+            async with sessionmaker() as session:
+                db = AsyncDatabase(session)
+                return await db.run(_task_name, task.id), await AsyncResultService(db).get_cache_version(task.id)
+        finally:
+            await async_engine.dispose()
+
+    name, version = asyncio.run(scenario())
+    assert name == "test"
+    assert version.endswith("/0")
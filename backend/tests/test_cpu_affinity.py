@@ -0,0 +1,116 @@
+import os
+import threading
+
+import pytest
+
+from app.libs import cpu_affinity
+from app.libs.cpu_affinity import CpuPinning, parse_cpu_list
+
+linux_only = pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'), reason="需要Linux线程调度接口")
+
+def _in_thread(fn):
+    """在独立线程中执行，线程级的调度设置不影响测试进程"""
+    outcome = {}
+
+    def run():
+        try:
+            outcome['value'] = fn()
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['value']
+
+@pytest.mark.parametrize("spec, expected", [
+    ("0-3,6", [0, 1, 2, 3, 6]),
+    ("2", [2]),
+    (3, [3]),
+    ([4, 1, 4], [1, 4]),
+    (" 1 , 0 ", [0, 1]),
+])
+def test_parse_cpu_list(spec, expected):
+    assert parse_cpu_list(spec) == expected
+
+@pytest.mark.parametrize("spec", ["", "3-1", "a", [-1], [True], True, 1.5, "1-x"])
+def test_parse_cpu_list_rejects_invalid(spec):
+    with pytest.raises(ValueError):
+        parse_cpu_list(spec)
+
+@pytest.mark.parametrize("options", [
+    {'policy': 'rr'},
+    {'nice': 20},
+    {'nice': True},
+    {'priority': 10},
+    {'policy': 'fifo', 'priority': 100},
+])
+def test_invalid_options_are_rejected(options):
+    with pytest.raises(ValueError):
+        CpuPinning.from_parameters({'cpu': options})
+
+def test_from_parameters_ignores_applied_state():
+    pinning = CpuPinning.from_parameters({'cpu': {'affinity': "0", 'nice': 5, 'applied': {'nice': 5}}})
+    assert (pinning.affinity, pinning.nice, pinning.policy) == ([0], 5, 'other')
+
+@linux_only
+def test_affinity_is_applied_to_thread_and_restored():
+    allowed = sorted(os.sched_getaffinity(0))
+    pinning = CpuPinning(affinity=allowed[-1])
+
+    def run():
+        with pinning.applied() as state:
+            inside = sorted(os.sched_getaffinity(0))
+        return state, inside, sorted(os.sched_getaffinity(0))
+
+    state, inside, after = _in_thread(run)
+    assert state['affinity'] == [allowed[-1]]
+    assert 'errors' not in state
+    assert inside == [allowed[-1]]
+    assert after == allowed
+    assert sorted(os.sched_getaffinity(0)) == allowed
+
+@linux_only
+def test_unavailable_cpu_is_rejected():
+    pinning = CpuPinning(affinity=max(os.sched_getaffinity(0)) + 1)
+
+    def run():
+        with pinning.applied():
+            pass
+
+    with pytest.raises(ValueError):
+        _in_thread(run)
+
+@linux_only
+def test_nice_is_restored_after_test():
+    previous = os.getpriority(os.PRIO_PROCESS, 0)
+    if previous >= 19 or not cpu_affinity.can_lower_nice(previous):
+        pytest.skip("没有权限恢复nice值")
+    pinning = CpuPinning(nice=previous + 1)
+
+    def run():
+        with pinning.applied() as state:
+            inside = os.getpriority(os.PRIO_PROCESS, 0)
+        return state, inside, os.getpriority(os.PRIO_PROCESS, 0)
+
+    state, inside, after = _in_thread(run)
+    assert state['nice'] == inside == previous + 1
+    assert after == previous
+
+@linux_only
+def test_nice_is_not_raised_when_it_cannot_be_restored(monkeypatch):
+    monkeypatch.setattr(cpu_affinity, "can_lower_nice", lambda nice: False)
+    previous = os.getpriority(os.PRIO_PROCESS, 0)
+    if previous >= 19:
+        pytest.skip("nice值已是最低优先级")
+    pinning = CpuPinning(nice=previous + 1)
+
+    def run():
+        with pinning.applied() as state:
+            return state
+
+    state = _in_thread(run)
+    assert state['nice'] == previous
+    assert "未将nice值设置为" in state['errors'][0]
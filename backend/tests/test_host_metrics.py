@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+import time
+
+from app.services import host_metrics
+from app.services.host_metrics import HostMetricsSampler
+
+def _fake_psutil(cpu_values):
+    """按顺序返回给定CPU使用率的psutil替身"""
+    cpu_calls = []
+
+    def cpu_percent(interval=None):
+        # 采样不能阻塞等待
+        assert interval is None
+        cpu_calls.append(interval)
+        return cpu_values[min(len(cpu_calls), len(cpu_values)) - 1]
+
+    return SimpleNamespace(
+        cpu_percent=cpu_percent,
+        virtual_memory=lambda: SimpleNamespace(percent=40.0, available=1024),
+        disk_usage=lambda path: SimpleNamespace(used=25, total=100),
+    )
+
+def test_sampler_is_unavailable_without_psutil(monkeypatch):
+    monkeypatch.setattr(host_metrics, "psutil", None)
+    sampler = HostMetricsSampler(interval=1, capacity=4)
+
+    sampler.start()
+
+    assert sampler.sample() is None
+    assert sampler.summarize(time.time()) is None
+    assert sampler._thread is None
+
+def test_ring_buffer_keeps_latest_samples(monkeypatch):
+    monkeypatch.setattr(host_metrics, "psutil", _fake_psutil([10.0, 20.0, 30.0]))
+    sampler = HostMetricsSampler(interval=1, capacity=2)
+
+    for _ in range(3):
+        sampler.sample()
+
+    assert [s['cpu_percent'] for s in sampler.window(0)] == [20.0, 30.0]
+    assert sampler.latest()['disk_percent'] == 25.0
+
+def test_summarize_includes_final_sample(monkeypatch):
+    monkeypatch.setattr(host_metrics, "psutil", _fake_psutil([10.0, 50.0]))
+    sampler = HostMetricsSampler(interval=1, capacity=8)
+    start = time.time()
+    sampler.sample()
+
+    summary = sampler.summarize(start)
+
+    assert summary['samples'] == 2
+    assert summary['cpu_percent_avg'] == 30.0
+    assert summary['cpu_percent_max'] == 50.0
+    assert summary['memory_available_min'] == 1024
+
+def test_background_thread_samples_and_stops(monkeypatch):
+    monkeypatch.setattr(host_metrics, "psutil", _fake_psutil([5.0]))
+    sampler = HostMetricsSampler(interval=0.01, capacity=8)
+
+    sampler.start()
+    deadline = time.time() + 2
+    while sampler.latest() is None and time.time() < deadline:
+        time.sleep(0.01)
+    sampler.stop()
+
+    assert sampler.latest()['cpu_percent'] == 5.0
+    assert sampler._thread is None
@@ -0,0 +1,51 @@
+import json
+
+from app.libs.key_reuse import KeyReuse
+from app.models import schemas
+from app.models.models import Algorithm, AlgorithmCategory, TaskStatus
+from app.models import models
+from app.services.task_service import TaskService
+
+def _signature_algorithm(db) -> Algorithm:
+    algorithm = db.query(Algorithm).filter(Algorithm.name == "Dilithium2").first()
+    if algorithm is None:
+        algorithm = Algorithm(name="Dilithium2", category=AlgorithmCategory.SIGNATURE,
+                              source="liboqs", library_name="liboqs", is_active=True)
+        db.add(algorithm)
+        db.commit()
+    return algorithm
+
+def test_reset_keeps_keygen_count():
+    key_reuse = KeyReuse(interval=10)
+    key_reuse.renewed()
+    key_reuse.used()
+    key_reuse.reset()
+    assert key_reuse.due()
+    assert key_reuse.describe() == {'interval': 10, 'keygens': 1}
+
+def test_key_reuse_restarts_for_each_message_size(db):
+    algorithm = _signature_algorithm(db)
+    service = TaskService(db)
+    task = service.create_task(schemas.TestTaskCreate(
+        algorithm_id=algorithm.id,
+        task_name="key reuse sweep",
+        test_count=25,
+        parameters={'message_sizes': ['32B', '1KiB'], 'key_reuse': {'interval': 10}}
+    ))
+
+    task = service.execute_task(task.id)
+    assert task.status == TaskStatus.COMPLETED
+
+    keygen_rounds = [row.test_round for row in db.query(models.TestResult.test_round).filter(
+        models.TestResult.task_id == task.id,
+        models.TestResult.metric_name == 'keygen_time'
+    ).order_by(models.TestResult.test_round)]
+    # 每个消息大小各25轮，轮次连续编号，密钥在每个消息大小开始时重新生成
+    assert keygen_rounds == [1, 11, 21, 26, 36, 46]
+    assert json.loads(task.parameters)['key_reuse'] == {'interval': 10, 'keygens': 6}
+
+    sign_rounds = [row.test_round for row in db.query(models.TestResult.test_round).filter(
+        models.TestResult.task_id == task.id,
+        models.TestResult.metric_name == 'sign_time_1KiB'
+    ).order_by(models.TestResult.test_round)]
+    assert sign_rounds == list(range(26, 51))
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.libs import message_sweep
+from app.libs.message_sweep import format_size, parse_message_sizes, parse_size, sweep_base_metric, sweep_metric
+from app.models import models, schemas
+from app.models.models import Algorithm, AlgorithmCategory, TaskStatus
+from app.services.result_service import ResultService
+from app.services.task_service import TaskService
+
+@pytest.fixture
+def signature_algorithm(db):
+    algorithm = db.query(Algorithm).filter(Algorithm.name == "Dilithium2").first()
+    if algorithm is None:
+        algorithm = Algorithm(name="Dilithium2", category=AlgorithmCategory.SIGNATURE,
+                              source="liboqs", library_name="liboqs", is_active=True)
+        db.add(algorithm)
+        db.commit()
+    return algorithm
+
+@pytest.mark.parametrize("value, expected", [
+    (33, 33),
+    ("32B", 32),
+    ("32", 32),
+    ("4KiB", 4096),
+    ("4 kb", 4096),
+    ("1MiB", 1024 ** 2),
+])
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+@pytest.mark.parametrize("value", [0, -1, True, 1.5, "", "4GiB", "KiB", "1e3"])
+def test_parse_size_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        parse_size(value)
+
+def test_parse_size_respects_limit(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_MESSAGE_SIZE", 1024)
+    assert parse_size("1KiB") == 1024
+    with pytest.raises(ValueError):
+        parse_size(1025)
+
+def test_message_sizes_are_sorted_and_deduplicated():
+    assert parse_message_sizes({}) is None
+    assert parse_message_sizes({'message_sizes': ["1KiB", 32, 1024]}) == [32, 1024]
+    with pytest.raises(ValueError):
+        parse_message_sizes({'message_sizes': []})
+
+def test_metric_names_round_trip():
+    assert [format_size(size) for size in (33, 1024, 1536, 3 * 1024 ** 2)] == ['33B', '1KiB', '1536B', '3MiB']
+    assert sweep_metric('sign_time', 4096) == 'sign_time_4KiB'
+    assert sweep_base_metric('verify_time_1MiB') == 'verify_time'
+    assert sweep_base_metric('sign_mbps_1KiB') is None
+    assert sweep_base_metric('sign_time_fast') is None
+    assert sweep_base_metric('keygen_time') is None
+
+def test_random_message_is_writable():
+    message = message_sweep.random_message(64)
+    assert isinstance(message, bytearray) and len(message) == 64
+
+def test_sweep_task_records_metrics_per_size(db, signature_algorithm):
+    service = TaskService(db)
+    task = service.create_task(schemas.TestTaskCreate(
+        algorithm_id=signature_algorithm.id,
+        task_name="message sweep",
+        test_count=5,
+        parameters={'message_sizes': ['32B', '1KiB']}
+    ))
+
+    task = service.execute_task(task.id)
+
+    assert task.status == TaskStatus.COMPLETED
+    rounds = {}
+    for metric_name, test_round in db.query(models.TestResult.metric_name, models.TestResult.test_round).filter(
+        models.TestResult.task_id == task.id
+    ):
+        rounds.setdefault(metric_name, []).append(test_round)
+    # 每个消息大小各执行test_count轮，轮次在整个任务中连续编号
+    assert sorted(rounds['sign_time_32B']) == [1, 2, 3, 4, 5]
+    assert sorted(rounds['verify_time_1KiB']) == [6, 7, 8, 9, 10]
+    assert len(rounds['sign_mbps_1KiB']) == 5
+    assert 'sign_time' not in rounds
+    assert json.loads(task.parameters)['message_sizes'] == [32, 1024]
+
+    # 性能摘要按全部消息大小的样本计算平均签名耗时
+    aggregates = ResultService(db).get_metric_aggregates(task.id)
+    expected = (aggregates['sign_time_32B'].total + aggregates['sign_time_1KiB'].total) / 10
+    assert ResultService(db).get_performance_metrics(task.id).avg_sign_time == pytest.approx(expected)
+
+def test_invalid_message_sizes_are_rejected_on_create(db, signature_algorithm, algorithm):
+    service = TaskService(db)
+    with pytest.raises(ValueError):
+        service.create_task(schemas.TestTaskCreate(
+            algorithm_id=signature_algorithm.id, task_name="sweep", test_count=5,
+            parameters={'message_sizes': ['2GiB']}
+        ))
+    # 消息大小扫描只适用于签名算法
+    with pytest.raises(ValueError):
+        service.create_task(schemas.TestTaskCreate(
+            algorithm_id=algorithm.id, task_name="sweep", test_count=5,
+            parameters={'message_sizes': ['32B']}
+        ))
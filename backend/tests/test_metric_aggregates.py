@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from app.models import models, schemas
+from app.services.result_service import MetricAccumulator, ResultService, _merge_accumulator
+
+def _aggregate(db, task_id, metric_name):
+    return db.query(models.TaskMetricAggregate).filter(
+        models.TaskMetricAggregate.task_id == task_id,
+        models.TaskMetricAggregate.metric_name == metric_name
+    ).one()
+
+def test_welford_accumulator_matches_numpy():
+    values = np.random.default_rng(7).normal(5.0, 2.0, 500)
+    acc = MetricAccumulator('ms')
+    for value in values:
+        acc.add(float(value))
+
+    assert acc.count == 500
+    assert acc.mean == pytest.approx(values.mean())
+    assert acc.m2 / (acc.count - 1) == pytest.approx(values.var(ddof=1))
+    assert (acc.min_value, acc.max_value, acc.last_value) == (values.min(), values.max(), values[-1])
+
+def test_chan_merge_of_batches_matches_single_pass():
+    values = np.random.default_rng(11).exponential(3.0, 1000)
+    aggregate = models.TaskMetricAggregate(count=0, total=0.0, m2=0.0)
+    for chunk in np.array_split(values, 7):
+        acc = MetricAccumulator('ms')
+        for value in chunk:
+            acc.add(float(value))
+        _merge_accumulator(aggregate, acc)
+
+    assert aggregate.count == 1000
+    assert aggregate.total / aggregate.count == pytest.approx(values.mean())
+    assert aggregate.m2 / (aggregate.count - 1) == pytest.approx(values.var(ddof=1))
+    assert aggregate.last_value == values[-1]
+    assert not aggregate.is_final
+
+def test_create_result_merges_into_aggregate(db, make_task):
+    task = make_task()
+    service = ResultService(db)
+    for value in (2.0, 4.0):
+        service.create_result(schemas.TestResultCreate(task_id=task.id, metric_name='keygen_time', value=value))
+
+    aggregate = _aggregate(db, task.id, 'keygen_time')
+    assert (aggregate.count, aggregate.total) == (2, 6.0)
+    assert aggregate.m2 == pytest.approx(2.0)
+
+def test_delete_result_rebuilds_aggregates_of_completed_task(db, make_task):
+    task = make_task()
+    service = ResultService(db)
+    ids = [
+        service.create_result(schemas.TestResultCreate(task_id=task.id, metric_name='encaps_time', value=value)).id
+        for value in (1.0, 2.0, 9.0)
+    ]
+    service.rebuild_metric_aggregates(task.id)
+
+    assert service.delete_result(ids[-1])
+    aggregate = _aggregate(db, task.id, 'encaps_time')
+    assert (aggregate.count, aggregate.total, aggregate.max_value) == (2, 3.0, 2.0)
+    assert aggregate.is_final
+
+def test_unfinalized_aggregates_are_computed_without_writing(db, make_task):
+    task = make_task()
+    service = ResultService(db)
+    service.create_result(schemas.TestResultCreate(task_id=task.id, metric_name='decaps_time', value=3.0))
+
+    aggregates = service.get_metric_aggregates(task.id)
+    assert aggregates['decaps_time'].is_final
+    assert aggregates['decaps_time'].median == 3.0
+    # 读接口不写回数据库
+    assert not _aggregate(db, task.id, 'decaps_time').is_final
@@ -0,0 +1,103 @@
+from array import array
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services import metric_stats
+from app.services.result_service import ResultBatchWriter
+from main import app
+
+def test_percentile_key():
+    assert metric_stats.percentile_key(99) == 'p99'
+    assert metric_stats.percentile_key(99.9) == 'p99_9'
+
+def test_to_array_reads_buffers_without_copy():
+    buffer = array('d', [1.0, 2.0, 3.0])
+    data = metric_stats.to_array(buffer)
+
+    assert data.dtype == np.float64
+    assert not data.flags.owndata
+    assert metric_stats.to_array(x * 0.5 for x in range(3)).tolist() == [0.0, 0.5, 1.0]
+    assert metric_stats.to_array(None).size == 0
+
+def test_describe_matches_numpy():
+    values = np.random.default_rng(3).lognormal(0.0, 0.5, 2000)
+    stats = metric_stats.describe(values)
+
+    assert stats['count'] == 2000
+    assert stats['mean'] == pytest.approx(values.mean())
+    assert stats['std'] == pytest.approx(values.std(ddof=1))
+    assert stats['median'] == pytest.approx(np.median(values))
+    assert stats['mad'] == pytest.approx(np.median(np.abs(values - np.median(values))))
+    for q in metric_stats.PERCENTILES:
+        assert stats[metric_stats.percentile_key(q)] == pytest.approx(np.percentile(values, q))
+
+def test_describe_edge_cases():
+    assert metric_stats.describe([]) == {'count': 0}
+    single = metric_stats.describe([4.0])
+    assert (single['std'], single['p99'], single['mad']) == (0.0, 4.0, 0.0)
+
+def test_histogram():
+    result = metric_stats.histogram(np.arange(100.0), bins=4)
+
+    assert result['counts'] == [25, 25, 25, 25]
+    assert result['bin_edges'][0] == 0.0 and result['bin_edges'][-1] == 99.0
+    assert metric_stats.histogram([2.0, 2.0]) == {'bins': [2.0], 'counts': [2]}
+    assert metric_stats.histogram([]) == {}
+
+@pytest.mark.parametrize("backend", ["rows", "series"])
+def test_load_metric_values_in_write_order(db, make_task, monkeypatch, backend):
+    monkeypatch.setattr(settings, "RESULT_STORAGE_BACKEND", backend)
+    task = make_task()
+    with ResultBatchWriter(db, task.id, batch_size=2) as writer:
+        for test_round, value in enumerate((5.0, 1.0, 3.0), 1):
+            writer.add('decaps_time', value, 'ms', test_round)
+        writer.add('decaps_time', 7.0, 'ms')
+
+    values = metric_stats.load_metric_values(db, task.id, 'decaps_time')
+    x, y = metric_stats.load_metric_series(db, task.id, 'decaps_time')
+
+    assert sorted(values.tolist()) == [1.0, 3.0, 5.0, 7.0]
+    assert dict(zip(x.tolist(), y.tolist()))[2.0] == 1.0
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(1.0, 10001.0)
+    y = np.sin(x / 500.0)
+    y[4321] = 25.0
+    sampled_x, sampled_y = metric_stats.lttb(x, y, 200)
+
+    assert sampled_x.size == 200
+    assert (sampled_x[0], sampled_x[-1]) == (1.0, 10000.0)
+    assert np.all(np.diff(sampled_x) > 0)
+    assert 25.0 in sampled_y
+
+def test_lttb_returns_short_series_unchanged():
+    x, y = np.arange(5.0), np.arange(5.0)
+    assert metric_stats.lttb(x, y, 10)[1] is y
+    assert metric_stats.lttb(x, y, 2)[1] is y
+
+def test_minmax_downsample_keeps_bucket_extremes():
+    x = np.arange(1000.0)
+    y = np.random.default_rng(1).normal(0.0, 1.0, 1000)
+    sampled_x, sampled_y = metric_stats.minmax_downsample(x, y, 100)
+
+    assert sampled_y.size <= 100
+    assert np.all(np.diff(sampled_x) > 0)
+    assert (y.min(), y.max()) == (sampled_y.min(), sampled_y.max())
+
+def test_metric_series_endpoint_downsamples(db, make_task, series_storage):
+    task = make_task()
+    with ResultBatchWriter(db, task.id) as writer:
+        for test_round in range(1, 2001):
+            writer.add('sign_time', float(test_round % 97), 'ms', test_round)
+
+    response = TestClient(app).get(f"/api/v1/results/task/{task.id}/series",
+                                   params={'metric_name': 'sign_time', 'width': 100, 'method': 'minmax'})
+
+    series = response.json()
+    assert response.status_code == 200
+    assert series['total_points'] == 2000
+    assert len(series['points']) <= 100
+    assert series['points'][0] == [1.0, 1.0]
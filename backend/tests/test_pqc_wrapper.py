@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+import ctypes
+import math
+
+from app.libs.key_reuse import KeyReuse
+from app.libs.pqc_wrapper import OQS_KEM, OQS_SIG, PQCWrapper, _describe_kem, _describe_sig, get_pqc_wrapper
+
+def test_mock_kem_batch_returns_one_sample_per_round():
+    batch = PQCWrapper(use_mock=True).run_kem_batch("Kyber512", 25)
+
+    for metric in ('success', 'keygen_time', 'encaps_time', 'decaps_time'):
+        assert len(batch[metric]) == 25
+    assert all(batch['success'])
+    assert batch['public_key_size'] == 800
+
+def test_mock_signature_batch_marks_reused_keygen_rounds_as_nan():
+    batch = PQCWrapper(use_mock=True).run_signature_batch("Dilithium2", 10, key_reuse=KeyReuse(interval=4))
+
+    generated = [not math.isnan(value) for value in batch['keygen_time']]
+    assert generated == [True, False, False, False, True, False, False, False, True, False]
+
+def test_single_round_unwraps_arrays():
+    wrapper = PQCWrapper(use_mock=True)
+    result = wrapper._single_round(wrapper.run_kem_batch("Kyber768", 1))
+
+    assert result['success'] is True
+    assert isinstance(result['keygen_time'], float)
+    assert result['ciphertext_size'] == 1088
+
+def _kem_struct(name: bytes, public_key_size: int) -> OQS_KEM:
+    return OQS_KEM(method_name=name, alg_version=b"1.0", claimed_nist_level=1, ind_cca=True,
+                   length_public_key=public_key_size, length_secret_key=1632,
+                   length_ciphertext=768, length_shared_secret=32)
+
+def test_describe_structs_read_lengths():
+    kem = _describe_kem(ctypes.pointer(_kem_struct(b"Kyber512", 800)))
+    assert kem == {
+        'method_name': "Kyber512", 'alg_version': "1.0", 'claimed_nist_level': 1,
+        'public_key_size': 800, 'secret_key_size': 1632, 'ciphertext_size': 768, 'shared_secret_size': 32
+    }
+
+    sig = _describe_sig(ctypes.pointer(OQS_SIG(
+        method_name=b"Dilithium2", claimed_nist_level=2, euf_cma=True,
+        length_public_key=1312, length_secret_key=2528, length_signature=2420
+    )))
+    assert sig['alg_version'] is None
+    assert sig['max_signature_size'] == 2420
+
+def test_struct_length_fields_follow_the_liboqs_layout():
+    # 两个字符串指针之后是共用一个对齐单元的nist级别和布尔字段
+    assert OQS_KEM.length_public_key.offset == 3 * ctypes.sizeof(ctypes.c_void_p)
+    assert OQS_SIG.length_signature.offset == 5 * ctypes.sizeof(ctypes.c_void_p)
+
+def test_descriptor_is_read_once_per_algorithm():
+    instances = []
+
+    def new(name):
+        instance = ctypes.pointer(_kem_struct(name, 4242))
+        instances.append(instance)
+        return instance
+
+    wrapper = PQCWrapper(use_mock=True)
+    wrapper.liboqs = SimpleNamespace(OQS_KEM_new=new, OQS_KEM_free=lambda instance: None)
+    first = wrapper._get_descriptor("KEM", "Test-KEM-descriptor")
+    second = wrapper._get_descriptor("KEM", "Test-KEM-descriptor")
+
+    assert first is second
+    assert first['public_key_size'] == 4242
+    assert len(instances) == 1
+
+def test_get_pqc_wrapper_shares_one_instance_per_mode():
+    wrapper = get_pqc_wrapper(use_mock=True)
+
+    assert get_pqc_wrapper(use_mock=True) is wrapper
+    assert wrapper.use_mock
+
+def test_capability_index_enumerates_enabled_algorithms_once():
+    names = [b"Test-KEM-A", b"Test-KEM-B", b"Test-KEM-disabled"]
+    calls = []
+
+    def new(name):
+        calls.append(name)
+        return ctypes.pointer(_kem_struct(name, 1000 + len(calls)))
+
+    wrapper = PQCWrapper(use_mock=True)
+    wrapper.use_mock = False
+    wrapper._has_enumeration = True
+    wrapper.liboqs = SimpleNamespace(
+        OQS_KEM_alg_count=lambda: len(names),
+        OQS_KEM_alg_identifier=lambda i: names[i],
+        OQS_KEM_alg_is_enabled=lambda name: name != b"Test-KEM-disabled",
+        OQS_KEM_new=new,
+        OQS_KEM_free=lambda instance: None,
+        OQS_SIG_alg_count=lambda: 0,
+        OQS_SIG_alg_identifier=lambda i: None,
+        OQS_SIG_alg_is_enabled=lambda name: False
+    )
+
+    index = wrapper.get_capability_index()
+    assert list(index["KEM"]) == ["Test-KEM-A", "Test-KEM-B"]
+    assert index["SIGNATURE"] == {}
+    assert wrapper.get_capability_index() is index
+    assert wrapper.test_algorithm("Test-KEM-A", "KEM", "liboqs")
+    assert not wrapper.test_algorithm("Test-KEM-disabled", "KEM", "liboqs")
+    assert calls == [b"Test-KEM-A", b"Test-KEM-B"]
@@ -0,0 +1,69 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import tasks as task_endpoints
+from app.models.models import TaskStatus
+from app.services.progress_bus import ProgressBus, progress_bus
+from app.services.task_service import TaskService
+from main import app
+
+def test_publish_merges_fields_and_computes_progress():
+    bus = ProgressBus()
+    bus.publish(1, status="RUNNING", test_count=200, task_name="bus")
+    snapshot = bus.publish(1, completed_rounds=50)
+
+    assert snapshot['task_name'] == "bus"
+    assert snapshot['progress'] == 25
+    assert bus.publish(1, completed_rounds=200)['progress'] == 95
+    assert bus.publish(1, status="COMPLETED")['progress'] == 100
+
+def test_subscribers_receive_updates():
+    async def scenario():
+        bus = ProgressBus()
+        queue = bus.subscribe(7)
+        bus.publish(7, status="RUNNING")
+        snapshot = await asyncio.wait_for(queue.get(), timeout=1)
+        bus.unsubscribe(7, queue)
+        bus.publish(7, status="COMPLETED")
+        return snapshot, queue.qsize()
+
+    snapshot, pending = asyncio.run(scenario())
+    assert snapshot['status'] == "RUNNING"
+    assert pending == 0
+
+def test_eviction_keeps_running_tasks():
+    bus = ProgressBus(max_entries=2)
+    bus.publish(1, status="RUNNING")
+    bus.publish(2, status="COMPLETED")
+    bus.publish(3, status="COMPLETED")
+
+    assert bus.get(1) is not None
+    assert bus.get(2) is None
+
+def test_database_fallback_is_not_published(db, make_task):
+    task = make_task(status=TaskStatus.RUNNING)
+    status = TaskService(db).get_task_status(task.id)
+
+    assert status['status'] == "RUNNING"
+    assert progress_bus.get(task.id) is None
+
+def test_websocket_pings_and_ends_when_task_finishes_elsewhere(db, make_task, monkeypatch):
+    monkeypatch.setattr(task_endpoints, "EVENT_KEEPALIVE_INTERVAL", 0.05)
+    task = make_task(status=TaskStatus.RUNNING)
+
+    with TestClient(app).websocket_connect(f"/api/v1/tasks/{task.id}/ws") as websocket:
+        assert websocket.receive_json()['status'] == "RUNNING"
+        assert websocket.receive_json() == {'event': 'ping'}
+        # 任务在其他进程中结束，本进程的总线收不到更新
+        task.status = TaskStatus.COMPLETED
+        db.commit()
+        while (message := websocket.receive_json()).get('event') == 'ping':
+            pass
+        assert message['status'] == "COMPLETED"
+    assert task.id not in progress_bus._subscribers
+
+def test_websocket_closes_for_missing_task():
+    with TestClient(app).websocket_connect("/api/v1/tasks/999999/ws") as websocket:
+        message = websocket.receive()
+    assert message['code'] == 4404
@@ -0,0 +1,73 @@
+from app.core.config import settings
+from app.models.models import ReportJob, TaskStatus
+from app.services import report_jobs
+from app.services.report_jobs import ReportJobQueue
+
+class _RecordingQueue(ReportJobQueue):
+    """只记录派发的任务，不启动进程池"""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.dispatched = []
+
+    def _dispatch(self, job_id, task_id, report_type):
+        self.dispatched.append((job_id, task_id, report_type))
+
+def test_submit_persists_pending_job(db, make_task):
+    task = make_task()
+    queue = _RecordingQueue()
+
+    job = queue.submit(db, task.id, "csv")
+
+    assert job['status'] == TaskStatus.PENDING
+    assert queue.dispatched == [(job['job_id'], task.id, "csv")]
+    # 任务状态保存在数据库中，其他会话同样能查询
+    assert ReportJobQueue().get_job(db, job['job_id'])['task_id'] == task.id
+    assert queue.get_job(db, "missing") is None
+
+def test_generate_report_records_completion(db, make_task, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "REPORTS_DIR", str(tmp_path))
+    task = make_task()
+    job = _RecordingQueue().submit(db, task.id, "csv")
+
+    report_id = report_jobs._generate_report(job['job_id'], task.id, "csv")
+
+    db.expire_all()
+    described = ReportJobQueue().get_job(db, job['job_id'])
+    assert described['status'] == TaskStatus.COMPLETED
+    assert described['report']['id'] == report_id
+    assert described['finished_at'] is not None
+    # 已经开始执行的任务不会被再次执行
+    assert report_jobs._generate_report(job['job_id'], task.id, "csv") is None
+
+def test_generate_report_records_failure(db, make_task):
+    task = make_task(status=TaskStatus.RUNNING)
+    job = _RecordingQueue().submit(db, task.id, "csv")
+
+    try:
+        report_jobs._generate_report(job['job_id'], task.id, "csv")
+    except Exception:
+        pass
+
+    db.expire_all()
+    described = ReportJobQueue().get_job(db, job['job_id'])
+    assert described['status'] == TaskStatus.FAILED
+    assert described['error_message']
+
+def test_recover_fails_interrupted_and_resubmits_pending(db, make_task):
+    task = make_task()
+    queue = _RecordingQueue()
+    db.query(ReportJob).delete()
+    db.commit()
+    running = queue.submit(db, task.id, "pdf")
+    pending = queue.submit(db, task.id, "csv")
+    report_jobs._update_job(db, running['job_id'], (TaskStatus.PENDING,), status=TaskStatus.RUNNING)
+    queue.dispatched.clear()
+
+    queue.recover()
+
+    db.expire_all()
+    interrupted = queue.get_job(db, running['job_id'])
+    assert interrupted['status'] == TaskStatus.FAILED
+    assert interrupted['error_message'] == "服务重启，报告生成被中断"
+    assert queue.dispatched == [(pending['job_id'], task.id, "csv")]
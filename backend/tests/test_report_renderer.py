@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+
+from app.core.config import settings
+from app.services.report_service import ReportService
+from app.services.result_service import ResultBatchWriter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_importing_app_does_not_load_report_dependencies():
+    script = (
+        "import json, sys\n"
+        "import main\n"
+        "print(json.dumps(sorted(m for m in ('pandas', 'reportlab', 'matplotlib', 'seaborn') if m in sys.modules)))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, env=os.environ.copy(),
+        capture_output=True, text=True, timeout=60, check=True
+    ).stdout
+
+    assert json.loads(output.splitlines()[-1]) == []
+
+def test_reports_are_rendered_on_demand(db, make_task, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "REPORTS_DIR", str(tmp_path))
+    task = make_task()
+    with ResultBatchWriter(db, task.id) as writer:
+        for test_round in range(1, 6):
+            writer.add('keygen_time', float(test_round), 'ms', test_round)
+    service = ReportService(db)
+
+    csv_report = service.generate_report(task.id, 'csv')
+    pdf_report = service.generate_report(task.id, 'pdf')
+
+    assert csv_report.file_type == "CSV" and csv_report.file_size > 0
+    with open(csv_report.file_path, encoding="utf-8-sig") as f:
+        assert "keygen_time" in f.read()
+    with open(pdf_report.file_path, "rb") as f:
+        assert f.read(5) == b"%PDF-"
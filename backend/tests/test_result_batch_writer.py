@@ -0,0 +1,66 @@
+import pytest
+
+from app.models import models, schemas
+from app.services.result_service import ResultService
+
+def _result_count(db, task_id):
+    return db.query(models.TestResult).filter(models.TestResult.task_id == task_id).count()
+
+def test_flushes_when_batch_is_full(db, make_task):
+    task = make_task()
+    writer = ResultService(db).open_batch_writer(task.id, batch_size=3, flush_interval=0)
+
+    for i in range(7):
+        writer.add('keygen_time', float(i), 'ms', i + 1)
+    # 两个满批次已写入，最后一条仍在缓冲区
+    assert _result_count(db, task.id) == 6
+    assert writer.total_written == 6
+
+    assert writer.close() == 7
+    assert _result_count(db, task.id) == 7
+
+def test_flush_merges_aggregates(db, make_task):
+    task = make_task()
+    with ResultService(db).open_batch_writer(task.id, batch_size=2, flush_interval=0) as writer:
+        for value in (1.0, 2.0, 3.0, 4.0, 5.0):
+            writer.add('sign_time', value, 'ms', 1)
+        writer.add('signature_size', 2420.0, 'bytes')
+
+    aggregates = {
+        aggregate.metric_name: aggregate
+        for aggregate in db.query(models.TaskMetricAggregate).filter(models.TaskMetricAggregate.task_id == task.id)
+    }
+    assert aggregates['sign_time'].count == 5
+    assert aggregates['sign_time'].total == 15.0
+    assert aggregates['sign_time'].min_value == 1.0
+    assert aggregates['sign_time'].max_value == 5.0
+    assert aggregates['sign_time'].last_value == 5.0
+    assert aggregates['signature_size'].unit == 'bytes'
+
+def test_finalize_writes_percentiles(db, make_task):
+    task = make_task()
+    writer = ResultService(db).open_batch_writer(task.id, flush_interval=0)
+    for value in range(1, 101):
+        writer.add('verify_time', float(value), 'ms', value)
+    writer.finalize()
+
+    aggregate = db.query(models.TaskMetricAggregate).filter(
+        models.TaskMetricAggregate.task_id == task.id
+    ).one()
+    assert aggregate.is_final
+    assert aggregate.median == pytest.approx(50.5)
+    assert aggregate.p99 == pytest.approx(99.01)
+
+def test_create_results_bulk_groups_by_task(db, make_task):
+    first, second = make_task(), make_task()
+    results = [
+        schemas.TestResultCreate(task_id=task.id, metric_name='keygen_time', value=0.5, unit='ms', test_round=i)
+        for i in range(1, 4) for task in (first, second)
+    ]
+    assert ResultService(db).create_results_bulk(results, batch_size=2) == 6
+    assert _result_count(db, first.id) == 3
+    assert _result_count(db, second.id) == 3
+
+def test_open_batch_writer_rejects_missing_task(db):
+    with pytest.raises(ValueError):
+        ResultService(db).open_batch_writer(999999)
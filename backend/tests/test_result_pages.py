@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import result_series
+from app.services.result_service import ResultBatchWriter, ResultService
+from main import app
+
+client = TestClient(app)
+
+def _summary(results):
+    return [(result['metric_name'], result['test_round'], result['value']) for result in results]
+
+@pytest.fixture
+def mixed_task(db, make_task, monkeypatch):
+    """结果同时保存在test_results和result_series中的任务"""
+    task = make_task()
+    with ResultBatchWriter(db, task.id) as writer:
+        for test_round in range(1, 5):
+            writer.add('keygen_time', float(test_round), 'ms', test_round)
+    monkeypatch.setattr(result_series.settings, "RESULT_STORAGE_BACKEND", "series")
+    with ResultBatchWriter(db, task.id, batch_size=3) as writer:
+        for test_round in range(5, 13):
+            writer.add('keygen_time', float(test_round), 'ms', test_round)
+    return task
+
+def _all_pages(task_id, limit, **params):
+    pages, cursor = [], None
+    while True:
+        response = client.get(f"/api/v1/results/task/{task_id}/page",
+                              params={'limit': limit, **({'cursor': cursor} if cursor else {}), **params})
+        assert response.status_code == 200
+        page = response.json()
+        pages.append(page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 5, 12, 50])
+def test_pages_cover_all_results_once(db, mixed_task, limit):
+    expected = [result.value for result in ResultService(db).get_task_results(mixed_task.id)]
+
+    pages = _all_pages(mixed_task.id, limit)
+
+    assert [result['value'] for page in pages for result in page] == expected == [float(i) for i in range(1, 13)]
+    assert all(0 < len(page) <= limit for page in pages)
+
+def test_cursor_kinds(db, mixed_task):
+    service = ResultService(db)
+    _, cursor = service.get_task_results_page(mixed_task.id, limit=3)
+    assert cursor.startswith('r')
+    # 跨越test_results和result_series的页
+    page, cursor = service.get_task_results_page(mixed_task.id, limit=3, cursor=cursor)
+    assert [result.value for result in page] == [4.0, 5.0, 6.0]
+    assert cursor.startswith('s') and cursor.endswith('.2')
+    # 行恰好用完时游标直接指向第一段序列
+    _, cursor = service.get_task_results_page(mixed_task.id, limit=4)
+    assert cursor.startswith('s') and cursor.endswith('.0')
+
+@pytest.mark.parametrize("cursor", ["x1", "r", "s1", "sa.b"])
+def test_invalid_cursor_is_rejected(mixed_task, cursor):
+    response = client.get(f"/api/v1/results/task/{mixed_task.id}/page", params={'cursor': cursor})
+    assert response.status_code == 400
+
+def test_export_streams_all_results(mixed_task):
+    ndjson = client.get(f"/api/v1/results/task/{mixed_task.id}/export")
+    rows = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert ndjson.headers['content-type'].startswith("application/x-ndjson")
+    assert [row['test_round'] for row in rows] == list(range(1, 13))
+
+    exported = client.get(f"/api/v1/results/task/{mixed_task.id}/export", params={'format': 'csv'})
+    records = list(csv.DictReader(io.StringIO(exported.text)))
+    assert list(records[0]) == ['id', 'task_id', 'metric_name', 'value', 'unit', 'test_round', 'created_at']
+    assert _summary(records)[-1] == ('keygen_time', '12', '12.0')
+
+def test_export_missing_task_returns_404():
+    assert client.get("/api/v1/results/task/999999/export").status_code == 404
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from app.models import models
+from app.services import result_series
+from app.services.result_service import ResultBatchWriter, ResultService
+
+def _summary(results):
+    return [(result.metric_name, result.test_round, result.value) for result in results]
+
+@pytest.mark.parametrize("dtype", result_series.SERIES_DTYPES)
+def test_values_round_trip(dtype):
+    values = np.random.default_rng(5).gamma(2.0, 0.3, 1000)
+    decoded = result_series.decode_values(result_series.encode_values(values, dtype), dtype)
+
+    assert decoded.dtype == np.float64
+    np.testing.assert_array_equal(decoded, values.astype(dtype))
+
+def test_rounds_round_trip_and_compress():
+    rounds = np.arange(1, 10001)
+    blob = result_series.encode_rounds(rounds)
+
+    np.testing.assert_array_equal(result_series.decode_rounds(blob), rounds)
+    # 差分编码后轮次几乎全部为1
+    assert len(blob) < rounds.size
+    assert result_series.decode_rounds(None) is None
+
+def test_unknown_settings_fall_back(monkeypatch):
+    monkeypatch.setattr(result_series.settings, "RESULT_STORAGE_BACKEND", "parquet")
+    monkeypatch.setattr(result_series.settings, "RESULT_SERIES_DTYPE", "float16")
+
+    assert result_series.storage_backend() == "rows"
+    assert result_series.series_dtype() == "float64"
+
+def test_writer_stores_rounds_as_segments(db, make_task, series_storage):
+    task = make_task()
+    with ResultBatchWriter(db, task.id, batch_size=4) as writer:
+        for test_round in range(1, 11):
+            writer.add('keygen_time', test_round * 0.5, 'ms', test_round)
+        writer.add('public_key_size', 800, 'bytes')
+
+    segments = db.query(models.ResultSeries).filter(models.ResultSeries.task_id == task.id).all()
+    assert [segment.segment for segment in segments] == [0, 1, 2]
+    assert result_series.count_samples(db, task.id) == 10
+    assert db.query(models.TestResult).filter(models.TestResult.task_id == task.id).count() == 1
+    np.testing.assert_array_equal(
+        result_series.load_series(db, task.id)['keygen_time'], np.arange(1, 11) * 0.5
+    )
+
+def test_results_match_rows_backend(db, make_task, monkeypatch):
+    loaded = {}
+    for backend in ("rows", "series"):
+        monkeypatch.setattr(result_series.settings, "RESULT_STORAGE_BACKEND", backend)
+        task = make_task()
+        with ResultBatchWriter(db, task.id, batch_size=3) as writer:
+            for test_round in range(1, 8):
+                writer.add('encaps_time', float(test_round), 'ms', test_round)
+        loaded[backend] = ResultService(db).get_task_results(task.id)
+
+    assert _summary(loaded["series"]) == _summary(loaded["rows"])
+
+def test_limit_decodes_only_first_rounds(db, make_task, series_storage, monkeypatch):
+    task = make_task()
+    with ResultBatchWriter(db, task.id, batch_size=6) as writer:
+        for test_round in range(1, 31):
+            writer.add('encaps_time', float(test_round), 'ms', test_round)
+            writer.add('decaps_time', -float(test_round), 'ms', test_round)
+    service = ResultService(db)
+    expected = _summary(service.get_task_results(task.id))[:7]
+
+    decoded = []
+    decode_values = result_series.decode_values
+    monkeypatch.setattr(result_series, "decode_values", lambda *args: decoded.append(1) or decode_values(*args))
+    limited = service.get_task_results(task.id, limit=7)
+
+    assert _summary(limited) == expected
+    assert max(result.test_round for result in limited) == 4
+    # 每个指标10段序列中只有覆盖前4轮的2段需要解码样本值
+    assert len(decoded) == 4
+
+def test_latest_segments_cover_limit(db, make_task, series_storage):
+    task = make_task()
+    with ResultBatchWriter(db, task.id, batch_size=5) as writer:
+        for test_round in range(1, 21):
+            writer.add('sign_time', float(test_round), 'ms', test_round)
+
+    segments = result_series.latest_segments(db, [task.id], 3)
+
+    values = np.concatenate([values for _, values, _ in segments])
+    assert len(values) >= 3
+    assert {18.0, 19.0, 20.0} <= set(values.tolist())
+    assert all(len(values) <= 3 for _, values, _ in segments)
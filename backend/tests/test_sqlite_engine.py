@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app.core.config import settings
+from app.db import database
+
+def _pragma(connection, name):
+    return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+def test_file_database_uses_wal_and_pool():
+    assert isinstance(database.engine.pool, QueuePool)
+    with database.engine.connect() as connection:
+        assert _pragma(connection, "journal_mode") == "wal"
+        assert _pragma(connection, "synchronous") == 1  # NORMAL
+        assert _pragma(connection, "temp_store") == 2  # MEMORY
+        assert _pragma(connection, "cache_size") == settings.SQLITE_CACHE_SIZE
+
+def test_reads_are_not_blocked_by_open_write(db, make_task):
+    task = make_task()
+    with database.engine.connect() as writer:
+        writer.execute(text("BEGIN IMMEDIATE"))
+        writer.execute(text("UPDATE test_tasks SET task_name = 'writing' WHERE id = :id"), {'id': task.id})
+        # WAL模式下另一个连接仍能读取已提交的数据
+        with database.engine.connect() as reader:
+            name = reader.execute(text("SELECT task_name FROM test_tasks WHERE id = :id"), {'id': task.id}).scalar()
+        writer.execute(text("ROLLBACK"))
+    assert name == "test"
+
+def test_memory_database_uses_static_pool(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", "sqlite:///:memory:")
+    engine = database._create_engine()
+    try:
+        assert isinstance(engine.pool, StaticPool)
+        assert database._create_async_engine() is None
+    finally:
+        engine.dispose()
+
+def test_pragma_values_are_validated():
+    assert database._sqlite_pragma_value("journal_mode", "wal", database.SQLITE_JOURNAL_MODES) == "WAL"
+    with pytest.raises(ValueError):
+        database._sqlite_pragma_value("journal_mode", "wal; DROP TABLE test_tasks", database.SQLITE_JOURNAL_MODES)
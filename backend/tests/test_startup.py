@@ -0,0 +1,52 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.core.config import settings
+
+def test_startup_step_reports_success_and_errors():
+    def broken():
+        raise OSError("unreachable")
+
+    assert asyncio.run(main._run_startup_step("step", lambda: None, 1)) is True
+    assert asyncio.run(main._run_startup_step("step", broken, 1)) is False
+
+def test_startup_step_timeout_aborts_startup():
+    release = threading.Event()
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(main._run_startup_step("slow step", lambda: release.wait(5), 0.05))
+    finally:
+        release.set()
+
+@pytest.fixture
+def startup_steps(monkeypatch):
+    """记录启动阶段执行的步骤，不启动执行引擎和报告进程池"""
+    steps = []
+    for target, name in ((main, "select_database_engine"), (main, "warm_up_pool"), (main, "prepare_schema"),
+                         (main.task_executor, "start"), (main.report_job_queue, "recover")):
+        monkeypatch.setattr(target, name, lambda name=name: steps.append(name))
+    for target, name in ((main.task_executor, "shutdown"), (main.report_job_queue, "shutdown"),
+                         (main.host_metrics_sampler, "start"), (main.host_metrics_sampler, "stop")):
+        monkeypatch.setattr(target, name, lambda *args, **kwargs: None)
+    return steps
+
+def test_lifespan_runs_all_startup_steps(startup_steps):
+    with TestClient(main.app):
+        pass
+
+    assert startup_steps[0] == "select_database_engine"
+    assert set(startup_steps[1:3]) == {"warm_up_pool", "prepare_schema"}
+    assert startup_steps[3:] == ["start", "recover"]
+
+def test_lifespan_skips_probe_and_schema_check(startup_steps, monkeypatch):
+    monkeypatch.setattr(settings, "SKIP_DATABASE_PROBE", True)
+    monkeypatch.setattr(settings, "SKIP_SCHEMA_CHECK", True)
+
+    with TestClient(main.app):
+        pass
+
+    assert startup_steps == ["warm_up_pool", "start", "recover"]
@@ -0,0 +1,62 @@
+import pytest
+
+from app.core.config import settings
+from app.models import models, schemas
+from app.models.models import TaskStatus
+from app.services.task_executor import TaskExecutor
+from app.services.task_service import TaskService, TaskStopped
+
+def _create_task(db, algorithm, **fields):
+    return TaskService(db).create_task(schemas.TestTaskCreate(
+        algorithm_id=algorithm.id, task_name="execution", test_count=fields.pop('test_count', 20), **fields
+    ))
+
+def test_execute_task_completes_and_finalizes_aggregates(db, algorithm):
+    task = TaskService(db).execute_task(_create_task(db, algorithm).id)
+
+    assert task.status == TaskStatus.COMPLETED
+    aggregates = db.query(models.TaskMetricAggregate).filter(
+        models.TaskMetricAggregate.task_id == task.id
+    ).all()
+    by_name = {aggregate.metric_name: aggregate for aggregate in aggregates}
+    assert by_name['keygen_time'].count == 20
+    assert all(aggregate.is_final for aggregate in aggregates)
+
+def test_execute_task_only_claims_pending_tasks(db, make_task):
+    task = make_task(status=TaskStatus.FAILED)
+    assert TaskService(db).execute_task(task.id).status == TaskStatus.FAILED
+    assert db.query(models.TestResult).filter(models.TestResult.task_id == task.id).count() == 0
+
+def test_stop_task_is_not_overwritten_by_completion(db, make_task):
+    task = make_task(status=TaskStatus.RUNNING)
+    service = TaskService(db)
+
+    assert service.stop_task(task.id)
+    with pytest.raises(TaskStopped):
+        service._ensure_running(task.id)
+    # 工作进程结束时的条件更新不会覆盖已停止的状态
+    assert not service._finish_task(task.id, TaskStatus.COMPLETED)
+    db.commit()
+    db.refresh(task)
+    assert task.status == TaskStatus.FAILED
+    assert task.error_message == "任务被用户停止"
+
+def test_stop_task_ignores_tasks_that_are_not_running(db, make_task):
+    assert not TaskService(db).stop_task(make_task(status=TaskStatus.COMPLETED).id)
+
+def test_recover_marks_interrupted_tasks_failed(db, make_task):
+    task = make_task(status=TaskStatus.RUNNING)
+    TaskExecutor(max_workers=1).recover()
+
+    db.refresh(task)
+    assert task.status == TaskStatus.FAILED
+    assert task.error_message == "服务重启，任务执行被中断"
+
+def test_test_count_is_bounded_by_max_test_count(db, algorithm, make_task, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_TEST_COUNT", 50)
+    with pytest.raises(ValueError):
+        _create_task(db, algorithm, test_count=51)
+
+    task = make_task(status=TaskStatus.PENDING)
+    with pytest.raises(ValueError):
+        TaskService(db).update_task(task.id, schemas.TestTaskUpdate(test_count=51))
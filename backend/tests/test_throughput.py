@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from app.libs import throughput
+from app.libs.pqc_wrapper import get_pqc_wrapper
+from app.libs.throughput import ThroughputConfig, scaling_efficiency
+from app.models import models, schemas
+from app.models.models import TaskStatus
+from app.services.task_service import TaskService
+
+def test_latency_mode_has_no_config():
+    assert ThroughputConfig.from_parameters({}) is None
+    assert ThroughputConfig.from_parameters({'mode': 'latency', 'throughput': {'duration': 1}}) is None
+    with pytest.raises(ValueError):
+        ThroughputConfig.from_parameters({'mode': 'burst'})
+
+def test_concurrency_always_includes_baseline():
+    config = ThroughputConfig.from_parameters({'mode': 'throughput', 'throughput': {'concurrency': [8, 2, 8]}})
+    assert config.concurrency == [1, 2, 8]
+    assert ThroughputConfig(concurrency=4).concurrency == [1, 4]
+
+def test_default_concurrency_uses_powers_of_two(monkeypatch):
+    monkeypatch.setattr(throughput.os, "cpu_count", lambda: 6)
+    assert throughput.default_concurrency() == [1, 2, 4, 6]
+
+@pytest.mark.parametrize("options", [
+    {'duration': 0},
+    {'duration': True},
+    {'duration': 10 ** 6},
+    {'concurrency': [0]},
+    {'concurrency': 10 ** 6},
+    {'concurrency': "4"},
+    {'operations': []},
+    {'operations': ['mine']},
+    {'workers': 'fibers'},
+])
+def test_invalid_options_are_rejected(options):
+    with pytest.raises(ValueError):
+        ThroughputConfig(**options)
+
+def test_operations_depend_on_category():
+    assert ThroughputConfig().operations_for('KEM') == ['keygen', 'encaps', 'decaps']
+    assert ThroughputConfig().operations_for('SIGNATURE') == ['keygen', 'sign', 'verify']
+    assert ThroughputConfig(operations=['round', 'round']).operations_for('KEM') == ['round']
+    with pytest.raises(ValueError):
+        ThroughputConfig(operations=['sign']).operations_for('KEM')
+
+def test_scaling_efficiency():
+    assert scaling_efficiency(300.0, 4, 100.0) == 75.0
+    assert scaling_efficiency(300.0, 4, 0.0) == 0.0
+
+def test_threads_run_concurrently_for_duration():
+    result = get_pqc_wrapper(use_mock=True).run_throughput('KEM', 'Kyber512', 'encaps', 2, 0.05)
+
+    assert len(result['worker_ops_per_sec']) == 2
+    assert result['ops_per_sec'] == pytest.approx(sum(result['worker_ops_per_sec']))
+    assert result['operations'] > 0 and result['failures'] == 0
+    assert result['ciphertext_size'] > 0
+
+def test_throughput_task_records_metrics_per_concurrency(db, algorithm):
+    service = TaskService(db)
+    task = service.create_task(schemas.TestTaskCreate(
+        algorithm_id=algorithm.id,
+        task_name="throughput",
+        test_count=10,
+        parameters={'mode': 'throughput',
+                    'throughput': {'duration': 0.05, 'concurrency': [2], 'operations': ['decaps']}}
+    ))
+
+    task = service.execute_task(task.id)
+
+    assert task.status == TaskStatus.COMPLETED
+    rows = db.query(models.TestResult.metric_name, models.TestResult.test_round, models.TestResult.value).filter(
+        models.TestResult.task_id == task.id
+    ).all()
+    metrics = {}
+    for metric_name, test_round, value in rows:
+        metrics.setdefault(metric_name, {}).setdefault(test_round, []).append(value)
+    assert sorted(metrics['decaps_throughput']) == [1, 2]
+    assert len(metrics['decaps_worker_throughput'][2]) == 2
+    assert metrics['decaps_scaling_efficiency'][1] == [100.0]
+    assert json.loads(task.parameters)['throughput'] == {
+        'duration': 0.05, 'concurrency': [1, 2], 'operations': ['decaps'], 'workers': 'threads'
+    }
+
+def test_throughput_mode_is_validated_on_create(db, algorithm):
+    with pytest.raises(ValueError):
+        TaskService(db).create_task(schemas.TestTaskCreate(
+            algorithm_id=algorithm.id,
+            task_name="throughput",
+            test_count=10,
+            parameters={'mode': 'throughput', 'throughput': {'operations': ['sign']}}
+        ))
@@ -0,0 +1,93 @@
+import ctypes
+import ctypes.util
+import platform
+
+import pytest
+
+from app.libs import timing
+from app.libs.timing import Timer
+
+null_call_supported = pytest.mark.skipif(
+    timing._load_null_target() is None, reason="当前平台不提供空调用"
+)
+
+def _libc_labs():
+    labs = ctypes.CDLL(ctypes.util.find_library('c')).labs
+    labs.argtypes = [ctypes.c_long]
+    labs.restype = ctypes.c_long
+    return labs
+
+def test_from_parameters_reads_timing_options():
+    timer = Timer.from_parameters({'timing': {'clock': 'thread_time', 'warmup_rounds': 3, 'batch_size': 4,
+                                              'calibrate': False, 'overhead_ns': {'keygen_time': 1.0}}})
+
+    assert (timer.clock_name, timer.warmup_rounds, timer.batch_size, timer.calibrate) == ('thread_time', 3, 4, False)
+    assert timer.overhead_ns == {}
+
+@pytest.mark.parametrize("options", [{'clock': 'rdtsc'}, {'batch_size': 0}, {'warmup_rounds': -1}])
+def test_invalid_options_are_rejected(options):
+    with pytest.raises(ValueError):
+        Timer.from_parameters({'timing': options})
+
+def test_warmup_runs_once():
+    calls = []
+    timer = Timer(warmup_rounds=5, calibrate=False)
+
+    timer.prepare(lambda: calls.append(1), {})
+    timer.prepare(lambda: calls.append(1), {})
+
+    assert len(calls) == 5
+
+def test_measure_batches_and_combines_return_codes():
+    codes = iter([0, 0, 2, 0])
+    timer = Timer(warmup_rounds=0, batch_size=4, calibrate=False)
+
+    elapsed_ms, result = timer.measure('op', lambda: next(codes), ())
+
+    assert result == 2
+    assert elapsed_ms >= 0
+
+def test_measure_subtracts_overhead_without_going_negative():
+    timer = Timer(warmup_rounds=0, calibrate=False)
+    timer.overhead_ns['op'] = 1e12
+
+    assert timer.measure('op', lambda: 0, ()) == (0.0, 0)
+
+@null_call_supported
+def test_calibration_measures_null_call_overhead():
+    labs = _libc_labs()
+    timer = Timer(warmup_rounds=0, batch_size=8, calibrate=True)
+
+    timer.prepare(lambda: None, {'labs_time': (labs, (-3,))})
+
+    assert timer.overhead_ns['labs_time'] > 0
+    assert timer.describe()['overhead_ns']['labs_time'] == round(timer.overhead_ns['labs_time'], 1)
+    # 扣除空调用开销后的耗时仍不为负
+    assert timer.measure('labs_time', labs, (-3,))[0] >= 0
+
+@null_call_supported
+def test_null_call_only_for_scalar_signatures():
+    assert timing.null_call([ctypes.c_char_p, ctypes.POINTER(ctypes.c_uint8), ctypes.c_size_t]) is not None
+    assert timing.null_call([ctypes.c_double]) is None
+
+    class Pair(ctypes.Structure):
+        _fields_ = [('a', ctypes.c_int), ('b', ctypes.c_int)]
+
+    assert timing.null_call([Pair]) is None
+
+def test_no_calibration_for_unsafe_signatures():
+    func = ctypes.CDLL(ctypes.util.find_library('m')).fabs
+    func.argtypes = [ctypes.c_double]
+    func.restype = ctypes.c_double
+    timer = Timer(warmup_rounds=0, calibrate=True)
+
+    timer.prepare(lambda: None, {'fabs_time': (func, (1.0,))})
+
+    assert timer.overhead_ns == {}
+
+def test_null_call_unavailable_on_unknown_machines(monkeypatch):
+    monkeypatch.setattr(timing, "_null_target", None)
+    monkeypatch.setattr(timing, "_null_calls", {})
+    monkeypatch.setattr(platform, "machine", lambda: "armv7l")
+
+    assert timing.null_call([ctypes.c_int]) is None
@@ -31,12 +31,15 @@ CREATE TABLE test_tasks (
     test_count INT DEFAULT 100 COMMENT '测试次数',
     status ENUM('PENDING', 'RUNNING', 'COMPLETED', 'FAILED') DEFAULT 'PENDING' COMMENT '任务状态',
     error_message TEXT COMMENT '错误信息',
+    host_metrics TEXT COMMENT '测试期间的主机负载(JSON)',
+    queued_at TIMESTAMP NULL COMMENT '入队时间',
     started_at TIMESTAMP NULL COMMENT '开始时间',
     finished_at TIMESTAMP NULL COMMENT '完成时间',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     FOREIGN KEY (algorithm_id) REFERENCES algorithms(id) ON DELETE CASCADE,
     INDEX idx_algorithm_id (algorithm_id),
     INDEX idx_status (status),
+    INDEX idx_queued_at (queued_at),
     INDEX idx_created_at (created_at)
 ) COMMENT '测试任务表';
 
@@ -56,6 +59,42 @@ CREATE TABLE test_results (
     INDEX idx_task_metric (task_id, metric_name)
 ) COMMENT '测试结果表';
 
+-- 任务指标聚合表
+CREATE TABLE task_metric_aggregates (
+    task_id INT NOT NULL COMMENT '任务ID',
+    metric_name VARCHAR(100) NOT NULL COMMENT '指标名称',
+    unit VARCHAR(20) COMMENT '单位',
+    count INT NOT NULL DEFAULT 0 COMMENT '样本数',
+    total DOUBLE NOT NULL DEFAULT 0 COMMENT '样本和',
+    m2 DOUBLE NOT NULL DEFAULT 0 COMMENT '离均差平方和',
+    min_value DOUBLE COMMENT '最小值',
+    max_value DOUBLE COMMENT '最大值',
+    last_value DOUBLE COMMENT '最后写入的值',
+    median DOUBLE COMMENT '中位数',
+    p95 DOUBLE COMMENT '95分位数',
+    p99 DOUBLE COMMENT '99分位数',
+    is_final BOOLEAN DEFAULT FALSE COMMENT '分位数是否已定稿',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+    PRIMARY KEY (task_id, metric_name),
+    FOREIGN KEY (task_id) REFERENCES test_tasks(id) ON DELETE CASCADE
+) COMMENT '任务指标聚合表';
+
+-- 测试结果序列表（RESULT_STORAGE_BACKEND=series时存储逐轮样本）
+CREATE TABLE result_series (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    task_id INT NOT NULL COMMENT '任务ID',
+    metric_name VARCHAR(100) NOT NULL COMMENT '指标名称',
+    segment INT NOT NULL DEFAULT 0 COMMENT '分段序号',
+    unit VARCHAR(20) COMMENT '单位',
+    dtype VARCHAR(10) NOT NULL DEFAULT 'float64' COMMENT '样本存储类型',
+    count INT NOT NULL DEFAULT 0 COMMENT '样本数',
+    data LONGBLOB NOT NULL COMMENT '压缩后的样本值',
+    rounds LONGBLOB COMMENT '压缩后的测试轮次',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    FOREIGN KEY (task_id) REFERENCES test_tasks(id) ON DELETE CASCADE,
+    UNIQUE INDEX idx_series_task_metric (task_id, metric_name, segment)
+) COMMENT '测试结果序列表';
+
 -- 报告记录表
 CREATE TABLE reports (
     id INT PRIMARY KEY AUTO_INCREMENT,
@@ -108,18 +147,18 @@ SELECT
     t.task_name,
     a.name as algorithm_name,
     a.category,
-    AVG(CASE WHEN r.metric_name = 'keygen_time' THEN r.value END) as avg_keygen_time,
-    AVG(CASE WHEN r.metric_name = 'encaps_time' THEN r.value END) as avg_encaps_time,
-    AVG(CASE WHEN r.metric_name = 'decaps_time' THEN r.value END) as avg_decaps_time,
-    AVG(CASE WHEN r.metric_name = 'sign_time' THEN r.value END) as avg_sign_time,
-    AVG(CASE WHEN r.metric_name = 'verify_time' THEN r.value END) as avg_verify_time,
-    MAX(CASE WHEN r.metric_name = 'success_rate' THEN r.value END) as success_rate,
-    MAX(CASE WHEN r.metric_name = 'public_key_size' THEN r.value END) as public_key_size,
-    MAX(CASE WHEN r.metric_name = 'private_key_size' THEN r.value END) as private_key_size,
-    MAX(CASE WHEN r.metric_name = 'signature_size' THEN r.value END) as signature_size,
-    MAX(CASE WHEN r.metric_name = 'ciphertext_size' THEN r.value END) as ciphertext_size
+    MAX(CASE WHEN g.metric_name = 'keygen_time' THEN g.total / g.count END) as avg_keygen_time,
+    MAX(CASE WHEN g.metric_name = 'encaps_time' THEN g.total / g.count END) as avg_encaps_time,
+    MAX(CASE WHEN g.metric_name = 'decaps_time' THEN g.total / g.count END) as avg_decaps_time,
+    MAX(CASE WHEN g.metric_name = 'sign_time' THEN g.total / g.count END) as avg_sign_time,
+    MAX(CASE WHEN g.metric_name = 'verify_time' THEN g.total / g.count END) as avg_verify_time,
+    MAX(CASE WHEN g.metric_name = 'success_rate' THEN g.last_value END) as success_rate,
+    MAX(CASE WHEN g.metric_name = 'public_key_size' THEN g.max_value END) as public_key_size,
+    MAX(CASE WHEN g.metric_name = 'private_key_size' THEN g.max_value END) as private_key_size,
+    MAX(CASE WHEN g.metric_name = 'signature_size' THEN g.max_value END) as signature_size,
+    MAX(CASE WHEN g.metric_name = 'ciphertext_size' THEN g.max_value END) as ciphertext_size
 FROM test_tasks t
 JOIN algorithms a ON t.algorithm_id = a.id
-LEFT JOIN test_results r ON t.id = r.task_id
+LEFT JOIN task_metric_aggregates g ON t.id = g.task_id
 WHERE t.status = 'COMPLETED'
 GROUP BY t.id, t.task_name, a.name, a.category;
\ No newline at end of file
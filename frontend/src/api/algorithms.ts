@@ -33,6 +33,24 @@ export interface AlgorithmUpdate {
   is_active?: boolean
 }
 
+export interface AlgorithmCapability {
+  name: string
+  category: 'KEM' | 'SIGNATURE'
+  alg_version?: string
+  claimed_nist_level?: number
+  public_key_size: number
+  secret_key_size: number
+  ciphertext_size?: number
+  shared_secret_size?: number
+  max_signature_size?: number
+}
+
+export interface AlgorithmCapabilities {
+  library: string
+  version?: string
+  algorithms: AlgorithmCapability[]
+}
+
 export const algorithmApi = {
   // 获取算法列表
   getAlgorithms: (params?: {
@@ -44,6 +62,11 @@ export const algorithmApi = {
     return api.get('/algorithms', { params })
   },
 
+  // 获取算法库能力索引
+  getCapabilities: (category?: 'KEM' | 'SIGNATURE'): Promise<AlgorithmCapabilities> => {
+    return api.get('/algorithms/capabilities', { params: { category } })
+  },
+
   // 根据ID获取算法
   getAlgorithm: (id: number): Promise<Algorithm> => {
     return api.get(`/algorithms/${id}`)
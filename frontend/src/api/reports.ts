@@ -11,19 +11,35 @@ export interface Report {
   created_at: string
 }
 
+export interface ReportJob {
+  job_id: string
+  task_id: number
+  report_type: 'pdf' | 'csv'
+  status: 'PENDING' | 'RUNNING' | 'COMPLETED' | 'FAILED'
+  report?: Report
+  error_message?: string
+  created_at: string
+  finished_at?: string
+}
+
 export const reportApi = {
   // 获取任务报告
   getTaskReports: (taskId: number): Promise<Report[]> => {
     return api.get(`/reports/task/${taskId}`)
   },
 
-  // 生成报告
-  generateReport: (taskId: number, reportType: 'pdf' | 'csv' = 'pdf'): Promise<Report> => {
+  // 提交报告生成任务
+  generateReport: (taskId: number, reportType: 'pdf' | 'csv' = 'pdf'): Promise<ReportJob> => {
     return api.post(`/reports/task/${taskId}/generate`, null, {
       params: { report_type: reportType }
     })
   },
 
+  // 获取报告生成任务状态
+  getReportJob: (jobId: string): Promise<ReportJob> => {
+    return api.get(`/reports/jobs/${jobId}`)
+  },
+
   // 下载报告
   downloadReport: (reportId: number): string => {
     return `${api.defaults.baseURL}/reports/${reportId}/download`
@@ -39,8 +55,8 @@ export const reportApi = {
     return api.delete(`/reports/${reportId}`)
   },
 
-  // 批量生成报告
-  batchGenerateReports: (taskIds: number[], reportType: 'pdf' | 'csv' = 'pdf'): Promise<Report[]> => {
+  // 批量提交报告生成任务
+  batchGenerateReports: (taskIds: number[], reportType: 'pdf' | 'csv' = 'pdf'): Promise<ReportJob[]> => {
     return api.post('/reports/batch-generate', taskIds, {
       params: { report_type: reportType }
     })
@@ -2,7 +2,7 @@ import api from './index'
 
 // 结果相关接口
 export interface TestResult {
-  id: number
+  id?: number
   task_id: number
   metric_name: string
   value: number
@@ -11,6 +11,20 @@ export interface TestResult {
   created_at: string
 }
 
+export interface TestResultPage {
+  items: TestResult[]
+  next_cursor?: string | null
+}
+
+export interface MetricSeries {
+  task_id: number
+  metric_name: string
+  method: 'lttb' | 'minmax'
+  width: number
+  total_points: number
+  points: [number, number][]
+}
+
 export interface PerformanceMetrics {
   avg_keygen_time?: number
   avg_encaps_time?: number
@@ -31,6 +45,8 @@ export interface ResultSummary {
     min: number
     max: number
     median: number
+    p95?: number
+    p99?: number
     std_dev: number
   } | {
     task_info: {
@@ -49,6 +65,31 @@ export const resultApi = {
     return api.get(`/results/task/${taskId}`)
   },
 
+  // 按游标分页获取任务结果
+  getTaskResultsPage: (taskId: number, params: {
+    limit?: number
+    cursor?: string
+    metric_name?: string
+  } = {}): Promise<TestResultPage> => {
+    return api.get(`/results/task/${taskId}/page`, { params })
+  },
+
+  // 流式导出任务结果的下载地址
+  exportTaskResults: (taskId: number, format: 'ndjson' | 'csv' = 'csv', metricName?: string): string => {
+    const params = new URLSearchParams({ format })
+    if (metricName) params.append('metric_name', metricName)
+    return `${api.defaults.baseURL}/results/task/${taskId}/export?${params.toString()}`
+  },
+
+  // 获取按图表宽度降采样的指标序列
+  getTaskMetricSeries: (taskId: number, params: {
+    metric_name: string
+    width?: number
+    method?: 'lttb' | 'minmax'
+  }): Promise<MetricSeries> => {
+    return api.get(`/results/task/${taskId}/series`, { params })
+  },
+
   // 获取任务结果摘要
   getTaskResultsSummary: (taskId: number): Promise<ResultSummary> => {
     return api.get(`/results/task/${taskId}/summary`)
@@ -13,6 +13,7 @@ export interface TestTask {
   started_at?: string
   finished_at?: string
   created_at: string
+  host_metrics?: Record<string, number>
   algorithm: Algorithm
 }
 
@@ -42,6 +43,7 @@ export interface TaskStatus {
   task_id: number
   status: 'PENDING' | 'RUNNING' | 'COMPLETED' | 'FAILED'
   progress: number
+  completed_rounds?: number
   started_at?: string
   finished_at?: string
   error_message?: string
@@ -93,6 +95,15 @@ export const taskApi = {
     return api.get(`/tasks/${id}/status`)
   },
   
+  // 订阅任务进度推送（SSE）
+  subscribeTaskEvents: (id: number, onStatus: (status: TaskStatus) => void): EventSource => {
+    const source = new EventSource(`${api.defaults.baseURL}/tasks/${id}/events`)
+    source.addEventListener('status', (event) => {
+      onStatus(JSON.parse((event as MessageEvent).data))
+    })
+    return source
+  },
+  
   // 手动运行任务
   runTask: (id: number): Promise<{ message: string; success: boolean }> => {
     return api.post(`/tasks/${id}/run`)
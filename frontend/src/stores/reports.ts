@@ -1,5 +1,17 @@
 import { defineStore } from 'pinia'
-import { reportApi, type Report } from '@/api/reports'
+import { reportApi, type Report, type ReportJob } from '@/api/reports'
+
+// 等待报告生成任务结束
+const waitForReportJob = async (job: ReportJob, interval: number = 1000): Promise<Report> => {
+  while (job.status === 'PENDING' || job.status === 'RUNNING') {
+    await new Promise(resolve => setTimeout(resolve, interval))
+    job = await reportApi.getReportJob(job.job_id)
+  }
+  if (job.status === 'FAILED' || !job.report) {
+    throw new Error(job.error_message || '生成报告失败')
+  }
+  return job.report
+}
 
 export const useReportStore = defineStore('reports', {
   state: () => ({
@@ -52,7 +64,8 @@ export const useReportStore = defineStore('reports', {
       this.error = null
 
       try {
-        const report = await reportApi.generateReport(taskId, reportType)
+        const job = await reportApi.generateReport(taskId, reportType)
+        const report = await waitForReportJob(job)
 
         // 更新报告列表
         const existingReports = this.taskReports.get(taskId) || []
@@ -75,7 +88,11 @@ export const useReportStore = defineStore('reports', {
       this.error = null
 
       try {
-        const reports = await reportApi.batchGenerateReports(taskIds, reportType)
+        const jobs = await reportApi.batchGenerateReports(taskIds, reportType)
+        const results = await Promise.allSettled(jobs.map(job => waitForReportJob(job)))
+        const reports = results
+          .filter((result): result is PromiseFulfilledResult<Report> => result.status === 'fulfilled')
+          .map(result => result.value)
 
         // 更新报告列表
         this.reports.unshift(...reports)
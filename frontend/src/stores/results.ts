@@ -1,11 +1,12 @@
 import { defineStore } from 'pinia'
-import { resultApi, type TestResult, type PerformanceMetrics, type ResultSummary } from '@/api/results'
+import { resultApi, type TestResult, type PerformanceMetrics, type ResultSummary, type MetricSeries } from '@/api/results'
 
 export const useResultStore = defineStore('results', {
   state: () => ({
     taskResults: new Map<number, TestResult[]>(),
     taskSummaries: new Map<number, ResultSummary>(),
     taskMetrics: new Map<number, PerformanceMetrics>(),
+    metricSeries: new Map<string, MetricSeries>(),
     loading: false,
     error: null as string | null,
   }),
@@ -33,6 +34,22 @@ export const useResultStore = defineStore('results', {
       }
     },
 
+    // 获取图表用的降采样序列，按(任务, 指标, 宽度)缓存
+    async fetchTaskMetricSeries(taskId: number, metricName: string, width = 800) {
+      const key = `${taskId}:${metricName}:${width}`
+      const cached = this.metricSeries.get(key)
+      if (cached) return cached
+      
+      try {
+        const series = await resultApi.getTaskMetricSeries(taskId, { metric_name: metricName, width })
+        this.metricSeries.set(key, series)
+        return series
+      } catch (error: any) {
+        this.error = error.message || '获取指标序列失败'
+        throw error
+      }
+    },
+
     async fetchTaskResultsSummary(taskId: number) {
       this.loading = true
       this.error = null
@@ -142,19 +142,7 @@ export const useTaskStore = defineStore('tasks', {
     async fetchTaskStatus(id: number) {
       try {
         const status = await taskApi.getTaskStatus(id)
-        this.taskStatuses.set(id, status)
-        
-        // 更新任务列表中的状态
-        const taskIndex = this.tasks.findIndex(task => task.id === id)
-        if (taskIndex >= 0) {
-          this.tasks[taskIndex].status = status.status
-        }
-        
-        // 更新当前任务状态
-        if (this.currentTask?.id === id) {
-          this.currentTask.status = status.status
-        }
-        
+        this.applyTaskStatus(status)
         return status
       } catch (error: any) {
         console.error('获取任务状态失败:', error)
@@ -162,6 +150,34 @@ export const useTaskStore = defineStore('tasks', {
       }
     },
 
+    applyTaskStatus(status: TaskStatus) {
+      const id = status.task_id
+      this.taskStatuses.set(id, status)
+      
+      // 更新任务列表中的状态
+      const taskIndex = this.tasks.findIndex(task => task.id === id)
+      if (taskIndex >= 0) {
+        this.tasks[taskIndex].status = status.status
+      }
+      
+      // 更新当前任务状态
+      if (this.currentTask?.id === id) {
+        this.currentTask.status = status.status
+      }
+    },
+
+    // 订阅任务进度推送，任务结束后自动关闭连接
+    watchTaskStatus(id: number, onFinished?: (status: TaskStatus) => void): EventSource {
+      const source = taskApi.subscribeTaskEvents(id, (status) => {
+        this.applyTaskStatus(status)
+        if (status.status === 'COMPLETED' || status.status === 'FAILED') {
+          source.close()
+          onFinished?.(status)
+        }
+      })
+      return source
+    },
+
     // 轮询获取任务状态
     startPollingTaskStatus(id: number, interval: number = 2000) {
       const poll = async () => {
@@ -60,10 +60,13 @@ def test_database_connection():
         sys.path.insert(0, str(project_root / "backend"))
         
         from app.core.config import settings
-        from app.db.database import engine
+        from app.db import database
+        
+        # MySQL不可用时切换到SQLite（与应用启动阶段一致）
+        database.select_database_engine()
         
         # 测试连接
-        with engine.connect() as conn:
+        with database.engine.connect() as conn:
             result = conn.execute("SELECT 1")
             print("✅ 数据库连接成功")
             
@@ -139,6 +142,59 @@ def create_test_data():
         print(f"❌ 创建数据失败: {e}")
         return False
 
+# API进程启动时不应加载的重依赖（只在生成报告时按需导入）
+DEFERRED_MODULES = ('pandas', 'matplotlib', 'seaborn', 'reportlab')
+# 导入后端应用的时间预算（秒）
+STARTUP_IMPORT_BUDGET = 2.0
+
+def check_startup_time(runs: int = 3):
+    """测量后端应用的导入耗时，并检查报告相关的重依赖没有在启动时加载"""
+    print("\n测量 API 启动导入耗时...")
+    
+    backend_dir = Path(__file__).parent / "backend"
+    probe = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import main\n"
+        "print('startup_seconds=%f' % (time.perf_counter() - start))\n"
+        f"print('deferred_loaded=' + ','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))\n"
+    )
+    
+    timings = []
+    loaded = []
+    try:
+        for _ in range(runs):
+            # 每次使用新的解释器进程，避免模块缓存影响结果
+            output = subprocess.run(
+                [sys.executable, "-c", probe],
+                cwd=backend_dir,
+                capture_output=True,
+                text=True,
+                timeout=60,
+                check=True
+            ).stdout
+            values = dict(line.split('=', 1) for line in output.splitlines()
+                          if line.startswith(('startup_seconds=', 'deferred_loaded=')))
+            timings.append(float(values['startup_seconds']))
+            loaded = [name for name in values['deferred_loaded'].split(',') if name]
+    except Exception as e:
+        print(f"❌ 无法测量启动耗时: {e}")
+        return False
+    
+    best = min(timings)
+    print(f"   导入耗时: 最快 {best:.3f} 秒，共 {runs} 次")
+    
+    passed = True
+    if loaded:
+        print(f"❌ 启动时加载了重依赖: {', '.join(loaded)}")
+        passed = False
+    if best > STARTUP_IMPORT_BUDGET:
+        print(f"❌ 导入耗时超过预算 {STARTUP_IMPORT_BUDGET} 秒")
+        passed = False
+    if passed:
+        print("✅ 启动导入耗时正常")
+    return passed
+
 def test_api_server():
     """测试 API 服务器"""
     print("\n测试 API 服务器...")
@@ -220,7 +276,11 @@ def main():
     if not create_test_data():
         all_checks_passed = False
     
-    # 5. 测试 API 服务器
+    # 5. 检查 API 启动耗时
+    if not check_startup_time():
+        all_checks_passed = False
+    
+    # 6. 测试 API 服务器
     if not test_api_server():
         print("   注意: API 服务器测试失败，但不影响手动启动")
     